@@ -1,9 +1,39 @@
-import React, { useState } from 'react';
+import React, { useState, useEffect } from 'react';
+import API from './api';
+
+// Espera entre a última tecla e a consulta de sugestões (ms)
+const SUGGEST_DELAY = 150;
+
+const SUGGESTION_LABELS = {
+  industry: 'Empresa',
+  product: 'Produto',
+  sector: 'Setor',
+  country: 'País'
+};
 
 const SearchBar = ({ onSearch, sectors = [], isLoading = false }) => {
   const [query, setQuery] = useState('');
   const [selectedSector, setSelectedSector] = useState('');
   const [selectedRegion, setSelectedRegion] = useState('Global');
+  const [suggestions, setSuggestions] = useState([]);
+  const [showSuggestions, setShowSuggestions] = useState(false);
+  
+  useEffect(() => {
+    if (query.trim().length < 2) {
+      setSuggestions([]);
+      return undefined;
+    }
+    let cancelled = false;
+    const timer = setTimeout(() => {
+      API.suggestIndustries(query)
+        .then((results) => { if (!cancelled) setSuggestions(results); })
+        .catch(() => { if (!cancelled) setSuggestions([]); });
+    }, SUGGEST_DELAY);
+    return () => {
+      cancelled = true;
+      clearTimeout(timer);
+    };
+  }, [query]);
   
   const regions = [
     'Global',
@@ -15,8 +45,14 @@ const SearchBar = ({ onSearch, sectors = [], isLoading = false }) => {
     'Oceania'
   ];
 
+  const handleSelect = (suggestion) => {
+    setQuery(suggestion.text);
+    setShowSuggestions(false);
+  };
+
   const handleSubmit = (e) => {
     e.preventDefault();
+    setShowSuggestions(false);
     onSearch(query, {
       sector: selectedSector,
       region: selectedRegion
@@ -25,16 +61,38 @@ const SearchBar = ({ onSearch, sectors = [], isLoading = false }) => {
 
   return (
     <form onSubmit={handleSubmit} className="bg-white rounded-lg shadow-md p-6">
-      <div className="mb-4">
+      <div className="mb-4 relative">
         <label htmlFor="search-query" className="block text-neutral-dark mb-2">Palavra-chave</label>
         <input
           id="search-query"
           type="text"
           value={query}
-          onChange={(e) => setQuery(e.target.value)}
+          onChange={(e) => {
+            setQuery(e.target.value);
+            setShowSuggestions(true);
+          }}
+          onBlur={() => setShowSuggestions(false)}
+          autoComplete="off"
           placeholder="Nome, produto ou descrição"
           className="w-full px-4 py-2 border border-neutral-light rounded-md focus:outline-none focus:ring-2 focus:ring-primary"
         />
+        {showSuggestions && suggestions.length > 0 && (
+          <ul className="absolute z-10 w-full mt-1 bg-white border border-neutral-light rounded-md shadow-md">
+            {suggestions.map((suggestion, index) => (
+              <li
+                key={index}
+                onMouseDown={(e) => {
+                  e.preventDefault();
+                  handleSelect(suggestion);
+                }}
+                className="px-4 py-2 cursor-pointer hover:bg-neutral-light flex justify-between"
+              >
+                <span>{suggestion.text}</span>
+                <span className="text-sm text-neutral-dark">{SUGGESTION_LABELS[suggestion.type]}</span>
+              </li>
+            ))}
+          </ul>
+        )}
       </div>
       
       <div className="grid grid-cols-1 md:grid-cols-2 gap-4 mb-6">
@@ -34,6 +34,14 @@ export interface Country {
   region: string;
 }
 
+export interface Suggestion {
+  text: string;
+  type: 'industry' | 'product' | 'sector' | 'country';
+  count: number;
+  id?: string;
+  corrected?: boolean;
+}
+
 export interface SearchFilters {
   sector?: string;
   region?: string;
@@ -97,6 +105,21 @@ export const getIndustryDetails = async (id: string): Promise<Industry> => {
   }
 };
 
+// Buscar detalhes de várias indústrias em uma única chamada
+export const getIndustriesBatch = async (ids: string[]): Promise<Industry[]> => {
+  try {
+    const queryParams = new URLSearchParams({ ids: ids.join(',') });
+    const response = await fetch(`${API_BASE_URL}/api/industries/batch?${queryParams.toString()}`);
+    if (!response.ok) throw new Error('Failed to fetch industries batch');
+    
+    const data = await response.json();
+    return data.data;
+  } catch (error) {
+    console.error('Get Industries Batch Error:', error);
+    throw error;
+  }
+};
+
 // Busca avançada de indústrias
 export const searchIndustries = async (query: string, sector?: string, region?: string): Promise<Industry[]> => {
   try {
@@ -116,6 +139,21 @@ export const searchIndustries = async (query: string, sector?: string, region?:
   }
 };
 
+// Sugestões do autocompletar para o texto digitado
+export const suggestIndustries = async (prefix: string, limit: number = 8): Promise<Suggestion[]> => {
+  try {
+    const queryParams = new URLSearchParams({ prefix, limit: String(limit) });
+    const response = await fetch(`${API_BASE_URL}/api/industries/suggest?${queryParams.toString()}`);
+    if (!response.ok) throw new Error('Suggest failed');
+    
+    const data = await response.json();
+    return data.data;
+  } catch (error) {
+    console.error('Suggest Industries Error:', error);
+    throw error;
+  }
+};
+
 // Buscar todos os setores
 export const getSectors = async (): Promise<Sector[]> => {
   try {
@@ -149,7 +187,9 @@ const API = {
   checkApiHealth,
   getIndustries,
   getIndustryDetails,
+  getIndustriesBatch,
   searchIndustries,
+  suggestIndustries,
   getSectors,
   getCountries
 };
@@ -1,9 +1,18 @@
-from flask import Flask, jsonify, request
+from flask import Flask, g, jsonify, request
 from flask_cors import CORS
 import os
 import json
 import logging
 from datetime import datetime
+from search_index import IndustryIndex
+from suggest import SuggestIndex
+from snapshot import LiveSnapshot, restore
+import json_provider
+from export import EXPORT_FORMATS, export_response
+from projection import parse_fields, project
+from numeric import parse_ranges, parse_sort
+from stats import GROUP_FIELDS, StatsCache, cache_key
+from regions import COUNTRY_REGIONS
 
 # Configuração de logging
 logging.basicConfig(level=logging.INFO)
@@ -12,6 +21,7 @@ logger = logging.getLogger(__name__)
 # Inicializa a aplicação Flask
 app = Flask(__name__)
 CORS(app)  # Habilita CORS para todas as rotas
+json_provider.init_app(app)  # Serialização JSON rápida (orjson)
 
 # Dados simulados para a API
 MOCK_INDUSTRIES = [
@@ -129,16 +139,59 @@ SECTORS = [
     {"id": "pharm", "name": "Farmacêutico"}
 ]
 
-# Lista de países disponíveis
+# Lista de países disponíveis (a região vem da tabela única de regions.py)
 COUNTRIES = [
-    {"id": "br", "name": "Brasil", "region": "América do Sul"},
-    {"id": "ar", "name": "Argentina", "region": "América do Sul"},
-    {"id": "mx", "name": "México", "region": "América do Norte"},
-    {"id": "se", "name": "Suécia", "region": "Europa"},
-    {"id": "gh", "name": "Gana", "region": "África"},
-    {"id": "sg", "name": "Singapura", "region": "Ásia"}
+    {"id": code, "name": name, "region": COUNTRY_REGIONS[name]}
+    for code, name in [
+        ("br", "Brasil"), ("ar", "Argentina"), ("mx", "México"),
+        ("se", "Suécia"), ("gh", "Gana"), ("sg", "Singapura")
+    ]
 ]
 
+# Limite de IDs aceitos por chamada do endpoint de lote
+MAX_BATCH_IDS = 100
+
+# Colunas da exportação em CSV
+EXPORT_COLUMNS = [
+    "id", "name", "sector", "country", "region", "status", "founded", "employees", "revenue",
+    "description", "products", "certifications", "website", "contact_email", "address"
+]
+
+# Snapshot do conjunto de dados (python snapshot.py build); sem ele, são servidos os MOCK_INDUSTRIES
+DATASET_SNAPSHOT = os.getenv('DATASET_SNAPSHOT')
+
+# Segundos entre as verificações de alteração do arquivo do snapshot
+SNAPSHOT_CHECK_INTERVAL = float(os.getenv('SNAPSHOT_CHECK_INTERVAL', 5))
+
+
+class Dataset:
+    """Registros servidos pela API e os índices (id, texto, atributos e sugestões) construídos sobre eles"""
+
+    def __init__(self, records):
+        self.records = records
+        # Índices gravados no snapshot são lidos do arquivo; os demais, construídos aqui
+        self.index = restore(records, "industry", IndustryIndex)
+        self.suggest = restore(records, "suggest", SuggestIndex)
+        # Os dados de um Dataset não mudam: uma recarga cria outro, com o cache vazio
+        self.stats = StatsCache()
+
+
+if DATASET_SNAPSHOT:
+    # O arquivo é mapeado em memória (páginas compartilhadas entre os workers) e
+    # recarregado quando muda ou ao receber SIGHUP
+    LIVE_DATASET = LiveSnapshot(DATASET_SNAPSHOT, Dataset, SNAPSHOT_CHECK_INTERVAL)
+    LIVE_DATASET.install_signal_handler()
+    logger.info(f"Servindo o snapshot {DATASET_SNAPSHOT} ({len(LIVE_DATASET.current.records)} indústrias)")
+else:
+    LIVE_DATASET = None
+    DATASET = Dataset(MOCK_INDUSTRIES)
+
+
+@app.before_request
+def select_dataset():
+    """Fixa o conjunto de dados da requisição: uma recarga não a afeta no meio do caminho"""
+    g.dataset = LIVE_DATASET.get() if LIVE_DATASET is not None else DATASET
+
 # Rota de verificação de saúde
 @app.route('/api/health', methods=['GET'])
 def health_check():
@@ -157,29 +210,67 @@ def get_industries():
     country = request.args.get('country')
     status = request.args.get('status')
     
-    # Filtra as indústrias
-    filtered_industries = MOCK_INDUSTRIES
-    
-    if sector:
-        filtered_industries = [ind for ind in filtered_industries if ind['sector'] == sector]
-    
-    if country:
-        filtered_industries = [ind for ind in filtered_industries if ind['country'] == country]
+    # Campos a devolver (lista separada por vírgulas ou preset: card, map),
+    # faixas numéricas (min_employees, founded_from, min_revenue...) e ordenação (sort=-revenue)
+    try:
+        fields = parse_fields(request.args.get('fields'))
+        ranges = parse_ranges(request.args)
+        sort = parse_sort(request.args.get('sort'))
+    except ValueError as e:
+        return jsonify({
+            "status": "error",
+            "message": str(e)
+        }), 400
     
-    if status:
-        filtered_industries = [ind for ind in filtered_industries if ind['status'] == status]
+    # Filtra as indústrias pela interseção dos índices de atributos e pelas máscaras numéricas
+    filtered_industries = g.dataset.index.find(filters={
+        'sector': sector or None,
+        'country': country or None,
+        'status': status or None
+    }, ranges=ranges, sort=sort)
     
     return jsonify({
         "status": "success",
         "count": len(filtered_industries),
-        "data": filtered_industries
+        "data": [project(ind, fields) for ind in filtered_industries]
     })
 
+# Rota para exportar as indústrias em streaming
+@app.route('/api/industries/export', methods=['GET'])
+def export_industries():
+    """Endpoint para exportar as indústrias em NDJSON ou CSV, com os filtros e a ordenação da listagem"""
+    export_format = request.args.get('format', 'ndjson')
+    if export_format not in EXPORT_FORMATS:
+        return jsonify({
+            "status": "error",
+            "message": "Formato inválido. Use ndjson ou csv"
+        }), 400
+    
+    try:
+        ranges = parse_ranges(request.args)
+        sort = parse_sort(request.args.get('sort'))
+    except ValueError as e:
+        return jsonify({
+            "status": "error",
+            "message": str(e)
+        }), 400
+    
+    positions = g.dataset.index.find_positions(filters={
+        'sector': request.args.get('sector') or None,
+        'country': request.args.get('country') or None,
+        'status': request.args.get('status') or None
+    }, ranges=ranges, sort=sort)
+    
+    # Os registros são lidos sob demanda, à medida que a resposta é enviada
+    records = g.dataset.records
+    rows = (records[position] for position in positions)
+    return export_response(rows, export_format, EXPORT_COLUMNS)
+
 # Rota para obter detalhes de uma indústria específica
 @app.route('/api/industries/<id>', methods=['GET'])
 def get_industry(id):
     """Endpoint para obter detalhes de uma indústria específica"""
-    industry = next((ind for ind in MOCK_INDUSTRIES if ind['id'] == id), None)
+    industry = g.dataset.index.get(id)
     
     if not industry:
         return jsonify({
@@ -192,29 +283,79 @@ def get_industry(id):
         "data": industry
     })
 
+# Rota para obter várias indústrias em uma única chamada
+@app.route('/api/industries/batch', methods=['GET'])
+def get_industries_batch():
+    """Endpoint para obter os detalhes de várias indústrias (ids=ind001,ind002,...)"""
+    ids = list(dict.fromkeys(i for value in request.args.getlist('ids') for i in value.split(',') if i))
+    
+    if not ids:
+        return jsonify({
+            "status": "error",
+            "message": "Parâmetro obrigatório ausente: ids"
+        }), 400
+    
+    if len(ids) > MAX_BATCH_IDS:
+        return jsonify({
+            "status": "error",
+            "message": f"Máximo de {MAX_BATCH_IDS} IDs por requisição"
+        }), 400
+    
+    industries = g.dataset.index.get_many(ids)
+    found = {ind['id'] for ind in industries}
+    
+    return jsonify({
+        "status": "success",
+        "count": len(industries),
+        "data": industries,
+        "missing": [i for i in ids if i not in found]
+    })
+
 # Rota para busca avançada de indústrias
 @app.route('/api/industries/search', methods=['GET'])
 def search_industries():
     """Endpoint para busca avançada de indústrias"""
     # Obtém parâmetros de consulta
-    query = request.args.get('q', '').lower()
+    query = request.args.get('q', '')
     sector = request.args.get('sector')
     region = request.args.get('region')
     
-    # Filtra as indústrias
-    results = MOCK_INDUSTRIES
+    try:
+        fields = parse_fields(request.args.get('fields'))
+        ranges = parse_ranges(request.args)
+        sort = parse_sort(request.args.get('sort'))
+    except ValueError as e:
+        return jsonify({
+            "status": "error",
+            "message": str(e)
+        }), 400
     
-    if query:
-        results = [ind for ind in results if 
-                  query in ind['name'].lower() or 
-                  query in ind['description'].lower() or
-                  any(query in product.lower() for product in ind['products'])]
+    # Filtros de atributos primeiro; o texto só é verificado sobre os sobreviventes
+    results = g.dataset.index.find(query, filters={
+        'sector': sector or None,
+        'region': region or None
+    }, ranges=ranges, sort=sort)
     
-    if sector:
-        results = [ind for ind in results if ind['sector'] == sector]
+    return jsonify({
+        "status": "success",
+        "count": len(results),
+        "data": [project(ind, fields) for ind in results]
+    })
+
+# Rota de autocompletar
+@app.route('/api/industries/suggest', methods=['GET'])
+def suggest_industries():
+    """Endpoint de autocompletar: empresas, produtos, setores e países que começam com o texto digitado"""
+    prefix = request.args.get('prefix', '')
+    try:
+        limit = int(request.args.get('limit', 10))
+    except ValueError:
+        return jsonify({
+            "status": "error",
+            "message": "Parâmetro limit inválido"
+        }), 400
     
-    if region:
-        results = [ind for ind in results if ind['region'] == region]
+    results = g.dataset.suggest.suggest(prefix, limit)
     
     return jsonify({
         "status": "success",
@@ -222,6 +363,57 @@ def search_industries():
         "data": results
     })
 
+# Rota com as contagens por setor, país, região e status
+@app.route('/api/facets', methods=['GET'])
+def get_facets():
+    """Endpoint com o número de indústrias por setor, país, região e status"""
+    # Contagens lidas dos bitsets dos índices de atributos, sem varrer os registros
+    facets = {}
+    for field in ('sector', 'country', 'region', 'status'):
+        counts = g.dataset.index.counts(field)
+        facets[field] = [
+            {"name": name, "count": count}
+            for name, count in sorted(counts.items(), key=lambda item: (-item[1], item[0]))
+        ]
+    
+    return jsonify({
+        "status": "success",
+        "data": facets
+    })
+
+# Rota com os totais agregados por grupo
+@app.route('/api/stats', methods=['GET'])
+def get_stats():
+    """Endpoint com número de indústrias, funcionários e receita por setor, região, país ou status"""
+    group_by = request.args.get('group_by', 'sector')
+    if group_by not in GROUP_FIELDS:
+        return jsonify({
+            "status": "error",
+            "message": f"Agrupamento inválido. Use {', '.join(GROUP_FIELDS)}"
+        }), 400
+    
+    try:
+        ranges = parse_ranges(request.args)
+    except ValueError as e:
+        return jsonify({
+            "status": "error",
+            "message": str(e)
+        }), 400
+    
+    filters = {field: request.args.get(field) or None for field in GROUP_FIELDS}
+    
+    # Agregação vetorizada sobre as colunas numéricas, guardada por combinação de filtros
+    groups = g.dataset.stats.get(None, cache_key(group_by, filters, ranges), lambda: g.dataset.index.stats(
+        group_by, filters=filters, ranges=ranges
+    ))
+    
+    return jsonify({
+        "status": "success",
+        "group_by": group_by,
+        "count": len(groups),
+        "data": groups
+    })
+
 # Rota para listar todos os setores
 @app.route('/api/sectors', methods=['GET'])
 def get_sectors():
@@ -254,7 +446,12 @@ def api_info():
             "/api/health",
             "/api/industries",
             "/api/industries/<id>",
+            "/api/industries/batch",
+            "/api/industries/export",
             "/api/industries/search",
+            "/api/industries/suggest",
+            "/api/facets",
+            "/api/stats",
             "/api/sectors",
             "/api/countries"
         ]
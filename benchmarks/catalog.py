@@ -0,0 +1,161 @@
+"""
+Gerador determinístico de catálogos sintéticos de indústrias
+
+Produz N registros no formato de mock_data.mock_industries (id, nome, setor,
+país, estado, cidade, descrição, produtos, certificações, mercados de
+exportação, contato, status, location {lat, lng}, fundação, funcionários e
+receita no formato "$250M"). A mesma semente gera
+sempre o mesmo catálogo, para que os resultados dos benchmarks sejam
+comparáveis entre execuções.
+
+Uso:
+    python benchmarks/catalog.py 100000 [--seed 42] > catalogo.jsonl
+    python bulk.py catalogo.jsonl
+"""
+import argparse
+import json
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from regions import REGION_COUNTRIES
+from search_index import fold
+
+# Centro aproximado (lat, lng) e cidades de cada país da tabela de regiões
+COUNTRY_CENTERS = {
+    "Brasil": (-15.8, -47.9, [("São Paulo", "São Paulo"), ("Minas Gerais", "Belo Horizonte"), ("Paraná", "Curitiba")]),
+    "Argentina": (-34.6, -58.4, [("Buenos Aires", "Buenos Aires"), ("Córdoba", "Córdoba")]),
+    "Chile": (-33.4, -70.6, [("Santiago", "Santiago"), ("Valparaíso", "Valparaíso")]),
+    "Paraguai": (-25.3, -57.6, [("Central", "Assunção")]),
+    "Uruguai": (-34.9, -56.2, [("Montevidéu", "Montevidéu")]),
+    "Colômbia": (4.7, -74.1, [("Cundinamarca", "Bogotá"), ("Antioquia", "Medellín")]),
+    "Peru": (-12.0, -77.0, [("Lima", "Lima")]),
+    "Alemanha": (50.1, 8.7, [("Baviera", "Munique"), ("Hesse", "Frankfurt")]),
+    "Portugal": (39.4, -8.2, [("Porto", "Porto"), ("Lisboa", "Lisboa")]),
+    "França": (46.6, 2.2, [("Île-de-France", "Paris"), ("Auvergne-Rhône-Alpes", "Lyon")]),
+    "Espanha": (40.4, -3.7, [("Madri", "Madri"), ("Catalunha", "Barcelona")]),
+    "Itália": (42.5, 12.5, [("Lombardia", "Milão"), ("Piemonte", "Turim")]),
+    "Suécia": (59.3, 18.1, [("Estocolmo", "Estocolmo"), ("Gotemburgo", "Gotemburgo")]),
+    "Estados Unidos": (39.8, -98.6, [("Califórnia", "San Francisco"), ("Texas", "Houston"), ("Illinois", "Chicago")]),
+    "Canadá": (45.4, -75.7, [("Ontário", "Toronto"), ("Quebec", "Montreal")]),
+    "México": (23.6, -102.5, [("Nuevo León", "Monterrey"), ("Jalisco", "Guadalajara")]),
+    "Japão": (35.7, 139.7, [("Tóquio", "Tóquio"), ("Osaka", "Osaka")]),
+    "China": (31.2, 121.5, [("Xangai", "Xangai"), ("Guangdong", "Shenzhen")]),
+    "Índia": (19.1, 72.9, [("Maharashtra", "Mumbai"), ("Karnataka", "Bangalore")]),
+    "Coreia do Sul": (37.6, 127.0, [("Seul", "Seul"), ("Busan", "Busan")]),
+    "Singapura": (1.35, 103.8, [("Singapura", "Singapura")]),
+    "África do Sul": (-26.2, 28.0, [("Gauteng", "Joanesburgo"), ("Cabo Ocidental", "Cidade do Cabo")]),
+    "Egito": (30.0, 31.2, [("Cairo", "Cairo")]),
+    "Nigéria": (6.5, 3.4, [("Lagos", "Lagos")]),
+    "Gana": (5.6, -0.2, [("Grande Acra", "Acra")]),
+    "Austrália": (-33.9, 151.2, [("Nova Gales do Sul", "Sydney"), ("Vitória", "Melbourne")]),
+    "Nova Zelândia": (-36.8, 174.8, [("Auckland", "Auckland")])
+}
+
+# Setores e os termos usados para compor produtos e descrições de cada um
+SECTORS = {
+    "Manufatura": ["Componentes metálicos", "Peças usinadas", "Estruturas soldadas", "Sistemas de freio"],
+    "Tecnologia": ["Sistemas de automação", "Software de gestão", "Sensores inteligentes", "Soluções IoT"],
+    "Agronegócio": ["Fertilizantes orgânicos", "Sementes certificadas", "Sistemas de irrigação", "Defensivos biológicos"],
+    "Químico": ["Solventes industriais", "Aditivos para plásticos", "Catalisadores", "Resinas especiais"],
+    "Têxtil": ["Tecidos técnicos", "Fibras recicladas", "Malhas esportivas", "Tecidos antibacterianos"],
+    "Mineração": ["Minério de ferro", "Concentrado de cobre", "Agregados para construção", "Lítio"],
+    "Automotivo": ["Sistemas elétricos", "Componentes de motor", "Chicotes elétricos", "Baterias"],
+    "Farmacêutico": ["Medicamentos genéricos", "Insumos farmacêuticos", "Suplementos nutricionais", "Vacinas"],
+    "Energia": ["Painéis solares", "Turbinas eólicas", "Inversores de frequência", "Armazenamento de energia"],
+    "Alimentos": ["Alimentos processados", "Laticínios", "Bebidas", "Proteína animal"]
+}
+
+QUALIFIERS = ["de alta resistência", "sustentáveis", "de precisão", "para exportação", "premium",
+              "de baixo custo", "sob medida", "certificados", "de nova geração", "industriais"]
+
+NAME_PREFIXES = ["Global", "Nova", "Prime", "Alfa", "Delta", "Vertex", "Atlas", "Nexus", "Orion", "Sigma",
+                 "Terra", "Vale", "Rio", "Monte", "Sol", "Astra", "Polar", "Union", "Inova", "Max"]
+
+LEGAL_SUFFIXES = ["S.A.", "Ltda.", "Inc.", "GmbH", "Lda.", "S.L.", "Co.", "Group"]
+
+CERTIFICATIONS = ["ISO 9001", "ISO 14001", "ISO 27001", "ISO 45001", "IATF 16949", "REACH", "FSC",
+                  "OEKO-TEX Standard 100", "Rainforest Alliance", "GMP"]
+
+POSITIONS = ["Diretor de Exportação", "Gerente Comercial", "Export Director", "International Business Manager",
+             "Head of Sales"]
+
+FIRST_NAMES = ["Ana", "Carlos", "Maria", "João", "Sofia", "Lucas", "Emma", "Hans", "Yuki", "Wei", "Priya", "Kwame"]
+LAST_NAMES = ["Silva", "Santos", "Smith", "Müller", "Tanaka", "Chen", "Patel", "Mensah", "Rossi", "García"]
+
+# Status das indústrias: a maioria participa das combinações de parceiros
+STATUSES = ["available"] * 5 + ["seeking"] * 4 + ["inactive"]
+
+COUNTRIES = sorted(country for countries in REGION_COUNTRIES.values() for country in countries)
+
+
+def generate(count, seed=42):
+    """
+    Gera um catálogo sintético
+
+    Args:
+        count (int): Número de indústrias
+        seed (int): Semente do gerador (mesma semente, mesmo catálogo)
+
+    Yields:
+        dict: Indústria no formato de mock_data.mock_industries
+    """
+    rng = random.Random(seed)
+    # Porte das empresas em um gerador à parte, para não alterar os demais campos
+    # dos catálogos gerados antes de existirem esses campos
+    sizes = random.Random(f"{seed}:sizes")
+    sectors = sorted(SECTORS)
+    for number in range(1, count + 1):
+        sector = rng.choice(sectors)
+        country = rng.choice(COUNTRIES)
+        lat, lng, cities = COUNTRY_CENTERS[country]
+        state, city = rng.choice(cities)
+        nouns = SECTORS[sector]
+        products = [f"{noun} {rng.choice(QUALIFIERS)}" for noun in rng.sample(nouns, rng.randint(2, 4))]
+        first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+        name = f"{rng.choice(NAME_PREFIXES)} {sector} {number} {rng.choice(LEGAL_SUFFIXES)}"
+        slug = f"{rng.choice(NAME_PREFIXES).lower()}{number}"
+        employees = int(sizes.lognormvariate(5, 1.5)) + 1
+        revenue = max(1, round(employees * sizes.uniform(0.05, 0.4)))
+
+        yield {
+            "id": str(number),
+            "name": name,
+            "sector": sector,
+            "country": country,
+            "state": state,
+            "city": city,
+            "description": f"Fabricante de {nouns[0].lower()} e {nouns[1].lower()} {rng.choice(QUALIFIERS)}",
+            "products": products,
+            "certifications": rng.sample(CERTIFICATIONS, rng.randint(1, 3)),
+            "export_markets": rng.sample([c for c in COUNTRIES if c != country], rng.randint(1, 5)),
+            "contact_person": f"{first} {last}",
+            "position": rng.choice(POSITIONS),
+            "email": f"{fold(first)}.{fold(last)}@{slug}.example.com",
+            "phone": f"+{rng.randint(1, 99)} {rng.randint(10, 99)} {rng.randint(1000, 9999)}-{rng.randint(1000, 9999)}",
+            "website": f"https://www.{slug}.example.com",
+            "status": rng.choice(STATUSES),
+            "location": {
+                "lat": round(max(-89.9, min(89.9, lat + rng.uniform(-3, 3))), 4),
+                "lng": round(max(-179.9, min(179.9, lng + rng.uniform(-3, 3))), 4)
+            },
+            "founded": sizes.randint(1900, 2024),
+            "employees": employees,
+            "revenue": f"${revenue / 1000:g}B" if revenue >= 1000 else f"${revenue}M"
+        }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Gera um catálogo sintético de indústrias em JSONL")
+    parser.add_argument("count", type=int, help="número de indústrias (ex.: 1000 a 1000000)")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args(argv)
+
+    for industry in generate(args.count, args.seed):
+        sys.stdout.write(json.dumps(industry, ensure_ascii=False) + "\n")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,87 @@
+"""
+Benchmark de serialização JSON das respostas de listagem
+
+Compara o jsonify padrão do Flask (json da biblioteca padrão, com um hook
+para ObjectId/datetime, já que o provedor padrão não os suporta) com o
+FastJSONProvider para payloads de 100, 1.000 e 10.000 indústrias.
+
+Uso:
+    python benchmarks/json_serialization.py [--repeat 20]
+"""
+import argparse
+import copy
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bson import ObjectId
+from flask import Flask, jsonify
+from flask.json.provider import DefaultJSONProvider
+import json_provider
+from mock_data import mock_industries
+
+SIZES = (100, 1000, 10000)
+
+
+class StdlibJSONProvider(DefaultJSONProvider):
+    """Provedor padrão do Flask acrescido das conversões mínimas para documentos do MongoDB"""
+
+    @staticmethod
+    def default(value):
+        return json_provider.default(value)
+
+
+def build_rows(size):
+    """Gera documentos no formato do MongoDB (ObjectId, metadata com datetime, Decimal)"""
+    base = datetime(2024, 1, 1)
+    rows = []
+    for i in range(size):
+        row = copy.deepcopy(mock_industries[i % len(mock_industries)])
+        row["_id"] = ObjectId()
+        row["revenue_usd"] = Decimal("1250000.50") + i
+        row["metadata"] = {
+            "created_at": base + timedelta(minutes=i),
+            "updated_at": base + timedelta(minutes=2 * i),
+            "verified": bool(i % 2)
+        }
+        rows.append(row)
+    return rows
+
+
+def measure(app, rows, repeat):
+    """Menor tempo (ms) de jsonify sobre o payload, entre as repetições"""
+    best = float("inf")
+    with app.app_context():
+        for _ in range(repeat):
+            start = time.perf_counter()
+            jsonify({"count": len(rows), "results": rows}).get_data()
+            best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=20, help="repetições por cenário (vale o menor tempo)")
+    args = parser.parse_args(argv)
+
+    stdlib_app = Flask("stdlib")
+    stdlib_app.json = StdlibJSONProvider(stdlib_app)
+    fast_app = Flask("fast")
+    json_provider.init_app(fast_app)
+
+    backend = "orjson" if json_provider.orjson is not None else "json (orjson não instalado)"
+    print(f"FastJSONProvider usando {backend}")
+    print(f"{'linhas':>8} {'jsonify (ms)':>14} {'fast (ms)':>12} {'ganho':>8}")
+    for size in SIZES:
+        rows = build_rows(size)
+        baseline = measure(stdlib_app, rows, args.repeat)
+        fast = measure(fast_app, rows, args.repeat)
+        print(f"{size:>8} {baseline:>14.2f} {fast:>12.2f} {baseline / fast:>7.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,359 @@
+"""
+Benchmark de throughput e latência por rota (app.py e main.py)
+
+Gera um catálogo sintético com benchmarks/catalog.py, carrega-o no alvo
+escolhido e exercita cada rota pelo test client do Flask (mode=client) ou
+por um servidor HTTP real em uma thread (mode=http). O resultado sai em JSON
+no stdout (ou em --output), com requisições, erros, throughput e latências
+p50/p95/p99 de cada rota; --baseline compara com uma execução anterior.
+
+Alvos e bancos:
+    --target app                      app.py (dados em memória)
+    --target main --backend mock      main.py sem banco (fallback para dados simulados)
+    --target main --backend mongomock main.py sobre mongomock (pip install mongomock)
+    --target main --backend mongod    main.py sobre um mongod (--mongo-uri; usa o banco --db-name)
+
+Uso:
+    python benchmarks/suite.py --target main --backend mock --size 10000 \\
+        [--mode client|http] [--requests 200] [--concurrency 8] [--seed 42] \\
+        [--routes list,search_text] [--output atual.json] [--baseline base.json]
+"""
+import argparse
+import http.client
+import json
+import logging
+import os
+import platform
+import random
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+from urllib.parse import quote
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from catalog import COUNTRIES, SECTORS, generate
+from regions import REGION_COUNTRIES, region_of
+
+# Termos de busca sorteados a partir dos produtos do gerador
+SEARCH_TERMS = sorted({word.lower() for nouns in SECTORS.values() for noun in nouns for word in noun.split() if len(word) > 4})
+
+# Variação (%) acima da qual uma rota é marcada como regressão na comparação
+REGRESSION_THRESHOLD = 10.0
+
+
+def _pick(rng, context, key, count=1):
+    values = context[key]
+    return rng.choice(values) if count == 1 else ",".join(rng.sample(values, min(count, len(values))))
+
+
+def _near(rng, context):
+    lat, lng = rng.uniform(-40, 60), rng.uniform(-120, 140)
+    return f"/api/industries/near?lat={lat:.3f}&lng={lng:.3f}&radius_km=500&limit=50"
+
+
+def _clusters(rng, context):
+    west, south = rng.uniform(-180, 120), rng.uniform(-60, 30)
+    return f"/api/map/clusters?bbox={west:.2f},{south:.2f},{west + 60:.2f},{south + 30:.2f}&zoom=5"
+
+
+# Rotas de cada alvo: nome -> função (rng, contexto) que monta o caminho
+APP_ROUTES = {
+    "health": lambda rng, c: "/api/health",
+    "list": lambda rng, c: "/api/industries?fields=card",
+    "list_sector": lambda rng, c: f"/api/industries?sector={quote(_pick(rng, c, 'sectors'))}",
+    "detail": lambda rng, c: f"/api/industries/{_pick(rng, c, 'ids')}",
+    "batch": lambda rng, c: f"/api/industries/batch?ids={_pick(rng, c, 'ids', 20)}",
+    "search_text": lambda rng, c: f"/api/industries/search?q={quote(rng.choice(SEARCH_TERMS))}&fields=card",
+    "search_filters": lambda rng, c: (f"/api/industries/search?sector={quote(_pick(rng, c, 'sectors'))}"
+                                      f"&region={quote(_pick(rng, c, 'regions'))}"),
+    "list_range": lambda rng, c: (f"/api/industries?min_employees={rng.choice((50, 200, 1000))}"
+                                  f"&founded_from={rng.randint(1950, 2010)}&sort=-revenue&fields=card"),
+    "facets": lambda rng, c: "/api/facets",
+    "stats": lambda rng, c: (f"/api/stats?group_by={rng.choice(('sector', 'region', 'country', 'status'))}"
+                             f"&min_employees={rng.choice((0, 50, 200, 1000))}"),
+    "sectors": lambda rng, c: "/api/sectors",
+    "countries": lambda rng, c: "/api/countries",
+    "export": lambda rng, c: f"/api/industries/export?format=ndjson&sector={quote(_pick(rng, c, 'sectors'))}"
+}
+
+MAIN_ROUTES = {
+    "health": lambda rng, c: "/api/health",
+    "list": lambda rng, c: "/api/industries?limit=100",
+    "list_sector": lambda rng, c: f"/api/industries?sector={quote(_pick(rng, c, 'sectors'))}&limit=100",
+    "list_fields": lambda rng, c: "/api/industries?limit=100&fields=card",
+    "detail": lambda rng, c: f"/api/industries/{_pick(rng, c, 'ids')}",
+    "batch": lambda rng, c: f"/api/industries/batch?ids={_pick(rng, c, 'ids', 20)}",
+    "matches": lambda rng, c: f"/api/industries/{_pick(rng, c, 'ids')}/matches",
+    "search_text": lambda rng, c: f"/api/industries/search?q={quote(rng.choice(SEARCH_TERMS))}&limit=50",
+    "search_filters": lambda rng, c: (f"/api/industries/search?sector={quote(_pick(rng, c, 'sectors'))}"
+                                      f"&region={quote(_pick(rng, c, 'regions'))}&limit=50"),
+    "near": _near,
+    "clusters": _clusters,
+    "list_range": lambda rng, c: (f"/api/industries?min_employees={rng.choice((50, 200, 1000))}"
+                                  f"&founded_from={rng.randint(1950, 2010)}&sort=-revenue&limit=100&fields=card"),
+    "facets": lambda rng, c: "/api/facets",
+    "stats": lambda rng, c: (f"/api/stats?group_by={rng.choice(('sector', 'region', 'country', 'status'))}"
+                             f"&min_employees={rng.choice((0, 50, 200, 1000))}"),
+    "sectors": lambda rng, c: "/api/sectors",
+    "countries": lambda rng, c: "/api/countries",
+    "export": lambda rng, c: f"/api/industries/export?format=ndjson&sector={quote(_pick(rng, c, 'sectors'))}"
+}
+
+
+def build_app(records):
+    """Carrega o catálogo no app.py"""
+    import app as standalone
+    standalone.MOCK_INDUSTRIES[:] = [dict(record, region=region_of(record)) for record in records]
+    standalone.DATASET = standalone.Dataset(standalone.MOCK_INDUSTRIES)
+    return standalone.app, [record["id"] for record in records]
+
+
+def _load_mongo(database, records):
+    """Grava o catálogo e os dados derivados (facetas, clusters, parceiros) em um banco vazio"""
+    import bulk
+    import clusters
+    import facets
+    import matching
+    from database import COLLECTIONS
+    from indexes import ensure_indexes
+
+    for name in COLLECTIONS.values():
+        database[name].drop()
+
+    collection = database[COLLECTIONS['industries']]
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    ids, batch = [], []
+    for record in records:
+        document = bulk.normalize(record)[1]
+        document["metadata"] = {"created_at": now, "updated_at": now, "verified": False}
+        batch.append(document)
+        if len(batch) == 5000:
+            ids.extend(str(i) for i in collection.insert_many(batch).inserted_ids)
+            batch = []
+    if batch:
+        ids.extend(str(i) for i in collection.insert_many(batch).inserted_ids)
+
+    for step in (ensure_indexes, facets.rebuild, clusters.rebuild, matching.rebuild):
+        try:
+            step(database)
+        except Exception as e:
+            # mongomock não implementa todos os operadores (ex.: $text, 2dsphere)
+            print(f"aviso: {step.__module__}.{step.__name__} falhou: {e}", file=sys.stderr)
+    return ids
+
+
+def build_main(records, backend, mongo_uri, db_name):
+    """Carrega o catálogo no main.py com o banco escolhido"""
+    if backend == "mock":
+        # Endereço inacessível: main.py passa a usar os dados simulados
+        os.environ["MONGO_URI"] = "mongodb://127.0.0.1:1/"
+        os.environ["MONGO_SERVER_SELECTION_TIMEOUT_MS"] = "50"
+        os.environ["MONGO_RETRY_INTERVAL"] = "3600"
+        import mock_data
+        mock_data.mock_industries[:] = records
+        from main import app
+        return app, [record["id"] for record in records]
+
+    if backend == "mongod":
+        os.environ["MONGO_URI"] = mongo_uri
+        os.environ["DB_NAME"] = db_name
+        from database import db
+        from main import app
+        if not db.is_connected():
+            raise SystemExit(f"Não foi possível conectar em {mongo_uri}")
+        return app, _load_mongo(db.db, records)
+
+    import mongomock
+    from database import db
+    from main import app
+    client = mongomock.MongoClient()
+    db._client, db._db, db._pid = client, client[db_name], os.getpid()
+    return app, _load_mongo(db._db, records)
+
+
+def percentile(sorted_values, fraction):
+    """Percentil (posição mais próxima) de uma lista já ordenada"""
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(fraction * len(sorted_values)))]
+
+
+def summarize(latencies, errors, elapsed):
+    """Resumo de uma rota (latências em ms)"""
+    latencies = sorted(latencies)
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "throughput_rps": round(len(latencies) / elapsed, 2) if elapsed else 0.0,
+        "mean_ms": round(sum(latencies) / len(latencies) * 1000, 3) if latencies else 0.0,
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 3),
+        "p95_ms": round(percentile(latencies, 0.95) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 3)
+    }
+
+
+def run_client(app, paths):
+    """Executa as requisições em sequência pelo test client do Flask"""
+    client = app.test_client()
+    latencies, errors = [], 0
+    started = time.perf_counter()
+    for path in paths:
+        start = time.perf_counter()
+        response = client.get(path)
+        response.get_data()
+        latencies.append(time.perf_counter() - start)
+        errors += response.status_code >= 400
+    return summarize(latencies, errors, time.perf_counter() - started)
+
+
+def run_http(port, paths, concurrency):
+    """Executa as requisições com conexões persistentes concorrentes"""
+    latencies, errors = [], [0]
+    lock = threading.Lock()
+    shares = [paths[i::concurrency] for i in range(concurrency)]
+
+    def worker(share):
+        connection = http.client.HTTPConnection("127.0.0.1", port, timeout=60)
+        local, failed = [], 0
+        for path in share:
+            start = time.perf_counter()
+            try:
+                connection.request("GET", path)
+                response = connection.getresponse()
+                response.read()
+                failed += response.status >= 400
+            except (OSError, http.client.HTTPException):
+                failed += 1
+                connection.close()
+                connection = http.client.HTTPConnection("127.0.0.1", port, timeout=60)
+            local.append(time.perf_counter() - start)
+        connection.close()
+        with lock:
+            latencies.extend(local)
+            errors[0] += failed
+
+    threads = [threading.Thread(target=worker, args=(share,)) for share in shares if share]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return summarize(latencies, errors[0], time.perf_counter() - started)
+
+
+def compare(current, baseline):
+    """Imprime a variação de cada rota em relação a uma execução anterior"""
+    print(f"\n{'rota':<16} {'p50':>9} {'p95':>9} {'req/s':>9}", file=sys.stderr)
+    for name, result in current["routes"].items():
+        previous = baseline.get("routes", {}).get(name)
+        if not previous:
+            continue
+        delta = lambda key: (result[key] / previous[key] - 1) * 100 if previous[key] else 0.0
+        p50, p95, rate = delta("p50_ms"), delta("p95_ms"), delta("throughput_rps")
+        flag = "  REGRESSÃO" if p95 > REGRESSION_THRESHOLD or rate < -REGRESSION_THRESHOLD else ""
+        print(f"{name:<16} {p50:>+8.1f}% {p95:>+8.1f}% {rate:>+8.1f}%{flag}", file=sys.stderr)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark de throughput e latência por rota")
+    parser.add_argument("--target", choices=["app", "main"], default="main")
+    parser.add_argument("--backend", choices=["mock", "mongomock", "mongod"], default="mock",
+                        help="banco do main.py (ignorado para app)")
+    parser.add_argument("--mongo-uri", default="mongodb://localhost:27017")
+    parser.add_argument("--db-name", default="benchmark_industry", help="banco usado (e apagado) pelo benchmark")
+    parser.add_argument("--mode", choices=["client", "http"], default="client")
+    parser.add_argument("--size", type=int, default=10000, help="indústrias no catálogo (1000 a 1000000)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--requests", type=int, default=200, help="requisições por rota")
+    parser.add_argument("--warmup", type=int, default=10, help="requisições descartadas por rota")
+    parser.add_argument("--concurrency", type=int, default=8, help="conexões simultâneas (mode=http)")
+    parser.add_argument("--routes", help="rotas separadas por vírgula (padrão: todas)")
+    parser.add_argument("--output", help="arquivo para gravar o resultado em JSON")
+    parser.add_argument("--baseline", help="resultado anterior (JSON) para comparação")
+    args = parser.parse_args(argv)
+
+    # Logs por requisição (avisos do fallback sem banco, exceções contadas como
+    # erros) distorceriam as medições
+    logging.disable(logging.CRITICAL)
+
+    started = time.perf_counter()
+    records = list(generate(args.size, args.seed))
+    if args.target == "app":
+        app, ids = build_app(records)
+        routes = APP_ROUTES
+    else:
+        app, ids = build_main(records, args.backend, args.mongo_uri, args.db_name)
+        routes = MAIN_ROUTES
+    load_seconds = time.perf_counter() - started
+    print(f"catálogo de {args.size} indústrias carregado em {load_seconds:.1f}s", file=sys.stderr)
+
+    if args.routes:
+        routes = {name: routes[name] for name in args.routes.split(",")}
+
+    context = {
+        "ids": ids,
+        "sectors": sorted(SECTORS),
+        "countries": COUNTRIES,
+        "regions": sorted(REGION_COUNTRIES)
+    }
+
+    server = None
+    if args.mode == "http":
+        from werkzeug.serving import make_server
+        server = make_server("127.0.0.1", 0, app, threaded=True)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    results = {}
+    try:
+        for name, build_path in routes.items():
+            # Caminhos sorteados com uma semente por rota: a mesma sequência em toda execução
+            rng = random.Random(f"{args.seed}:{name}")
+            paths = [build_path(rng, context) for _ in range(args.warmup + args.requests)]
+            if args.mode == "client":
+                run_client(app, paths[:args.warmup])
+                results[name] = run_client(app, paths[args.warmup:])
+            else:
+                run_http(server.server_port, paths[:args.warmup], args.concurrency)
+                results[name] = run_http(server.server_port, paths[args.warmup:], args.concurrency)
+            result = results[name]
+            print(f"{name:<16} {result['throughput_rps']:>9.1f} req/s  p50 {result['p50_ms']:>8.2f} ms  "
+                  f"p95 {result['p95_ms']:>8.2f} ms  p99 {result['p99_ms']:>8.2f} ms  erros {result['errors']}",
+                  file=sys.stderr)
+    finally:
+        if server is not None:
+            server.shutdown()
+
+    report = {
+        "meta": {
+            "target": args.target,
+            "backend": args.backend if args.target == "main" else None,
+            "mode": args.mode,
+            "size": args.size,
+            "seed": args.seed,
+            "requests": args.requests,
+            "concurrency": args.concurrency if args.mode == "http" else 1,
+            "load_seconds": round(load_seconds, 2),
+            "python": platform.python_version(),
+            "timestamp": datetime.now(timezone.utc).isoformat()
+        },
+        "routes": results
+    }
+
+    output = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            compare(report, json.load(f))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,269 @@
+import argparse
+import json
+import logging
+import sys
+import time
+from datetime import datetime
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+from database import db, COLLECTIONS
+import clusters
+import facets
+import geo
+from numeric import parse_revenue
+from regions import region_of
+
+# Configuração de logging
+logger = logging.getLogger(__name__)
+
+# Registros enviados ao MongoDB por chamada de bulk_write
+DEFAULT_CHUNK_SIZE = 1000
+
+# Limite de registros aceitos por chamada de POST /api/industries/bulk
+MAX_BULK_RECORDS = 5000
+
+# Limite de erros detalhados no relatório (o total continua em "failed")
+MAX_REPORTED_ERRORS = 1000
+
+# Campos obrigatórios de cada registro (id é o identificador externo do parceiro)
+REQUIRED_FIELDS = ("id", "name", "sector", "description")
+
+
+class InvalidRecord:
+    """Marca uma entrada que não pôde nem ser lida (por exemplo, JSON inválido)"""
+
+    def __init__(self, message):
+        self.message = message
+
+
+def validate(record):
+    """
+    Valida um registro de entrada
+
+    Args:
+        record (dict): Registro no formato de mock_data.mock_industries
+
+    Returns:
+        str: Descrição do problema, ou None se o registro for válido
+    """
+    if isinstance(record, InvalidRecord):
+        return record.message
+    if not isinstance(record, dict):
+        return "Registro deve ser um objeto JSON"
+    for field in REQUIRED_FIELDS:
+        if record.get(field) in (None, ""):
+            return f"Campo obrigatório ausente: {field}"
+    if not isinstance(record["id"], (str, int)) or isinstance(record["id"], bool):
+        return "Campo id deve ser texto ou número"
+    if "location" in record and not isinstance(record["location"], dict):
+        return "Campo location deve ser um objeto"
+    return None
+
+
+def normalize(record):
+    """
+    Converte um registro de entrada no documento gravado no MongoDB
+
+    O id do parceiro vira external_id (chave das upserts), o país também é
+    gravado em location.country, campo usado pelos filtros e índices, a
+    região é derivada do país, a receita é convertida para revenue_usd e as
+    coordenadas viram o ponto GeoJSON do campo geo.
+
+    Args:
+        record (dict): Registro válido
+
+    Returns:
+        tuple: (external_id, documento para o $set)
+    """
+    document = {key: value for key, value in record.items() if key not in ("id", "_id", "metadata")}
+    external_id = str(record["id"])
+    document["external_id"] = external_id
+    if record.get("country"):
+        document["location"] = {**(record.get("location") or {}), "country": record["country"]}
+    document["region"] = region_of(document)
+    if "revenue" in record:
+        document["revenue_usd"] = parse_revenue(record["revenue"])
+    document["geo"] = geo.geo_point(record)
+    return external_id, document
+
+
+def _chunks(records, size):
+    """Agrupa os registros em listas de até size itens"""
+    chunk = []
+    for record in records:
+        chunk.append(record)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _write_chunk(collection, chunk, offset, report):
+    """Valida e grava um lote; erros de registros individuais não interrompem o lote"""
+
+    def fail(index, external_id, message):
+        report["failed"] += 1
+        if len(report["errors"]) < MAX_REPORTED_ERRORS:
+            report["errors"].append({"index": index, "id": external_id, "error": message})
+
+    # Registros válidos por external_id; em ids repetidos no lote, vale o último
+    pending = {}
+    for position, record in enumerate(chunk, start=offset):
+        problem = validate(record)
+        if problem:
+            fail(position, record.get("id") if isinstance(record, dict) else None, problem)
+            continue
+        external_id, document = normalize(record)
+        if external_id in pending:
+            fail(pending[external_id][0], external_id, "id repetido no mesmo lote; mantido o último registro")
+        pending[external_id] = (position, document)
+
+    if not pending:
+        return
+
+    # Estado anterior, para ajustar as facetas e a grade do mapa sem recalculá-las
+    previous = {
+        document["external_id"]: document
+        for document in collection.find(
+            {"external_id": {"$in": list(pending)}},
+            {field: 1 for field in facets.SOURCE_FIELDS | {"external_id"}}
+        )
+    }
+
+    now = datetime.utcnow()
+    keys = list(pending)
+    operations = [
+        UpdateOne(
+            {"external_id": external_id},
+            {
+                "$set": {**pending[external_id][1], "metadata.updated_at": now},
+                "$setOnInsert": {"metadata.created_at": now, "metadata.verified": False}
+            },
+            upsert=True
+        )
+        for external_id in keys
+    ]
+
+    failed = set()
+    try:
+        result = collection.bulk_write(operations, ordered=False)
+        inserted, updated = result.upserted_count, result.matched_count
+    except BulkWriteError as e:
+        # Com ordered=False, o MongoDB tenta todas as operações e lista as que falharam
+        details = e.details
+        inserted, updated = details.get("nUpserted", 0), details.get("nMatched", 0)
+        for error in details.get("writeErrors", []):
+            external_id = keys[error["index"]]
+            failed.add(external_id)
+            fail(pending[external_id][0], external_id, error.get("errmsg", "Erro de escrita"))
+
+    report["inserted"] += inserted
+    report["updated"] += updated
+
+    changes = [
+        (previous.get(external_id), {**previous.get(external_id, {}), **pending[external_id][1]})
+        for external_id in keys
+        if external_id not in failed
+    ]
+    facets.apply_deltas(changes)
+    clusters.apply_deltas(changes)
+
+
+def ingest(records, chunk_size=DEFAULT_CHUNK_SIZE, on_progress=None):
+    """
+    Grava registros em lote com upserts pelo identificador externo
+
+    Cada lote é validado e enviado em um único bulk_write não ordenado;
+    registros inválidos ou com erro de escrita são relatados individualmente.
+
+    Args:
+        records (iterable): Registros no formato de mock_data.mock_industries
+        chunk_size (int): Registros por chamada de bulk_write
+        on_progress (callable): Chamado com o relatório parcial após cada lote
+
+    Returns:
+        dict: Relatório com received, inserted, updated, failed, errors,
+        elapsed (segundos) e rate (registros por segundo)
+
+    Raises:
+        RuntimeError: Se o banco de dados não estiver disponível
+    """
+    collection = db.get_collection(COLLECTIONS['industries'])
+    if collection is None:
+        raise RuntimeError("Banco de dados não disponível")
+
+    report = {"received": 0, "inserted": 0, "updated": 0, "failed": 0, "errors": [], "elapsed": 0.0, "rate": 0.0}
+    started = time.perf_counter()
+
+    for chunk in _chunks(records, max(1, chunk_size)):
+        _write_chunk(collection, chunk, report["received"], report)
+        report["received"] += len(chunk)
+        report["elapsed"] = round(time.perf_counter() - started, 3)
+        report["rate"] = round(report["received"] / report["elapsed"], 1) if report["elapsed"] else 0.0
+        if on_progress:
+            on_progress(report)
+
+    return report
+
+
+def read_jsonl(stream):
+    """
+    Lê um arquivo JSONL sob demanda, uma linha por registro
+
+    Args:
+        stream: Arquivo aberto em modo texto
+
+    Yields:
+        dict: Registro lido, ou InvalidRecord para linhas que não são JSON válido
+    """
+    for number, line in enumerate(stream, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield json.loads(line)
+        except ValueError as e:
+            yield InvalidRecord(f"JSON inválido na linha {number}: {e}")
+
+
+def main(argv=None):
+    """Linha de comando: python bulk.py arquivo.jsonl [--chunk-size N]"""
+    parser = argparse.ArgumentParser(description="Carrega indústrias de um arquivo JSONL")
+    parser.add_argument("path", help="Arquivo JSONL (um registro por linha; - para a entrada padrão)")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE,
+                        help=f"Registros por bulk_write (padrão: {DEFAULT_CHUNK_SIZE})")
+    args = parser.parse_args(argv)
+
+    if not db.is_connected():
+        logger.error("Banco de dados não disponível")
+        return 2
+
+    def progress(report):
+        logger.info(
+            f"{report['received']} registros ({report['inserted']} novos, {report['updated']} atualizados, "
+            f"{report['failed']} com erro) - {report['rate']} registros/s"
+        )
+
+    stream = sys.stdin if args.path == "-" else open(args.path, encoding="utf-8")
+    try:
+        report = ingest(read_jsonl(stream), args.chunk_size, progress)
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+
+    if report["inserted"] or report["updated"]:
+        from http_cache import versions
+        versions.bump(COLLECTIONS['industries'])
+
+    for error in report["errors"]:
+        logger.error(f"Registro {error['index']} (id {error['id']}): {error['error']}")
+    logger.info(f"Carga concluída em {report['elapsed']}s: {report['received']} registros, {report['failed']} com erro")
+    if report["inserted"] or report["updated"]:
+        logger.info("Parceiros sugeridos não são atualizados pela carga: rode python matching.py rebuild")
+    return 1 if report["failed"] else 0
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO)
+    sys.exit(main())
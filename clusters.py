@@ -0,0 +1,404 @@
+import argparse
+import logging
+import sys
+from datetime import datetime
+from pymongo import ReplaceOne, UpdateOne
+from pymongo.errors import BulkWriteError, PyMongoError
+from database import db, COLLECTIONS
+from geo import coordinates
+
+# Configuração de logging
+logger = logging.getLogger(__name__)
+
+# Tamanho (graus) das células no nível 0; cada nível divide a célula por 2.
+# Com mapas em blocos de 256 px, cada célula ocupa cerca de 32 px na tela.
+BASE_CELL_DEGREES = 45.0
+
+# Nível mais detalhado da grade (células de ~1,2 km no equador)
+MAX_ZOOM = 12
+
+# Células que uma consulta pode abranger; acima disso, usa um nível menos detalhado
+MAX_GRID_CELLS = 4096
+
+# Código do MongoDB para chave duplicada (upsert em célula alterada durante o rebuild)
+DUPLICATE_KEY = 11000
+
+
+def cell_degrees(zoom):
+    """Tamanho das células (graus) em um nível da grade"""
+    return BASE_CELL_DEGREES / (2 ** zoom)
+
+
+def cell_of(lat, lng, zoom):
+    """
+    Célula que contém um ponto
+
+    Returns:
+        tuple: (linha, coluna), contadas a partir de (-90, -180)
+    """
+    size = cell_degrees(zoom)
+    rows, columns = int(180 / size), int(360 / size)
+    return min(int((lat + 90) / size), rows - 1), min(int((lng + 180) / size), columns - 1)
+
+
+def parse_bbox(value):
+    """
+    Interpreta o parâmetro bbox=oeste,sul,leste,norte (graus)
+
+    Oeste maior que leste indica uma área que cruza o antimeridiano.
+
+    Args:
+        value (str): Valor recebido na query string
+
+    Returns:
+        tuple: (oeste, sul, leste, norte)
+
+    Raises:
+        ValueError: Se o valor estiver malformado ou fora dos limites
+    """
+    try:
+        west, south, east, north = (float(part) for part in value.split(","))
+    except (AttributeError, ValueError):
+        raise ValueError("bbox deve ser oeste,sul,leste,norte")
+    if not (-180 <= west <= 180 and -180 <= east <= 180 and -90 <= south <= north <= 90):
+        raise ValueError("bbox fora dos limites")
+    return west, south, east, north
+
+
+def cell_ranges(bbox, zoom):
+    """
+    Faixas de células cobertas por uma área
+
+    Returns:
+        tuple: ((linha inicial, linha final), [(coluna inicial, coluna final), ...])
+    """
+    west, south, east, north = bbox
+    first_row, first_column = cell_of(south, west, zoom)
+    last_row, last_column = cell_of(north, east, zoom)
+    if west <= east:
+        return (first_row, last_row), [(first_column, last_column)]
+    # Cruza o antimeridiano: do oeste até 180 e de -180 até o leste
+    return (first_row, last_row), [(first_column, cell_of(0, 180, zoom)[1]), (0, last_column)]
+
+
+def choose_zoom(bbox, zoom):
+    """
+    Nível da grade para uma consulta: o pedido, limitado a MAX_ZOOM e reduzido
+    até que a área abranja no máximo MAX_GRID_CELLS células
+
+    Args:
+        bbox (tuple): (oeste, sul, leste, norte)
+        zoom (int): Zoom do mapa
+
+    Returns:
+        int: Nível da grade
+    """
+    zoom = max(0, min(zoom, MAX_ZOOM))
+    while zoom > 0:
+        (first_row, last_row), column_ranges = cell_ranges(bbox, zoom)
+        columns = sum(last - first + 1 for first, last in column_ranges)
+        if (last_row - first_row + 1) * columns <= MAX_GRID_CELLS:
+            break
+        zoom -= 1
+    return zoom
+
+
+def _sector_key(sector):
+    """
+    Nome do setor como chave de subdocumento (sem '.' nem '$' iniciais)
+
+    O nome original fica em sector_names, com a mesma chave, para que o setor
+    devolvido seja o mesmo com e sem banco.
+    """
+    return str(sector).replace(".", "_").lstrip("$") or "_"
+
+
+def _format(count, lat_sum, lng_sum, sectors):
+    """Cluster no formato da API: centróide, total e setor predominante"""
+    dominant = max(sectors.items(), key=lambda item: (item[1], item[0]))[0] if sectors else None
+    return {
+        "lat": round(lat_sum / count, 6),
+        "lng": round(lng_sum / count, 6),
+        "count": count,
+        "sector": dominant
+    }
+
+
+def _contributions(industry):
+    """Células (em todos os níveis) às quais uma indústria pertence"""
+    point = coordinates(industry)
+    if point is None:
+        return []
+    lat, lng = point
+    sector = industry.get("sector")
+    return [(zoom, cell_of(lat, lng, zoom), lat, lng, sector) for zoom in range(MAX_ZOOM + 1)]
+
+
+class ClusterGrid:
+    """
+    Grade em vários níveis com total, soma das coordenadas e contagem por
+    setor de cada célula ocupada
+
+    Usada sobre os dados simulados e para recalcular a coleção map_clusters.
+    """
+
+    def __init__(self, records=()):
+        self.levels = [{} for _ in range(MAX_ZOOM + 1)]
+        for record in records:
+            self.add(record)
+
+    def add(self, industry, sign=1):
+        """
+        Soma (ou, com sign=-1, remove) uma indústria de todas as células que a contêm
+
+        Args:
+            industry (dict): Registro com location: {lat, lng}
+            sign (int): 1 para incluir, -1 para remover
+        """
+        for zoom, cell, lat, lng, sector in _contributions(industry):
+            entry = self.levels[zoom].setdefault(cell, [0, 0.0, 0.0, {}])
+            entry[0] += sign
+            entry[1] += sign * lat
+            entry[2] += sign * lng
+            if sector is not None:
+                entry[3][sector] = entry[3].get(sector, 0) + sign
+            if entry[0] <= 0:
+                del self.levels[zoom][cell]
+
+    def clusters(self, bbox, zoom):
+        """
+        Clusters das células ocupadas dentro de uma área
+
+        Args:
+            bbox (tuple): (oeste, sul, leste, norte)
+            zoom (int): Nível da grade (já limitado por choose_zoom)
+
+        Returns:
+            list: Clusters, do maior para o menor
+        """
+        (first_row, last_row), column_ranges = cell_ranges(bbox, zoom)
+        level = self.levels[zoom]
+        # Consulta só as células da área (no máximo MAX_GRID_CELLS, ver choose_zoom)
+        cells = (
+            (row, column)
+            for row in range(first_row, last_row + 1)
+            for first, last in column_ranges
+            for column in range(first, last + 1)
+        )
+        results = []
+        for cell in cells:
+            entry = level.get(cell)
+            if entry is not None:
+                count, lat_sum, lng_sum, sectors = entry
+                results.append(_format(count, lat_sum, lng_sum, {k: v for k, v in sectors.items() if v > 0}))
+        results.sort(key=lambda cluster: -cluster["count"])
+        return results
+
+
+def apply_delta(old=None, new=None):
+    """
+    Ajusta as células após uma escrita: remove o documento antigo e soma o novo
+
+    Args:
+        old (dict): Documento antes da escrita (None em inserções)
+        new (dict): Documento depois da escrita (None em remoções)
+    """
+    apply_deltas([(old, new)])
+
+
+def apply_deltas(changes):
+    """
+    Ajusta as células após várias escritas, com uma única operação em lote
+
+    Args:
+        changes (iterable): Pares (documento antes, documento depois) de cada escrita
+    """
+    collection = db.get_collection(COLLECTIONS['map_clusters'])
+    if collection is None:
+        return
+
+    deltas = {}
+    names = {}
+    for old, new in changes:
+        for document, sign in ((old, -1), (new, 1)):
+            if document is None:
+                continue
+            for zoom, (row, column), lat, lng, sector in _contributions(document):
+                entry = deltas.setdefault((zoom, row, column), {"count": 0, "lat_sum": 0.0, "lng_sum": 0.0})
+                entry["count"] += sign
+                entry["lat_sum"] += sign * lat
+                entry["lng_sum"] += sign * lng
+                if sector is not None:
+                    key = _sector_key(sector)
+                    entry[f"sectors.{key}"] = entry.get(f"sectors.{key}", 0) + sign
+                    names.setdefault((zoom, row, column), {})[f"sector_names.{key}"] = sector
+
+    # Marca as células alteradas, para que um rebuild em andamento não as sobrescreva
+    now = datetime.utcnow()
+    operations = [
+        UpdateOne(
+            {"_id": f"{zoom}:{row}:{column}"},
+            {
+                "$inc": delta,
+                "$set": {"zoom": zoom, "row": row, "col": column, "updated_at": now,
+                         **names.get((zoom, row, column), {})}
+            },
+            upsert=True
+        )
+        for (zoom, row, column), delta in deltas.items()
+        if any(delta.values())
+    ]
+    if not operations:
+        return
+    try:
+        collection.bulk_write(operations, ordered=False)
+    except PyMongoError as e:
+        # A escrita principal já foi feita; o próximo rebuild corrige a grade
+        logger.error(f"Erro ao atualizar clusters do mapa: {e}")
+
+
+def get_clusters(bbox, zoom):
+    """
+    Recupera os clusters de uma área do mapa
+
+    No MongoDB, lê a coleção map_clusters mantida por apply_delta (nunca a
+    coleção de indústrias); sem banco, usa a grade em memória dos dados simulados.
+
+    Args:
+        bbox (tuple): (oeste, sul, leste, norte)
+        zoom (int): Zoom do mapa
+
+    Returns:
+        tuple: (nível da grade usado, lista de clusters)
+    """
+    zoom = choose_zoom(bbox, zoom)
+    collection = db.get_collection(COLLECTIONS['map_clusters'])
+
+    if collection is not None:
+        (first_row, last_row), column_ranges = cell_ranges(bbox, zoom)
+        query = {
+            "zoom": zoom,
+            "row": {"$gte": first_row, "$lte": last_row},
+            "$or": [{"col": {"$gte": first, "$lte": last}} for first, last in column_ranges],
+            "count": {"$gt": 0}
+        }
+        projection = {"count": 1, "lat_sum": 1, "lng_sum": 1, "sectors": 1, "sector_names": 1}
+        results = []
+        for document in collection.find(query, projection):
+            names = document.get("sector_names") or {}
+            sectors = {names.get(k, k): v for k, v in (document.get("sectors") or {}).items() if v > 0}
+            results.append(_format(document["count"], document["lat_sum"], document["lng_sum"], sectors))
+        results.sort(key=lambda cluster: -cluster["count"])
+        return zoom, results
+
+    from models import get_mock_dataset
+    return zoom, get_mock_dataset().cluster_grid().clusters(bbox, zoom)
+
+
+def rebuild(database):
+    """
+    Recalcula a grade inteira a partir das indústrias
+
+    Usado para a carga inicial e para corrigir eventuais divergências; as
+    requisições nunca disparam este recálculo.
+
+    As escritas feitas durante a leitura das indústrias continuam ajustando
+    a coleção (apply_deltas marca as células com updated_at). Essas células
+    não são substituídas nem removidas pelo rebuild; como os ajustes já estão
+    nelas, só divergem se já divergiam antes, e o próximo rebuild as corrige.
+
+    Args:
+        database: Banco de dados do MongoDB
+
+    Returns:
+        int: Número de células gravadas
+    """
+    started_at = datetime.utcnow()
+    grid = ClusterGrid()
+    cursor = database[COLLECTIONS['industries']].find(
+        {"location.lat": {"$exists": True}}, {"location": 1, "sector": 1}
+    )
+    for industry in cursor:
+        grid.add(industry)
+
+    documents = [
+        {
+            "_id": f"{zoom}:{row}:{column}", "zoom": zoom, "row": row, "col": column,
+            "count": count, "lat_sum": lat_sum, "lng_sum": lng_sum,
+            "rebuilt_at": started_at, "updated_at": started_at,
+            "sectors": {_sector_key(sector): total for sector, total in sectors.items() if total > 0},
+            "sector_names": {_sector_key(sector): sector for sector, total in sectors.items() if total > 0}
+        }
+        for zoom, level in enumerate(grid.levels)
+        for (row, column), (count, lat_sum, lng_sum, sectors) in level.items()
+    ]
+    # Substitui os documentos sem esvaziar a coleção, para não expor um mapa vazio;
+    # células alteradas desde o início ficam de fora do filtro ($not também aceita
+    # células sem updated_at) e o upsert delas falha com chave duplicada
+    collection = database[COLLECTIONS['map_clusters']]
+    untouched = {"$not": {"$gte": started_at}}
+    written = 0
+    for start in range(0, len(documents), 1000):
+        batch = documents[start:start + 1000]
+        try:
+            collection.bulk_write(
+                [ReplaceOne({"_id": d["_id"], "updated_at": untouched}, d, upsert=True) for d in batch],
+                ordered=False
+            )
+            written += len(batch)
+        except BulkWriteError as e:
+            errors = e.details.get("writeErrors", [])
+            if any(error.get("code") != DUPLICATE_KEY for error in errors):
+                raise
+            written += len(batch) - len(errors)
+    # Remove as células que sumiram da grade, exceto as criadas ou alteradas durante o rebuild
+    collection.delete_many({"rebuilt_at": {"$ne": started_at}, "updated_at": untouched})
+    return written
+
+
+def seed(database):
+    """
+    Monta a grade quando a coleção map_clusters ainda está vazia
+
+    Etapa de deploy (python clusters.py seed), como facets.seed: bancos que
+    já tinham indústrias passam a responder /api/map/clusters. Com a grade já
+    montada, não faz nada.
+
+    Args:
+        database: Banco de dados do MongoDB
+
+    Returns:
+        int: Número de células gravadas (0 se não havia o que montar)
+    """
+    if database[COLLECTIONS['map_clusters']].find_one({}, {"_id": 1}) is not None:
+        return 0
+    if database[COLLECTIONS['industries']].find_one({"location.lat": {"$exists": True}}, {"_id": 1}) is None:
+        return 0
+    return rebuild(database)
+
+
+def main(argv=None):
+    """Linha de comando: python clusters.py rebuild|seed"""
+    parser = argparse.ArgumentParser(description="Gerencia a grade de clusters do mapa")
+    parser.add_argument("command", choices=["rebuild", "seed"],
+                        help="rebuild recalcula todas as células; seed só monta a grade se a coleção estiver vazia")
+    args = parser.parse_args(argv)
+
+    if not db.is_connected():
+        logger.error("Banco de dados não disponível")
+        return 2
+
+    if args.command == "seed":
+        total = seed(db.db)
+        logger.info(f"Clusters do mapa montados a partir das indústrias existentes: {total} células" if total
+                    else "Clusters do mapa já montados (ou banco sem coordenadas): nada a fazer")
+        return 0
+
+    total = rebuild(db.db)
+    logger.info(f"Clusters do mapa recalculados: {total} células")
+    return 0
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO)
+    sys.exit(main())
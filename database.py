@@ -1,6 +1,8 @@
-from pymongo import MongoClient
+from pymongo import MongoClient, monitoring
 from dotenv import load_dotenv
 import os
+import time
+import threading
 import logging
 
 # Configuração de logging
@@ -10,58 +12,265 @@ logger = logging.getLogger(__name__)
 # Carrega variáveis de ambiente
 load_dotenv()
 
+
+class PoolStats(monitoring.ConnectionPoolListener):
+    """Contadores do pool de conexões, alimentados pelos eventos do pymongo"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """Zera os contadores (usado ao recriar o cliente em um novo processo)"""
+        with self._lock:
+            self._counters = {
+                "checked_out": 0,
+                "waiting": 0,
+                "created": 0,
+                "closed": 0,
+                "check_out_failed": 0,
+                "pool_cleared": 0
+            }
+
+    def _add(self, name, value=1):
+        with self._lock:
+            self._counters[name] += value
+
+    def snapshot(self):
+        """
+        Retorna uma cópia dos contadores atuais
+
+        Returns:
+            dict: checked_out, waiting, created, closed, check_out_failed, pool_cleared
+        """
+        with self._lock:
+            return dict(self._counters)
+
+    # Eventos do pool (pymongo.monitoring.ConnectionPoolListener)
+
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        self._add("pool_cleared")
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_created(self, event):
+        self._add("created")
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        self._add("closed")
+
+    def connection_check_out_started(self, event):
+        self._add("waiting")
+
+    def connection_check_out_failed(self, event):
+        with self._lock:
+            self._counters["waiting"] -= 1
+            self._counters["check_out_failed"] += 1
+
+    def connection_checked_out(self, event):
+        with self._lock:
+            self._counters["waiting"] -= 1
+            self._counters["checked_out"] += 1
+
+    def connection_checked_in(self, event):
+        self._add("checked_out", -1)
+
+
 class Database:
-    """Classe para gerenciar conexão com o MongoDB"""
-    
-    _instance = None
-    
-    def __new__(cls):
-        """Implementação de Singleton para garantir uma única conexão"""
-        if cls._instance is None:
-            cls._instance = super(Database, cls).__new__(cls)
-            cls._instance._initialize_connection()
-        return cls._instance
-    
+    """
+    Classe para gerenciar conexão com o MongoDB
+
+    O cliente é criado sob demanda, no primeiro acesso, e recriado quando o
+    processo muda (por exemplo, nos workers do gunicorn após o fork), pois um
+    MongoClient herdado do processo pai não é seguro para uso no filho.
+    """
+
+    def __init__(self):
+        self.mongo_uri = os.getenv('MONGO_URI', 'mongodb://localhost:27017')
+        self.db_name = os.getenv('DB_NAME', 'businesses_industry')
+
+        # Configuração do pool de conexões
+        self.max_pool_size = int(os.getenv('MONGO_MAX_POOL_SIZE', 100))
+        self.min_pool_size = int(os.getenv('MONGO_MIN_POOL_SIZE', 0))
+        self.wait_queue_timeout_ms = int(os.getenv('MONGO_WAIT_QUEUE_TIMEOUT_MS', 2000))
+        self.server_selection_timeout_ms = int(os.getenv('MONGO_SERVER_SELECTION_TIMEOUT_MS', 5000))
+
+        # Intervalo mínimo entre tentativas de conexão após uma falha
+        self.retry_interval = float(os.getenv('MONGO_RETRY_INTERVAL', 30))
+
+        self.pool_stats = PoolStats()
+        self._event_listeners = []
+        self._on_connect = []
+        self._lock = threading.Lock()
+        self._pid = None
+        self._client = None
+        self._db = None
+        self._failed_at = None
+        self._reconnecting = False
+
+    def _ensure_connection(self):
+        """
+        Cria o cliente deste processo, se ainda não existir
+
+        A primeira tentativa do processo é feita na própria chamada. As novas
+        tentativas após uma falha rodam numa thread em segundo plano: até o
+        ping responder (ou esgotar o tempo), as requisições seguem com os
+        dados simulados em vez de esperar pela conexão.
+        """
+        pid = os.getpid()
+        if self._pid == pid and (self._db is not None or not self._should_retry()):
+            return
+
+        with self._lock:
+            if self._pid == pid and (self._db is not None or not self._should_retry()):
+                return
+
+            if self._pid == pid:
+                self._reconnecting = True
+                threading.Thread(target=self._reconnect, name="mongo-reconnect", daemon=True).start()
+                return
+
+            # Cliente herdado do processo pai: descartado sem fechar, pois os
+            # sockets pertencem ao pai
+            self._client = None
+            self._db = None
+            self._failed_at = None
+            self._reconnecting = False
+            self.pool_stats.reset()
+
+            self._pid = pid
+            self._initialize_connection()
+
+    def _reconnect(self):
+        """Nova tentativa de conexão após uma falha (thread em segundo plano)"""
+        try:
+            self._initialize_connection()
+        finally:
+            self._reconnecting = False
+
+    def _should_retry(self):
+        """Indica se já passou o intervalo de espera desde a última falha"""
+        return (
+            not self._reconnecting
+            and self._failed_at is not None
+            and time.monotonic() - self._failed_at >= self.retry_interval
+        )
+
     def _initialize_connection(self):
         """Inicializa a conexão com o MongoDB"""
+        client = None
         try:
-            # Obtém a string de conexão das variáveis de ambiente ou usa um valor padrão para desenvolvimento
-            mongo_uri = os.getenv('MONGO_URI', 'mongodb://localhost:27017')
-            db_name = os.getenv('DB_NAME', 'businesses_industry')
-            
             # Cria a conexão com o MongoDB
-            self.client = MongoClient(mongo_uri)
-            self.db = self.client[db_name]
-            
+            client = MongoClient(
+                self.mongo_uri,
+                maxPoolSize=self.max_pool_size,
+                minPoolSize=self.min_pool_size,
+                waitQueueTimeoutMS=self.wait_queue_timeout_ms,
+                serverSelectionTimeoutMS=self.server_selection_timeout_ms,
+                event_listeners=[self.pool_stats] + self._event_listeners
+            )
+
             # Verifica se a conexão está funcionando
-            self.client.admin.command('ping')
-            logger.info(f"Conectado ao MongoDB: {db_name}")
-            
+            client.admin.command('ping')
+            self._client = client
+            self._db = client[self.db_name]
+            self._failed_at = None
+            logger.info(f"Conectado ao MongoDB: {self.db_name} (pid {self._pid})")
+
+            for callback in self._on_connect:
+                try:
+                    callback(self._db)
+                except Exception as e:
+                    logger.error(f"Erro ao executar rotina de conexão {callback.__name__}: {e}")
+
         except Exception as e:
             logger.error(f"Erro ao conectar ao MongoDB: {e}")
+            if client is not None:
+                client.close()
             # Em caso de erro, configura para usar dados simulados
-            self.client = None
-            self.db = None
-    
+            self._client = None
+            self._db = None
+            self._failed_at = time.monotonic()
+
+    def on_connect(self, callback):
+        """
+        Registra uma rotina executada sempre que um novo cliente é conectado
+
+        Args:
+            callback (callable): Função que recebe o banco de dados conectado
+        """
+        self._on_connect.append(callback)
+
+    def add_event_listener(self, listener):
+        """
+        Registra um listener de eventos do pymongo nos clientes criados a partir de agora
+
+        Args:
+            listener: Instância de um listener de pymongo.monitoring
+        """
+        self._event_listeners.append(listener)
+
+    @property
+    def client(self):
+        """Cliente do MongoDB deste processo (None se indisponível)"""
+        self._ensure_connection()
+        return self._client
+
+    @property
+    def db(self):
+        """Banco de dados do MongoDB deste processo (None se indisponível)"""
+        self._ensure_connection()
+        return self._db
+
     def get_collection(self, collection_name):
         """Retorna uma coleção específica do banco de dados"""
-        if self.db:
-            return self.db[collection_name]
+        database = self.db
+        if database is not None:
+            return database[collection_name]
         else:
             logger.warning(f"Banco de dados não disponível. Retornando None para coleção {collection_name}")
             return None
-    
+
     def is_connected(self):
         """Verifica se a conexão com o banco de dados está ativa"""
         return self.db is not None
-    
+
+    def get_pool_stats(self):
+        """
+        Retorna a configuração e os contadores do pool de conexões deste processo
+
+        Returns:
+            dict: Configuração do pool e contadores (checked_out, waiting, created, closed...)
+        """
+        stats = self.pool_stats.snapshot()
+        stats.update({
+            "pid": os.getpid(),
+            "max_pool_size": self.max_pool_size,
+            "min_pool_size": self.min_pool_size,
+            "wait_queue_timeout_ms": self.wait_queue_timeout_ms
+        })
+        return stats
+
     def close_connection(self):
         """Fecha a conexão com o MongoDB"""
-        if self.client:
-            self.client.close()
+        if self._client is not None and self._pid == os.getpid():
+            self._client.close()
             logger.info("Conexão com MongoDB fechada")
+        self._client = None
+        self._db = None
+        self._pid = None
 
-# Instância global para uso em toda a aplicação
+# Instância global para uso em toda a aplicação (a conexão é aberta sob demanda)
 db = Database()
 
 # Nomes das coleções para fácil referência
@@ -69,5 +278,8 @@ COLLECTIONS = {
     'industries': 'industries',
     'sectors': 'sectors',
     'countries': 'countries',
-    'connections': 'connections'
+    'connections': 'connections',
+    'cache_versions': 'cache_versions',
+    'facets': 'facets',
+    'map_clusters': 'map_clusters'
 }
@@ -0,0 +1,121 @@
+import csv
+import io
+from flask import Response, stream_with_context
+from json_provider import default, dumps_bytes
+
+# Formatos aceitos pelo endpoint de exportação
+EXPORT_FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv"
+}
+
+# Quantas linhas são agrupadas em cada bloco enviado ao cliente
+CHUNK_ROWS = 500
+
+
+def _lookup(row, path):
+    """Valor de um caminho com ponto (como location.lat), ou None se ausente"""
+    value = row
+    for key in path.split("."):
+        value = value.get(key) if isinstance(value, dict) else None
+    return value
+
+
+def _column(column):
+    """
+    Normaliza a especificação de uma coluna em (cabeçalho, caminhos candidatos)
+
+    Uma coluna pode ser o nome de um campo ou uma tupla (cabeçalho, caminho, ...),
+    usada quando o campo tem nomes diferentes no MongoDB e nos dados simulados.
+    """
+    if column == "id":
+        return "id", ("_id", "id")
+    if isinstance(column, str):
+        return column, (column,)
+    return column[0], tuple(column[1:])
+
+
+def _value(row, paths):
+    """Valor de uma coluna pronto para o CSV"""
+    value = None
+    for path in paths:
+        value = _lookup(row, path)
+        if value is not None:
+            break
+    if value is None:
+        return ""
+    if isinstance(value, (list, tuple)):
+        return "; ".join(str(item) for item in value)
+    if isinstance(value, (str, int, float)):
+        return value
+    return default(value)
+
+
+def ndjson_chunks(rows):
+    """
+    Gera blocos NDJSON (um documento JSON por linha)
+
+    Args:
+        rows (iterable): Documentos a exportar, consumidos sob demanda
+
+    Yields:
+        bytes: Bloco com até CHUNK_ROWS linhas
+    """
+    chunk = []
+    for row in rows:
+        chunk.append(dumps_bytes(row))
+        if len(chunk) >= CHUNK_ROWS:
+            yield b"\n".join(chunk) + b"\n"
+            chunk = []
+    if chunk:
+        yield b"\n".join(chunk) + b"\n"
+
+
+def csv_chunks(rows, columns):
+    """
+    Gera blocos CSV com cabeçalho
+
+    Args:
+        rows (iterable): Documentos a exportar, consumidos sob demanda
+        columns (list): Colunas exportadas (ver _column; listas viram valores separados por "; ")
+
+    Yields:
+        str: Bloco com até CHUNK_ROWS linhas
+    """
+    columns = [_column(column) for column in columns]
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow([header for header, _ in columns])
+    count = 0
+    for row in rows:
+        writer.writerow([_value(row, paths) for _, paths in columns])
+        count += 1
+        if count >= CHUNK_ROWS:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+            count = 0
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+def export_response(rows, export_format, columns, filename="industries"):
+    """
+    Monta a resposta em streaming; a memória usada não depende do tamanho da exportação
+
+    Args:
+        rows (iterable): Documentos a exportar (gerador sobre um cursor ou sobre os dados em memória)
+        export_format (str): "ndjson" ou "csv"
+        columns (list): Colunas do CSV
+        filename (str): Nome do arquivo sugerido ao cliente, sem extensão
+
+    Returns:
+        Response: Resposta do Flask com corpo gerado sob demanda
+    """
+    if export_format == "csv":
+        body = csv_chunks(rows, columns)
+    else:
+        body = ndjson_chunks(rows)
+    response = Response(stream_with_context(body), mimetype=EXPORT_FORMATS[export_format])
+    response.headers["Content-Disposition"] = f'attachment; filename="{filename}.{export_format}"'
+    return response
@@ -0,0 +1,232 @@
+import argparse
+import logging
+import sys
+from pymongo import ReplaceOne, UpdateOne
+from pymongo.errors import PyMongoError
+from database import db, COLLECTIONS
+from regions import COUNTRY_REGIONS, REGION_COUNTRIES, country_of
+
+# Configuração de logging
+logger = logging.getLogger(__name__)
+
+# Campos com contagem por valor
+FACET_FIELDS = ("sector", "country", "region", "status")
+
+# Campos do documento dos quais as facetas são derivadas
+SOURCE_FIELDS = {"sector", "country", "region", "status", "location"}
+
+
+def facet_values(industry):
+    """
+    Extrai os valores de faceta de uma indústria
+
+    Args:
+        industry (dict): Documento da indústria (MongoDB ou dados simulados)
+
+    Returns:
+        dict: Campo -> valor (None quando ausente)
+    """
+    country = country_of(industry)
+    return {
+        "sector": industry.get("sector"),
+        "country": country,
+        "region": industry.get("region") or COUNTRY_REGIONS.get(country),
+        "status": industry.get("status")
+    }
+
+
+def affects_facets(changes):
+    """
+    Indica se uma atualização ($set) pode alterar alguma faceta
+
+    Args:
+        changes (dict): Campos atualizados (aceita notação com ponto)
+
+    Returns:
+        bool: True se algum campo de origem das facetas foi alterado
+    """
+    return any(key.split(".")[0] in SOURCE_FIELDS for key in changes)
+
+
+def _format(counts):
+    """Converte {campo: {valor: total}} em listas ordenadas por total"""
+    return {
+        field: [
+            {"name": value, "count": count}
+            for value, count in sorted(counts.get(field, {}).items(), key=lambda item: (-item[1], item[0]))
+            if count > 0
+        ]
+        for field in FACET_FIELDS
+    }
+
+
+def apply_delta(old=None, new=None):
+    """
+    Ajusta as contagens após uma escrita: remove os valores antigos e soma os novos
+
+    Args:
+        old (dict): Documento antes da escrita (None em inserções)
+        new (dict): Documento depois da escrita (None em remoções)
+    """
+    apply_deltas([(old, new)])
+
+
+def apply_deltas(changes):
+    """
+    Ajusta as contagens após várias escritas, com uma única operação em lote
+
+    Args:
+        changes (iterable): Pares (documento antes, documento depois) de cada escrita
+    """
+    collection = db.get_collection(COLLECTIONS['facets'])
+    if collection is None:
+        return
+
+    deltas = {}
+    for old, new in changes:
+        for document, sign in ((old, -1), (new, 1)):
+            if document is None:
+                continue
+            for field, value in facet_values(document).items():
+                if value is not None:
+                    key = (field, value)
+                    deltas[key] = deltas.get(key, 0) + sign
+
+    operations = [
+        UpdateOne(
+            {"_id": f"{field}:{value}"},
+            {"$inc": {"count": delta}, "$set": {"field": field, "value": value}},
+            upsert=True
+        )
+        for (field, value), delta in deltas.items()
+        if delta
+    ]
+    if not operations:
+        return
+    try:
+        collection.bulk_write(operations, ordered=False)
+    except PyMongoError as e:
+        # A escrita principal já foi feita; o próximo rebuild corrige as contagens
+        logger.error(f"Erro ao atualizar contagens de facetas: {e}")
+
+
+def get_counts():
+    """
+    Recupera as contagens por setor, país, região e status
+
+    No MongoDB, lê a coleção de facetas mantida por apply_delta (um documento
+    por valor, nunca a coleção de indústrias); sem banco, usa os índices de
+    atributos dos dados simulados.
+
+    Returns:
+        dict: Campo -> lista de {"name", "count"} ordenada por total
+    """
+    collection = db.get_collection(COLLECTIONS['facets'])
+    counts = {field: {} for field in FACET_FIELDS}
+
+    if collection is not None:
+        for document in collection.find({"count": {"$gt": 0}}):
+            if document["field"] in counts:
+                counts[document["field"]][document["value"]] = document["count"]
+        return _format(counts)
+
+    from models import get_mock_index
+    index = get_mock_index()
+    for field in FACET_FIELDS:
+        counts[field] = index.counts(field)
+    return _format(counts)
+
+
+def rebuild(database):
+    """
+    Recalcula todas as contagens com uma agregação sobre as indústrias
+
+    Usado para a carga inicial e para corrigir eventuais divergências; as
+    requisições nunca disparam este recálculo.
+
+    Args:
+        database: Banco de dados do MongoDB
+
+    Returns:
+        int: Número de valores de faceta gravados
+    """
+    region_branches = [
+        {"case": {"$in": ["$location.country", countries]}, "then": region}
+        for region, countries in REGION_COUNTRIES.items()
+    ]
+    pipeline = [
+        {"$project": {
+            "sector": 1,
+            "status": 1,
+            "country": "$location.country",
+            "region": {"$ifNull": ["$region", {"$switch": {"branches": region_branches, "default": None}}]}
+        }},
+        {"$facet": {
+            field: [
+                {"$match": {field: {"$ne": None}}},
+                {"$group": {"_id": f"${field}", "count": {"$sum": 1}}}
+            ]
+            for field in FACET_FIELDS
+        }}
+    ]
+    result = next(database[COLLECTIONS['industries']].aggregate(pipeline), {})
+
+    documents = [
+        {"_id": f"{field}:{group['_id']}", "field": field, "value": group["_id"], "count": group["count"]}
+        for field in FACET_FIELDS
+        for group in result.get(field, [])
+    ]
+    # Substitui os documentos sem esvaziar a coleção, para não expor contagens zeradas
+    collection = database[COLLECTIONS['facets']]
+    if documents:
+        collection.bulk_write([ReplaceOne({"_id": d["_id"]}, d, upsert=True) for d in documents], ordered=False)
+    collection.delete_many({"_id": {"$nin": [d["_id"] for d in documents]}})
+    return len(documents)
+
+
+def seed(database):
+    """
+    Monta as contagens quando a coleção de facetas ainda está vazia
+
+    Etapa de deploy (python facets.py seed): bancos que já tinham indústrias
+    antes das facetas passam a responder /api/facets. Com as contagens já
+    montadas, não faz nada, então pode rodar a cada deploy.
+
+    Args:
+        database: Banco de dados do MongoDB
+
+    Returns:
+        int: Número de valores de faceta gravados (0 se não havia o que montar)
+    """
+    if database[COLLECTIONS['facets']].find_one({}, {"_id": 1}) is not None:
+        return 0
+    if database[COLLECTIONS['industries']].find_one({}, {"_id": 1}) is None:
+        return 0
+    return rebuild(database)
+
+
+def main(argv=None):
+    """Linha de comando: python facets.py rebuild|seed"""
+    parser = argparse.ArgumentParser(description="Gerencia as contagens de facetas")
+    parser.add_argument("command", choices=["rebuild", "seed"],
+                        help="rebuild recalcula todas as contagens; seed só as monta se a coleção estiver vazia")
+    args = parser.parse_args(argv)
+
+    if not db.is_connected():
+        logger.error("Banco de dados não disponível")
+        return 2
+
+    if args.command == "seed":
+        total = seed(db.db)
+        logger.info(f"Facetas montadas a partir das indústrias existentes: {total} valores" if total
+                    else "Facetas já montadas (ou banco sem indústrias): nada a fazer")
+        return 0
+
+    total = rebuild(db.db)
+    logger.info(f"Facetas recalculadas: {total} valores")
+    return 0
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO)
+    sys.exit(main())
@@ -0,0 +1,202 @@
+import argparse
+import logging
+import math
+import sys
+from database import db, COLLECTIONS
+
+# Configuração de logging
+logger = logging.getLogger(__name__)
+
+# Raio médio da Terra (km)
+EARTH_RADIUS_KM = 6371.0088
+
+# Maior raio aceito em uma busca por proximidade (metade da circunferência da Terra)
+MAX_RADIUS_KM = 20015.0
+
+# Tamanho (graus) das células da grade do índice em memória
+CELL_DEGREES = 1.0
+
+# Quilômetros por grau de latitude
+KM_PER_DEGREE = math.pi * EARTH_RADIUS_KM / 180
+
+
+def coordinates(industry):
+    """
+    Extrai as coordenadas de uma indústria
+
+    Args:
+        industry (dict): Documento com location: {lat, lng}
+
+    Returns:
+        tuple: (lat, lng), ou None se ausentes ou fora dos limites
+    """
+    location = industry.get("location")
+    if not isinstance(location, dict):
+        return None
+    lat, lng = location.get("lat"), location.get("lng")
+    if isinstance(lat, bool) or isinstance(lng, bool) or not isinstance(lat, (int, float)) or not isinstance(lng, (int, float)):
+        return None
+    if not (-90 <= lat <= 90 and -180 <= lng <= 180):
+        return None
+    return float(lat), float(lng)
+
+
+def geo_point(industry):
+    """
+    Ponto GeoJSON gravado no campo geo (indexado com 2dsphere)
+
+    O campo location guarda {lat, lng}, na ordem inversa da exigida pelo
+    MongoDB, por isso o ponto é mantido em um campo separado.
+
+    Args:
+        industry (dict): Documento com location: {lat, lng}
+
+    Returns:
+        dict: {"type": "Point", "coordinates": [lng, lat]}, ou None
+    """
+    point = coordinates(industry)
+    if point is None:
+        return None
+    return {"type": "Point", "coordinates": [point[1], point[0]]}
+
+
+def affects_geo(changes):
+    """
+    Indica se uma atualização ($set) pode alterar as coordenadas
+
+    Args:
+        changes (dict): Campos atualizados (aceita notação com ponto)
+
+    Returns:
+        bool: True se location (ou lat/lng) foi alterado
+    """
+    return any(key in ("location", "location.lat", "location.lng") for key in changes)
+
+
+def haversine_km(lat1, lng1, lat2, lng2):
+    """Distância em km sobre a superfície da Terra entre dois pontos"""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    dphi = phi2 - phi1
+    dlambda = math.radians(lng2 - lng1)
+    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlambda / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+class GridIndex:
+    """
+    Índice espacial em memória: grade de células de CELL_DEGREES graus
+
+    Uma busca por raio visita apenas as células que intersectam a caixa
+    envolvente do círculo e calcula a distância exata só para os pontos
+    dessas células.
+    """
+
+    def __init__(self, records, cell_degrees=CELL_DEGREES):
+        """
+        Args:
+            records (list): Registros com location: {lat, lng}
+            cell_degrees (float): Tamanho de cada célula em graus
+        """
+        self.cell_degrees = cell_degrees
+        self.rows = int(math.ceil(180 / cell_degrees))
+        self.columns = int(math.ceil(360 / cell_degrees))
+        self.cells = {}
+        self.points = {}
+        for position, record in enumerate(records):
+            point = coordinates(record)
+            if point is not None:
+                self.points[position] = point
+                self.cells.setdefault(self._cell(*point), []).append(position)
+
+    def _cell(self, lat, lng):
+        row = min(int((lat + 90) / self.cell_degrees), self.rows - 1)
+        column = int((lng + 180) / self.cell_degrees) % self.columns
+        return row, column
+
+    def _candidate_cells(self, lat, lng, radius_km):
+        """Células que podem conter pontos dentro do raio"""
+        dlat = radius_km / KM_PER_DEGREE
+        lat_min, lat_max = max(-90.0, lat - dlat), min(90.0, lat + dlat)
+        first_row, last_row = self._cell(lat_min, 0)[0], self._cell(lat_max, 0)[0]
+
+        # Perto dos polos (ou com raios muito grandes) todas as longitudes são candidatas
+        widest = max(abs(lat_min), abs(lat_max))
+        if widest >= 89.9 or dlat / math.cos(math.radians(widest)) >= 180:
+            columns = range(self.columns)
+        else:
+            dlng = dlat / math.cos(math.radians(widest))
+            first_column = int((lng - dlng + 180) // self.cell_degrees)
+            last_column = int((lng + dlng + 180) // self.cell_degrees)
+            columns = [column % self.columns for column in range(first_column, last_column + 1)]
+
+        visits = (last_row - first_row + 1) * len(columns)
+        if visits >= len(self.cells):
+            # Mais células candidatas do que células ocupadas: percorre só as ocupadas
+            return [cell for cell in self.cells if first_row <= cell[0] <= last_row]
+        return [(row, column) for row in range(first_row, last_row + 1) for column in columns]
+
+    def near(self, lat, lng, radius_km, predicate=None, limit=None):
+        """
+        Pontos dentro de um raio, do mais próximo ao mais distante
+
+        Args:
+            lat (float): Latitude do centro
+            lng (float): Longitude do centro
+            radius_km (float): Raio em km
+            predicate (callable): Filtro adicional sobre a posição do registro
+            limit (int): Número máximo de resultados
+
+        Returns:
+            list: Pares (distância em km, posição do registro)
+        """
+        matches = []
+        for cell in self._candidate_cells(lat, lng, radius_km):
+            for position in self.cells.get(cell, ()):
+                if predicate is not None and not predicate(position):
+                    continue
+                distance = haversine_km(lat, lng, *self.points[position])
+                if distance <= radius_km:
+                    matches.append((distance, position))
+        matches.sort()
+        return matches[:limit] if limit else matches
+
+
+def backfill(database):
+    """
+    Preenche o campo geo dos documentos que têm location.lat/lng e ainda não o têm
+
+    Args:
+        database: Banco de dados do MongoDB
+
+    Returns:
+        int: Número de documentos atualizados
+    """
+    result = database[COLLECTIONS['industries']].update_many(
+        {
+            "geo": {"$exists": False},
+            "location.lat": {"$type": "number", "$gte": -90, "$lte": 90},
+            "location.lng": {"$type": "number", "$gte": -180, "$lte": 180}
+        },
+        [{"$set": {"geo": {"type": "Point", "coordinates": ["$location.lng", "$location.lat"]}}}]
+    )
+    return result.modified_count
+
+
+def main(argv=None):
+    """Linha de comando: python geo.py backfill"""
+    parser = argparse.ArgumentParser(description="Gerencia os dados geoespaciais das indústrias")
+    parser.add_argument("command", choices=["backfill"], help="backfill preenche o campo geo a partir de location")
+    parser.parse_args(argv)
+
+    if not db.is_connected():
+        logger.error("Banco de dados não disponível")
+        return 2
+
+    total = backfill(db.db)
+    logger.info(f"Campo geo preenchido em {total} documentos")
+    return 0
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO)
+    sys.exit(main())
@@ -0,0 +1,161 @@
+import hashlib
+import logging
+import os
+import time
+import zlib
+from datetime import datetime, timezone
+from functools import wraps
+from flask import request, make_response
+from pymongo import ReturnDocument
+from database import db, COLLECTIONS
+
+# Configuração de logging
+logger = logging.getLogger(__name__)
+
+# Cache-Control das respostas de leitura: por padrão o cliente (ou a CDN) pode
+# guardar a resposta, mas precisa revalidá-la a cada uso
+CACHE_MAX_AGE = int(os.getenv('HTTP_CACHE_MAX_AGE', 0))
+
+# Por quantos segundos cada processo reaproveita a versão lida do MongoDB.
+# As escritas do próprio processo atualizam a versão na hora (bump); as dos
+# demais workers são percebidas em até VERSION_TTL segundos, período em que
+# um validador antigo ainda pode receber 304 (0 lê a versão a cada requisição)
+VERSION_TTL = float(os.getenv('HTTP_CACHE_VERSION_TTL', 5))
+
+
+# Snapshot servido sem banco (ver snapshot.py); pode ser trocado sem reiniciar
+DATASET_SNAPSHOT = os.getenv('DATASET_SNAPSHOT')
+
+
+def _mock_version():
+    """
+    Versão dos dados simulados: muda apenas quando o conteúdo muda
+
+    Returns:
+        tuple: (versão, data da geração do snapshot em UTC, ou None para mock_data)
+    """
+    if DATASET_SNAPSHOT:
+        from snapshot import read_header
+        header = read_header(DATASET_SNAPSHOT)
+        return f"snapshot-{header['checksum']}", datetime.fromisoformat(header['created_at'])
+    from mock_data import mock_industries
+    return f"mock-{zlib.crc32(repr(mock_industries).encode('utf-8')):08x}", None
+
+
+class CollectionVersions:
+    """
+    Contador de versão por coleção, incrementado pelas rotas de escrita
+
+    No MongoDB, as versões ficam na coleção cache_versions e são compartilhadas
+    por todos os workers; sem banco, a versão é derivada dos dados simulados.
+    """
+
+    def __init__(self):
+        self._local = {}
+        self._mock = None
+        self._started_at = datetime.now(timezone.utc).replace(microsecond=0)
+
+    def _collection(self):
+        return db.get_collection(COLLECTIONS['cache_versions'])
+
+    def get(self, name):
+        """
+        Recupera a versão atual de uma coleção
+
+        Args:
+            name (str): Nome da coleção
+
+        Returns:
+            tuple: (versão, data da última alteração em UTC)
+        """
+        cached = self._local.get(name)
+        if cached and time.monotonic() - cached[2] < VERSION_TTL:
+            return cached[0], cached[1]
+
+        collection = self._collection()
+        if collection is not None:
+            document = collection.find_one({"_id": name}) or {}
+            version = str(document.get("version", 0))
+            updated_at = document.get("updated_at", self._started_at)
+        else:
+            # O snapshot é relido (a cada VERSION_TTL), pois pode ser trocado; mock_data, não
+            if self._mock is None or DATASET_SNAPSHOT:
+                self._mock = _mock_version()
+            version, updated_at = self._mock[0], self._mock[1] or self._started_at
+
+        if updated_at.tzinfo is None:
+            updated_at = updated_at.replace(tzinfo=timezone.utc)
+        self._local[name] = (version, updated_at, time.monotonic())
+        return version, updated_at
+
+    def bump(self, name):
+        """
+        Incrementa a versão de uma coleção após uma escrita
+
+        Args:
+            name (str): Nome da coleção
+
+        Returns:
+            str: Nova versão (None sem banco)
+        """
+        collection = self._collection()
+        if collection is None:
+            return None
+        document = collection.find_one_and_update(
+            {"_id": name},
+            {"$inc": {"version": 1}, "$set": {"updated_at": datetime.utcnow()}},
+            upsert=True,
+            return_document=ReturnDocument.AFTER
+        )
+        updated_at = document["updated_at"].replace(tzinfo=timezone.utc)
+        version = str(document["version"])
+        self._local[name] = (version, updated_at, time.monotonic())
+        return version
+
+
+# Instância global para uso em toda a aplicação
+versions = CollectionVersions()
+
+
+def conditional(*collection_names):
+    """
+    Decorador de rotas GET com ETag/Last-Modified derivados das versões das coleções
+
+    Quando o cliente envia um validador ainda válido (If-None-Match ou
+    If-Modified-Since), responde 304 sem executar a rota nem consultar os dados.
+
+    Last-Modified tem resolução de um segundo: uma escrita no mesmo segundo
+    da última alteração não mudaria a data. Por isso ele só é enviado (e
+    If-Modified-Since só é aceito) quando a última alteração é de um segundo
+    já encerrado; antes disso, o cliente revalida pelo ETag.
+
+    Args:
+        collection_names (str): Coleções das quais a resposta depende
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            states = [versions.get(name) for name in collection_names]
+            key = "|".join([request.full_path] + [f"{name}:{version}" for name, (version, _) in zip(collection_names, states)])
+            etag = hashlib.sha1(key.encode("utf-8")).hexdigest()[:20]
+            last_modified = max(updated_at for _, updated_at in states).replace(microsecond=0)
+            if last_modified >= datetime.now(timezone.utc).replace(microsecond=0):
+                last_modified = None
+
+            if request.if_none_match:
+                not_modified = request.if_none_match.contains_weak(etag)
+            else:
+                since = request.if_modified_since
+                not_modified = since is not None and last_modified is not None and last_modified <= since
+
+            response = make_response(("", 304) if not_modified else view(*args, **kwargs))
+            if response.status_code in (200, 304):
+                response.set_etag(etag, weak=True)
+                if last_modified is not None:
+                    response.last_modified = last_modified
+                response.cache_control.public = True
+                response.cache_control.max_age = CACHE_MAX_AGE
+                response.cache_control.must_revalidate = True
+            return response
+        return wrapper
+    return decorator
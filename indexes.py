@@ -0,0 +1,247 @@
+import argparse
+import logging
+import sys
+from bson import ObjectId
+from pymongo import ASCENDING, DESCENDING, GEOSPHERE, IndexModel, TEXT
+from pymongo.errors import OperationFailure
+from database import COLLECTIONS
+
+# Configuração de logging
+logger = logging.getLogger(__name__)
+
+# Índices de cada coleção. Os índices compostos seguem o formato das consultas
+# de main.py: igualdade nos filtros e ordenação por _id (paginação por chave).
+INDEXES = {
+    COLLECTIONS['industries']: [
+        # Busca textual ponderada: nome > produtos > descrição
+        IndexModel(
+            [("name", TEXT), ("products", TEXT), ("description", TEXT)],
+            name="industries_text",
+            weights={"name": 10, "products": 5, "description": 1},
+            default_language="portuguese"
+        ),
+        # GET /api/industries?sector=... e busca por setor: só setor, paginando por _id sem SORT
+        IndexModel([("sector", ASCENDING), ("_id", ASCENDING)], name="sector_id"),
+        # GET /api/industries?sector=...&country=...
+        IndexModel(
+            [("sector", ASCENDING), ("location.country", ASCENDING), ("_id", ASCENDING)],
+            name="sector_country_id"
+        ),
+        # GET /api/industries?country=...
+        IndexModel([("location.country", ASCENDING), ("_id", ASCENDING)], name="country_id"),
+        # Busca por região, com ou sem setor (campo region gravado na escrita)
+        IndexModel([("region", ASCENDING), ("_id", ASCENDING)], name="region_id"),
+        IndexModel([("sector", ASCENDING), ("region", ASCENDING), ("_id", ASCENDING)], name="sector_region_id"),
+        # GET /api/industries?status=...
+        IndexModel([("status", ASCENDING), ("_id", ASCENDING)], name="status_id"),
+        # Faixas e ordenação numéricas (min_employees, founded_from, min_revenue, sort=...);
+        # o _id na mesma direção desempata a paginação por chave nos dois sentidos
+        IndexModel([("employees", ASCENDING), ("_id", ASCENDING)], name="employees_id"),
+        IndexModel([("founded", ASCENDING), ("_id", ASCENDING)], name="founded_id"),
+        IndexModel([("revenue_usd", ASCENDING), ("_id", ASCENDING)], name="revenue_usd_id"),
+        # GET /api/industries/near ($geoNear sobre o ponto GeoJSON, com ou sem setor)
+        IndexModel([("geo", GEOSPHERE), ("sector", ASCENDING)], name="geo_sector"),
+        # Candidatos a parceiro (matching.tier_query): quem exporta para um país/mercado
+        IndexModel([("export_markets", ASCENDING)], name="export_markets"),
+        # Upserts da carga em lote (bulk.py): um documento por id do parceiro
+        IndexModel(
+            [("external_id", ASCENDING)],
+            name="external_id_unique",
+            unique=True,
+            partialFilterExpression={"external_id": {"$exists": True}}
+        )
+    ],
+    COLLECTIONS['sectors']: [
+        IndexModel([("name", ASCENDING)], name="name_unique", unique=True)
+    ],
+    COLLECTIONS['countries']: [
+        IndexModel([("name", ASCENDING)], name="name_unique", unique=True)
+    ],
+    COLLECTIONS['connections']: [
+        # Remoção de uma indústria das listas de parceiros ($pull em matching.refresh/remove)
+        IndexModel([("matches.id", ASCENDING)], name="matches_id")
+    ],
+    COLLECTIONS['cache_versions']: [],
+    COLLECTIONS['facets']: [],
+    COLLECTIONS['map_clusters']: [
+        # GET /api/map/clusters: células de um nível dentro da área visível
+        IndexModel([("zoom", ASCENDING), ("row", ASCENDING), ("col", ASCENDING)], name="zoom_row_col")
+    ]
+}
+
+# Consultas canônicas de cada rota: (rota, coleção, filtro, ordenação).
+# Nenhuma delas pode ser resolvida com uma varredura completa (COLLSCAN) nem
+# ordenar em memória (estágio SORT): a ordenação tem de vir do índice.
+CANONICAL_QUERIES = [
+    ("GET /api/industries?sector", COLLECTIONS['industries'],
+     {"sector": "Tecnologia"}, [("_id", ASCENDING)]),
+    ("GET /api/industries?sector&cursor", COLLECTIONS['industries'],
+     {"sector": "Tecnologia", "_id": {"$gt": ObjectId("000000000000000000000000")}}, [("_id", ASCENDING)]),
+    ("GET /api/industries?cursor", COLLECTIONS['industries'],
+     {"_id": {"$gt": ObjectId("000000000000000000000000")}}, [("_id", ASCENDING)]),
+    ("GET /api/industries?country", COLLECTIONS['industries'],
+     {"location.country": "Brasil"}, [("_id", ASCENDING)]),
+    ("GET /api/industries?status", COLLECTIONS['industries'],
+     {"status": "available"}, [("_id", ASCENDING)]),
+    ("GET /api/industries?sector&country&status", COLLECTIONS['industries'],
+     {"sector": "Tecnologia", "location.country": "Brasil", "status": "available"}, [("_id", ASCENDING)]),
+    ("GET /api/industries?min_employees&max_employees", COLLECTIONS['industries'],
+     {"employees": {"$gte": 100, "$lte": 1000}}, [("_id", ASCENDING)]),
+    ("GET /api/industries?founded_from&sort=founded", COLLECTIONS['industries'],
+     {"founded": {"$gte": 2000}}, [("founded", ASCENDING), ("_id", ASCENDING)]),
+    ("GET /api/industries?sort=-revenue", COLLECTIONS['industries'],
+     {"revenue_usd": {"$type": "number"}}, [("revenue_usd", DESCENDING), ("_id", DESCENDING)]),
+    ("GET /api/industries/search?q", COLLECTIONS['industries'],
+     {"$text": {"$search": "sistemas"}}, None),
+    ("GET /api/industries/search?q&sector", COLLECTIONS['industries'],
+     {"$text": {"$search": "sistemas"}, "sector": "Tecnologia"}, None),
+    ("GET /api/industries/search?sector&region", COLLECTIONS['industries'],
+     {"sector": "Tecnologia", "region": "América do Sul"}, [("_id", ASCENDING)]),
+    ("GET /api/industries/search?region", COLLECTIONS['industries'],
+     {"region": "América do Sul"}, [("_id", ASCENDING)]),
+    ("POST /api/industries/bulk", COLLECTIONS['industries'],
+     {"external_id": {"$in": ["1", "2"]}}, None),
+    ("GET /api/industries/near", COLLECTIONS['industries'],
+     {"geo": {"$nearSphere": {"$geometry": {"type": "Point", "coordinates": [-100.31, 25.67]},
+                              "$maxDistance": 200000}}}, None),
+    ("GET /api/map/clusters", COLLECTIONS['map_clusters'],
+     {"zoom": 4, "row": {"$gte": 10, "$lte": 40}, "col": {"$gte": 20, "$lte": 60}}, None),
+    ("matching.tier_query (setor e país)", COLLECTIONS['industries'],
+     {"status": "seeking", "$or": [{"sector": "Tecnologia", "location.country": "Chile"},
+                                   {"sector": "Tecnologia", "location.country": "Peru"}]}, [("_id", ASCENDING)]),
+    ("matching.tier_query (mercado)", COLLECTIONS['industries'],
+     {"status": "seeking", "export_markets": "Brasil"}, [("_id", ASCENDING)]),
+    ("matching.refresh ($pull)", COLLECTIONS['connections'], {"matches.id": "1"}, None),
+    ("SectorModel.get_by_name", COLLECTIONS['sectors'], {"name": "Tecnologia"}, None),
+    ("CountryModel.get_by_name", COLLECTIONS['countries'], {"name": "Brasil"}, None)
+]
+
+
+def ensure_indexes(database):
+    """
+    Cria os índices declarados em INDEXES (operação idempotente)
+
+    Args:
+        database: Banco de dados do MongoDB
+    """
+    for collection_name, models in INDEXES.items():
+        if not models:
+            continue
+        names = database[collection_name].create_indexes(models)
+        logger.info(f"Índices garantidos em {collection_name}: {', '.join(names)}")
+
+
+def plan_stages(plan):
+    """Nomes de todos os estágios de um plano de execução"""
+    stages = [plan.get("stage")]
+    for key in ("inputStage", "queryPlan"):
+        if key in plan:
+            stages.extend(plan_stages(plan[key]))
+    for child in plan.get("inputStages", []):
+        stages.extend(plan_stages(child))
+    return stages
+
+
+def find_drift(database):
+    """
+    Compara os índices existentes com os declarados em INDEXES
+
+    Args:
+        database: Banco de dados do MongoDB
+
+    Returns:
+        list: Descrição de cada divergência encontrada (vazia se não houver)
+    """
+    problems = []
+    for collection_name, models in INDEXES.items():
+        declared = {model.document["name"] for model in models}
+        existing = set(database[collection_name].index_information()) - {"_id_"}
+        for name in sorted(declared - existing):
+            problems.append(f"{collection_name}: índice ausente {name}")
+        for name in sorted(existing - declared):
+            problems.append(f"{collection_name}: índice não declarado {name}")
+    return problems
+
+
+def has_sort_stage(explain):
+    """Indica se algum nível do explain() declara hasSortStage (planos do SBE)"""
+    if isinstance(explain, dict):
+        if explain.get("hasSortStage") is True:
+            return True
+        return any(has_sort_stage(value) for value in explain.values())
+    if isinstance(explain, list):
+        return any(has_sort_stage(value) for value in explain)
+    return False
+
+
+def find_collection_scans(database):
+    """
+    Executa explain() nas consultas canônicas e aponta as que usam COLLSCAN
+    ou ordenam em memória (estágio SORT ou hasSortStage)
+
+    Args:
+        database: Banco de dados do MongoDB
+
+    Returns:
+        list: Descrição de cada consulta sem índice adequado
+    """
+    problems = []
+    for route, collection_name, query, sort in CANONICAL_QUERIES:
+        cursor = database[collection_name].find(query)
+        if sort:
+            cursor = cursor.sort(sort)
+        explain = cursor.explain()
+        stages = plan_stages(explain["queryPlanner"]["winningPlan"])
+        if "COLLSCAN" in stages:
+            problems.append(f"{route}: COLLSCAN em {collection_name} para {query}")
+        if "SORT" in stages or has_sort_stage(explain):
+            problems.append(f"{route}: ordenação em memória (SORT) em {collection_name} para {query} {sort}")
+    return problems
+
+
+def verify_indexes(database):
+    """
+    Verifica divergências de índices e consultas sem índice
+
+    Args:
+        database: Banco de dados do MongoDB
+
+    Returns:
+        list: Problemas encontrados (vazia se tudo estiver correto)
+    """
+    return find_drift(database) + find_collection_scans(database)
+
+
+def main(argv=None):
+    """Linha de comando: python indexes.py apply|verify"""
+    parser = argparse.ArgumentParser(description="Gerencia os índices do MongoDB")
+    parser.add_argument("command", choices=["apply", "verify"],
+                        help="apply cria os índices declarados; verify falha se houver divergência, COLLSCAN ou SORT")
+    args = parser.parse_args(argv)
+
+    from database import db
+    if not db.is_connected():
+        logger.error("Banco de dados não disponível")
+        return 2
+
+    if args.command == "apply":
+        try:
+            ensure_indexes(db.db)
+        except OperationFailure as e:
+            # Um índice com o mesmo nome e opções diferentes precisa ser removido manualmente
+            logger.error(f"Erro ao criar índices: {e}")
+            return 1
+        return 0
+
+    problems = verify_indexes(db.db)
+    for problem in problems:
+        logger.error(problem)
+    if problems:
+        return 1
+    logger.info("Índices verificados: nenhuma divergência, COLLSCAN ou SORT")
+    return 0
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO)
+    sys.exit(main())
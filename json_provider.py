@@ -0,0 +1,112 @@
+import json
+from datetime import date, datetime, timezone
+from decimal import Decimal
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson é opcional
+    orjson = None
+
+try:
+    from bson import ObjectId
+except ImportError:  # pragma: no cover - app.py funciona sem pymongo
+    ObjectId = None
+
+if orjson is not None:
+    # Datas sem fuso (como as gravadas pelo MongoDB) são tratadas como UTC
+    ORJSON_OPTIONS = orjson.OPT_NAIVE_UTC
+
+
+def default(value):
+    """
+    Converte tipos que não são nativos do JSON
+
+    Args:
+        value: Valor a ser serializado
+
+    Returns:
+        Valor equivalente serializável (ObjectId e Decimal viram texto,
+        datas viram ISO 8601 em UTC)
+
+    Raises:
+        TypeError: Se o tipo não for suportado
+    """
+    if ObjectId is not None and isinstance(value, ObjectId):
+        return str(value)
+    if isinstance(value, datetime):
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)
+        return value.isoformat()
+    if isinstance(value, date):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+    raise TypeError(f"Objeto do tipo {type(value).__name__} não é serializável em JSON")
+
+
+def dumps_bytes(obj):
+    """
+    Serializa um objeto diretamente para bytes UTF-8 (usado em respostas em streaming)
+
+    Args:
+        obj: Objeto a ser serializado
+
+    Returns:
+        bytes: JSON compacto
+    """
+    if orjson is not None:
+        return orjson.dumps(obj, default=default, option=ORJSON_OPTIONS)
+    return json.dumps(obj, default=default, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """
+    Provedor JSON do Flask baseado em orjson, com suporte a ObjectId, datetime e Decimal
+
+    Sem orjson instalado, usa o módulo json da biblioteca padrão com as mesmas
+    conversões.
+    """
+
+    # A ordem das chaves não faz parte do contrato da API; ordenar custa caro
+    sort_keys = False
+
+    def dumps(self, obj, **kwargs):
+        """Serializa um objeto para uma string JSON"""
+        if orjson is not None and not kwargs.get("indent"):
+            return self._dump_bytes(obj).decode("utf-8")
+        kwargs.setdefault("default", default)
+        kwargs.setdefault("ensure_ascii", self.ensure_ascii)
+        kwargs.setdefault("sort_keys", self.sort_keys)
+        return json.dumps(obj, **kwargs)
+
+    def loads(self, s, **kwargs):
+        """Desserializa uma string (ou bytes) JSON"""
+        if orjson is not None and not kwargs:
+            return orjson.loads(s)
+        return json.loads(s, **kwargs)
+
+    def _dump_bytes(self, obj):
+        if not self.sort_keys:
+            return dumps_bytes(obj)
+        return orjson.dumps(obj, default=default, option=ORJSON_OPTIONS | orjson.OPT_SORT_KEYS)
+
+    def response(self, *args, **kwargs):
+        """Gera a resposta JSON sem passar por uma string intermediária"""
+        if orjson is None or self.compact is False or (self.compact is None and self._app.debug):
+            return super().response(*args, **kwargs)
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(self._dump_bytes(obj) + b"\n", mimetype=self.mimetype)
+
+
+def init_app(app):
+    """
+    Instala o provedor JSON rápido em uma aplicação Flask
+
+    Args:
+        app (Flask): Aplicação
+    """
+    app.json_provider_class = FastJSONProvider
+    app.json = FastJSONProvider(app)
@@ -1,10 +1,47 @@
-from flask import Flask, jsonify, request
+from flask import Flask, Response, jsonify, request
 from flask_cors import CORS
+import os
 from models import IndustryModel, SectorModel, CountryModel
-from database import db
+from database import db, COLLECTIONS
+from http_cache import conditional, versions
+import facets
+import clusters
+import matching
+import stats
+import json_provider
+import metrics
+import profiling
+from indexes import ensure_indexes
+from pagination import next_cursor
+from projection import parse_fields
+from numeric import NUMERIC_FIELDS, parse_ranges, parse_sort
+from export import EXPORT_FORMATS, export_response
+import bulk
+from geo import MAX_RADIUS_KM
 
 app = Flask(__name__)
 CORS(app)  # Habilita CORS para permitir requisições do frontend
+json_provider.init_app(app)  # Serialização JSON rápida, com suporte a ObjectId e datetime
+metrics.init_app(app, db)  # Latência por rota e duração dos comandos do MongoDB, expostas em /metrics
+profiling.init_app(app, db)  # Perfil das requisições marcadas (cabeçalho ou amostragem) com explain das consultas
+
+# Garante os índices usados pelas consultas (inclusive o índice de texto da busca)
+# quando cada processo abrir sua conexão, sem bloquear a importação do módulo
+db.on_connect(ensure_indexes)
+
+# Limite de IDs aceitos por chamada do endpoint de lote
+MAX_BATCH_IDS = 100
+
+# Documentos trazidos do MongoDB por lote nas exportações
+EXPORT_BATCH_SIZE = int(os.getenv('EXPORT_BATCH_SIZE', 1000))
+
+# Colunas da exportação em CSV
+EXPORT_COLUMNS = [
+    "id", "name", "sector", ("country", "location.country", "country"), "state", "city", "status",
+    "description", "products", "certifications", "export_markets", "contact_person", "position",
+    "email", "phone", "website", ("lat", "location.lat"), ("lng", "location.lng"),
+    "founded", "employees", "revenue"
+]
 
 @app.route('/api/health', methods=['GET'])
 def health_check():
@@ -13,18 +50,59 @@ def health_check():
     return jsonify({
         "status": "online",
         "database": db_status,
+        "pool": db.get_pool_stats(),
         "message": "API do Businesses of the Industry está funcionando corretamente"
     })
 
+@app.route('/metrics', methods=['GET'])
+def metrics_endpoint():
+    """Endpoint de métricas no formato de exposição do Prometheus"""
+    content, content_type = metrics.render()
+    return Response(content, content_type=content_type)
+
+@app.route('/api/admin/profiles', methods=['GET'])
+def list_profiles():
+    """Endpoint administrativo: perfis guardados por este worker, do mais recente para o mais antigo"""
+    if not profiling.authorized(request.headers.get(profiling.TOKEN_HEADER)):
+        return jsonify({"error": "Token de profiling ausente ou inválido"}), 403
+    profiles = profiling.list_profiles()
+    return jsonify({"pid": os.getpid(), "count": len(profiles), "profiles": profiles})
+
+@app.route('/api/admin/profiles/<profile_id>', methods=['GET'])
+def get_profile(profile_id):
+    """Endpoint administrativo: perfil completo (amostras da pilha e explain de cada consulta)"""
+    if not profiling.authorized(request.headers.get(profiling.TOKEN_HEADER)):
+        return jsonify({"error": "Token de profiling ausente ou inválido"}), 403
+    profile = profiling.get_profile(profile_id)
+    if not profile:
+        return jsonify({"error": "Perfil não encontrado neste worker"}), 404
+    return jsonify(profile)
+
 @app.route('/api/industries', methods=['GET'])
+@conditional(COLLECTIONS['industries'])
 def get_industries():
     """Endpoint para listar todas as indústrias com filtros opcionais"""
     # Parâmetros de filtro
     sector = request.args.get('sector')
     country = request.args.get('country')
     status = request.args.get('status')
-    limit = int(request.args.get('limit', 100))
-    skip = int(request.args.get('skip', 0))
+    cursor = request.args.get('cursor')
+    try:
+        limit = int(request.args.get('limit', 100))
+        skip = int(request.args.get('skip', 0))
+    except ValueError:
+        return jsonify({"error": "Parâmetros de paginação inválidos"}), 400
+    if limit < 0 or skip < 0:
+        return jsonify({"error": "Parâmetros de paginação inválidos"}), 400
+    
+    # Campos a devolver (lista separada por vírgulas ou preset: card, map),
+    # faixas numéricas (min_employees, founded_from, min_revenue...) e ordenação (sort=-revenue)
+    try:
+        fields = parse_fields(request.args.get('fields'))
+        ranges = parse_ranges(request.args)
+        sort = parse_sort(request.args.get('sort'))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
     
     # Construir filtros
     filters = {}
@@ -38,15 +116,47 @@ def get_industries():
         filters["status"] = status
     
     # Buscar indústrias usando o modelo
-    industries = IndustryModel.get_all(filters, limit, skip)
+    try:
+        industries = IndustryModel.get_all(filters, limit, skip, cursor, fields, ranges, sort)
+    except ValueError:
+        return jsonify({"error": "Cursor inválido"}), 400
     
     # Retornar resultados
     return jsonify({
         "count": len(industries),
-        "results": industries
+        "results": industries,
+        "next_cursor": next_cursor(industries, limit, NUMERIC_FIELDS[sort[0]] if sort else "score")
     })
 
+@app.route('/api/industries/export', methods=['GET'])
+def export_industries():
+    """Endpoint para exportar as indústrias em NDJSON ou CSV, em streaming"""
+    export_format = request.args.get('format', 'ndjson')
+    if export_format not in EXPORT_FORMATS:
+        return jsonify({"error": "Formato inválido. Use ndjson ou csv"}), 400
+    
+    # Mesmos filtros da listagem
+    filters = {}
+    if request.args.get('sector'):
+        filters["sector"] = request.args.get('sector')
+    
+    if request.args.get('country'):
+        filters["location.country"] = request.args.get('country')
+    
+    if request.args.get('status'):
+        filters["status"] = request.args.get('status')
+    
+    try:
+        ranges = parse_ranges(request.args)
+        sort = parse_sort(request.args.get('sort'))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    
+    rows = IndustryModel.iter_all(filters, EXPORT_BATCH_SIZE, ranges, sort)
+    return export_response(rows, export_format, EXPORT_COLUMNS)
+
 @app.route('/api/industries/<industry_id>', methods=['GET'])
+@conditional(COLLECTIONS['industries'])
 def get_industry_details(industry_id):
     """Endpoint para obter detalhes de uma indústria específica"""
     industry = IndustryModel.get_by_id(industry_id)
@@ -56,18 +166,130 @@ def get_industry_details(industry_id):
     else:
         return jsonify({"error": "Indústria não encontrada"}), 404
 
+@app.route('/api/industries/<industry_id>/matches', methods=['GET'])
+@conditional(COLLECTIONS['industries'])
+def get_industry_matches(industry_id):
+    """Endpoint com os parceiros sugeridos para uma indústria (listas pré-calculadas)"""
+    try:
+        limit = int(request.args.get('limit', matching.TOP_K))
+    except ValueError:
+        return jsonify({"error": "Parâmetro limit inválido"}), 400
+    
+    matches = IndustryModel.get_matches(industry_id, max(0, limit))
+    if matches is None:
+        return jsonify({"error": "Indústria não encontrada"}), 404
+    
+    return jsonify({
+        "count": len(matches),
+        "results": matches
+    })
+
+@app.route('/api/industries/batch', methods=['GET'])
+@conditional(COLLECTIONS['industries'])
+def get_industries_batch():
+    """Endpoint para obter os detalhes de várias indústrias em uma única chamada"""
+    ids = list(dict.fromkeys(i for value in request.args.getlist('ids') for i in value.split(',') if i))
+    
+    if not ids:
+        return jsonify({"error": "Parâmetro obrigatório ausente: ids"}), 400
+    
+    if len(ids) > MAX_BATCH_IDS:
+        return jsonify({"error": f"Máximo de {MAX_BATCH_IDS} IDs por requisição"}), 400
+    
+    try:
+        fields = parse_fields(request.args.get('fields'))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    
+    # Uma única consulta $in em vez de uma requisição por indústria
+    industries = IndustryModel.get_by_ids(ids, fields)
+    found = {str(industry.get("_id", industry.get("id"))) for industry in industries}
+    
+    return jsonify({
+        "count": len(industries),
+        "results": industries,
+        "missing": [i for i in ids if i not in found]
+    })
+
 @app.route('/api/industries/search', methods=['GET'])
+@conditional(COLLECTIONS['industries'])
 def search_industries():
     """Endpoint para busca avançada de indústrias"""
     # Parâmetros de busca
     query = request.args.get('q', '')
     sector = request.args.get('sector')
     region = request.args.get('region')
-    limit = int(request.args.get('limit', 100))
-    skip = int(request.args.get('skip', 0))
+    cursor = request.args.get('cursor')
+    try:
+        limit = int(request.args.get('limit', 100))
+        skip = int(request.args.get('skip', 0))
+    except ValueError:
+        return jsonify({"error": "Parâmetros de paginação inválidos"}), 400
+    if limit < 0 or skip < 0:
+        return jsonify({"error": "Parâmetros de paginação inválidos"}), 400
+    
+    # Campos a devolver, faixas numéricas e ordenação (no lugar da relevância)
+    try:
+        fields = parse_fields(request.args.get('fields'))
+        ranges = parse_ranges(request.args)
+        sort = parse_sort(request.args.get('sort'))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
     
     # Buscar indústrias usando o modelo
-    results = IndustryModel.search(query, sector, region, limit, skip)
+    try:
+        results = IndustryModel.search(query, sector, region, limit, skip, cursor, fields, ranges, sort)
+    except ValueError:
+        return jsonify({"error": "Cursor inválido"}), 400
+    
+    return jsonify({
+        "count": len(results),
+        "results": results,
+        "next_cursor": next_cursor(results, limit, NUMERIC_FIELDS[sort[0]] if sort else "score")
+    })
+
+@app.route('/api/industries/suggest', methods=['GET'])
+def suggest_industries():
+    """Endpoint de autocompletar: empresas, produtos, setores e países que começam com o texto digitado"""
+    prefix = request.args.get('prefix', '')
+    try:
+        limit = int(request.args.get('limit', 10))
+    except ValueError:
+        return jsonify({"error": "Parâmetro limit inválido"}), 400
+    
+    results = IndustryModel.suggest(prefix, limit)
+    return jsonify({
+        "prefix": prefix,
+        "count": len(results),
+        "results": results
+    })
+
+@app.route('/api/industries/near', methods=['GET'])
+@conditional(COLLECTIONS['industries'])
+def get_industries_near():
+    """Endpoint para buscar indústrias dentro de um raio, ordenadas pela distância"""
+    try:
+        lat = float(request.args['lat'])
+        lng = float(request.args['lng'])
+        radius_km = float(request.args.get('radius_km', 100))
+        limit = int(request.args.get('limit', 100))
+    except KeyError:
+        return jsonify({"error": "Parâmetros obrigatórios ausentes: lat, lng"}), 400
+    except ValueError:
+        return jsonify({"error": "Parâmetros de localização inválidos"}), 400
+    
+    if not (-90 <= lat <= 90 and -180 <= lng <= 180):
+        return jsonify({"error": "Coordenadas fora dos limites"}), 400
+    
+    if not 0 < radius_km <= MAX_RADIUS_KM:
+        return jsonify({"error": f"radius_km deve estar entre 0 e {MAX_RADIUS_KM:g}"}), 400
+    
+    try:
+        fields = parse_fields(request.args.get('fields'))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    
+    results = IndustryModel.near(lat, lng, radius_km, request.args.get('sector'), limit, fields)
     
     return jsonify({
         "count": len(results),
@@ -75,6 +297,7 @@ def search_industries():
     })
 
 @app.route('/api/sectors', methods=['GET'])
+@conditional(COLLECTIONS['sectors'], COLLECTIONS['industries'])
 def get_sectors():
     """Endpoint para listar todos os setores disponíveis"""
     sectors = SectorModel.get_all()
@@ -83,6 +306,7 @@ def get_sectors():
     return jsonify(sector_names)
 
 @app.route('/api/countries', methods=['GET'])
+@conditional(COLLECTIONS['countries'], COLLECTIONS['industries'])
 def get_countries():
     """Endpoint para listar todos os países disponíveis"""
     countries = CountryModel.get_all()
@@ -90,6 +314,62 @@ def get_countries():
     country_names = [country["name"] for country in countries]
     return jsonify(country_names)
 
+@app.route('/api/facets', methods=['GET'])
+@conditional(COLLECTIONS['industries'])
+def get_facets():
+    """Endpoint com o número de indústrias por setor, país, região e status"""
+    return jsonify(facets.get_counts())
+
+@app.route('/api/stats', methods=['GET'])
+@conditional(COLLECTIONS['industries'])
+def get_stats():
+    """Endpoint com número de indústrias, funcionários e receita por setor, região, país ou status"""
+    group_by = request.args.get('group_by', 'sector')
+    if group_by not in stats.GROUP_FIELDS:
+        return jsonify({"error": f"Agrupamento inválido. Use {', '.join(stats.GROUP_FIELDS)}"}), 400
+    
+    try:
+        ranges = parse_ranges(request.args)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    
+    # Mesmos filtros da listagem, mais a região
+    filters = {}
+    for field in stats.GROUP_FIELDS:
+        if request.args.get(field):
+            filters[stats.MONGO_GROUP_FIELDS[field]] = request.args.get(field)
+    
+    results = IndustryModel.stats(group_by, filters, ranges)
+    
+    return jsonify({
+        "group_by": group_by,
+        "count": len(results),
+        "results": results
+    })
+
+@app.route('/api/map/clusters', methods=['GET'])
+@conditional(COLLECTIONS['industries'])
+def get_map_clusters():
+    """Endpoint com os clusters de indústrias da área visível do mapa"""
+    try:
+        bbox = clusters.parse_bbox(request.args.get('bbox', '-180,-90,180,90'))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    
+    try:
+        zoom = int(request.args.get('zoom', 0))
+    except ValueError:
+        return jsonify({"error": "Parâmetro zoom inválido"}), 400
+    
+    # Células pré-agregadas (total, centróide e setor predominante), nunca a lista completa
+    grid_zoom, results = clusters.get_clusters(bbox, zoom)
+    
+    return jsonify({
+        "zoom": grid_zoom,
+        "count": len(results),
+        "results": results
+    })
+
 # Novos endpoints para CRUD completo
 
 @app.route('/api/industries', methods=['POST'])
@@ -107,10 +387,35 @@ def create_industry():
     result = IndustryModel.create(data)
     
     if result:
+        IndustryModel.written(versions.bump(COLLECTIONS['industries']))
         return jsonify(result), 201
     else:
         return jsonify({"error": "Erro ao criar indústria"}), 500
 
+@app.route('/api/industries/bulk', methods=['POST'])
+def bulk_upsert_industries():
+    """Endpoint para criar ou atualizar várias indústrias (upsert pelo campo id do parceiro)"""
+    data = request.get_json(silent=True)
+    records = data.get("records") if isinstance(data, dict) else data
+    
+    if not isinstance(records, list):
+        return jsonify({"error": "Envie uma lista de registros ou {\"records\": [...]}"}), 400
+    
+    if len(records) > bulk.MAX_BULK_RECORDS:
+        return jsonify({"error": f"Máximo de {bulk.MAX_BULK_RECORDS} registros por requisição"}), 400
+    
+    # Registros inválidos são relatados individualmente, sem interromper o lote.
+    # Facetas e clusters são ajustados na hora; os parceiros sugeridos (/matches)
+    # não: após a carga, rode python matching.py rebuild
+    try:
+        report = bulk.ingest(records)
+    except RuntimeError as e:
+        return jsonify({"error": str(e)}), 503
+    
+    if report["inserted"] or report["updated"]:
+        versions.bump(COLLECTIONS['industries'])
+    return jsonify(report)
+
 @app.route('/api/industries/<industry_id>', methods=['PUT'])
 def update_industry(industry_id):
     """Endpoint para atualizar uma indústria existente"""
@@ -125,6 +430,7 @@ def update_industry(industry_id):
     success = IndustryModel.update(industry_id, data)
     
     if success:
+        IndustryModel.written(versions.bump(COLLECTIONS['industries']))
         updated = IndustryModel.get_by_id(industry_id)
         return jsonify(updated)
     else:
@@ -142,6 +448,7 @@ def delete_industry(industry_id):
     success = IndustryModel.delete(industry_id)
     
     if success:
+        IndustryModel.written(versions.bump(COLLECTIONS['industries']))
         return jsonify({"message": "Indústria removida com sucesso"}), 200
     else:
         return jsonify({"error": "Erro ao remover indústria"}), 500
@@ -0,0 +1,453 @@
+import argparse
+import heapq
+import logging
+import os
+import sys
+from datetime import datetime
+from pymongo import ReplaceOne, UpdateOne
+from pymongo.errors import PyMongoError
+from database import db, COLLECTIONS
+from regions import country_of
+from search_index import tokenize
+
+# Configuração de logging
+logger = logging.getLogger(__name__)
+
+# Parceiros guardados por indústria
+TOP_K = 10
+
+# Pesos de cada componente do score (somam 1)
+SECTOR_WEIGHT = 0.4
+MARKET_WEIGHT = 0.3
+PRODUCT_WEIGHT = 0.3
+
+# Status complementares: quem procura parceiros é combinado com quem está disponível
+COUNTERPART = {"seeking": "available", "available": "seeking"}
+
+# Campos usados no cálculo (projeção das consultas e gatilho das atualizações)
+MATCH_FIELDS = ("status", "sector", "products", "export_markets", "country", "location")
+
+# Máximo de candidatos avaliados por indústria, no rebuild e nas atualizações.
+# Os candidatos são lidos por faixas de prioridade (ver candidate_tiers), então
+# o limite descarta primeiro os que só compartilham um mercado
+MATCH_CANDIDATE_LIMIT = int(os.getenv('MATCH_CANDIDATE_LIMIT', 100))
+
+# Tokens curtos demais para indicar semelhança de produtos ("de", "para", ...)
+MIN_TOKEN_LENGTH = 4
+
+class Profile:
+    """Dados de uma indústria já preparados para o cálculo dos scores"""
+
+    __slots__ = ("id", "status", "sector", "country", "markets", "products")
+
+    def __init__(self, industry):
+        self.id = str(industry.get("_id", industry.get("id")))
+        self.status = industry.get("status")
+        self.sector = industry.get("sector")
+        self.country = country_of(industry)
+        self.markets = set(industry.get("export_markets") or ())
+        self.products = {
+            token
+            for product in industry.get("products") or ()
+            for token in tokenize(str(product))
+            if len(token) >= MIN_TOKEN_LENGTH
+        }
+
+
+def affects_matches(changes):
+    """
+    Indica se uma atualização ($set) pode alterar os parceiros sugeridos
+
+    Args:
+        changes (dict): Campos atualizados (aceita notação com ponto)
+
+    Returns:
+        bool: True se algum campo usado no cálculo foi alterado
+    """
+    return any(key.split(".")[0] in MATCH_FIELDS for key in changes)
+
+
+def _jaccard(a, b):
+    if not a or not b:
+        return 0.0
+    shared = len(a & b)
+    return shared / (len(a) + len(b) - shared) if shared else 0.0
+
+
+def _components(a, b):
+    """Componentes do score, sem arredondamento: (setor, mercados, produtos)"""
+    sector = 1.0 if a.sector and a.sector == b.sector else 0.0
+    reach = ((b.country in a.markets) + (a.country in b.markets)) / 2
+    markets = max(reach, _jaccard(a.markets, b.markets))
+    return sector, markets, _jaccard(a.products, b.products)
+
+
+def score(a, b):
+    """
+    Afinidade entre duas indústrias
+
+    Componentes (0 a 1): mesmo setor; mercados (uma exporta para o país da
+    outra, ou ambas atendem os mesmos mercados); semelhança dos produtos.
+
+    Args:
+        a (Profile): Primeira indústria
+        b (Profile): Segunda indústria
+
+    Returns:
+        tuple: (score total, dict com os componentes)
+    """
+    sector, markets, products = _components(a, b)
+    total = SECTOR_WEIGHT * sector + MARKET_WEIGHT * markets + PRODUCT_WEIGHT * products
+    return round(total, 4), {
+        "sector": sector,
+        "markets": round(markets, 4),
+        "products": round(products, 4)
+    }
+
+
+def _entry(profile, total, components):
+    """Item guardado na lista de parceiros"""
+    return {"id": profile.id, "score": total, **components}
+
+
+def _min_score(matches):
+    """Score que um novo parceiro precisa superar para entrar na lista (0 se há vaga)"""
+    return matches[-1]["score"] if len(matches) >= TOP_K else 0
+
+
+def _block_keys(profile):
+    """Chaves pelas quais uma indústria é encontrada como candidata (ver candidate_tiers)"""
+    keys = []
+    if profile.sector:
+        keys.append(("sector", profile.sector))
+        if profile.country:
+            keys.append(("sector_country", profile.sector, profile.country))
+        keys.extend(("sector_market", profile.sector, market) for market in profile.markets)
+    if profile.country:
+        keys.append(("country", profile.country))
+    keys.extend(("market", market) for market in profile.markets)
+    return keys
+
+
+def candidate_tiers(profile):
+    """
+    Faixas de candidatos de uma indústria, da mais promissora para a menos
+
+    Primeiro vêm as de mesmo setor que estão nos mercados da indústria ou
+    exportam para o país dela (setor e mercados pontuam), depois as de mesmo
+    setor e, por fim, as que só se ligam pelos mercados. Só são considerados
+    candidatos de status complementar; os demais teriam, no máximo, a parcela
+    de produtos.
+
+    Args:
+        profile (Profile): Indústria de referência
+
+    Returns:
+        list: Faixas (listas de chaves), vazia se a indústria não participa das combinações
+    """
+    if profile.status not in COUNTERPART:
+        return []
+    markets = sorted(profile.markets)
+    tiers = []
+    if profile.sector:
+        tiers.append([("sector_country", profile.sector, market) for market in markets])
+        if profile.country:
+            tiers.append([("sector_market", profile.sector, profile.country)])
+        tiers.append([("sector_market", profile.sector, market) for market in markets])
+        tiers.append([("sector", profile.sector)])
+    tiers.append([("country", market) for market in markets])
+    if profile.country:
+        tiers.append([("market", profile.country)])
+    tiers.append([("market", market) for market in markets])
+    return [tier for tier in tiers if tier]
+
+
+# Filtro do MongoDB de cada tipo de chave
+_KEY_FILTERS = {
+    "sector": lambda sector: {"sector": sector},
+    "sector_country": lambda sector, country: {"sector": sector, "location.country": country},
+    "sector_market": lambda sector, market: {"sector": sector, "export_markets": market},
+    "country": lambda country: {"location.country": country},
+    "market": lambda market: {"export_markets": market}
+}
+
+
+def tier_query(profile, tier):
+    """
+    Filtro do MongoDB com os candidatos de uma faixa
+
+    Args:
+        profile (Profile): Indústria de referência
+        tier (list): Chaves da faixa (ver candidate_tiers)
+
+    Returns:
+        dict: Filtro
+    """
+    clauses = [_KEY_FILTERS[key[0]](*key[1:]) for key in tier]
+    query = {"status": COUNTERPART[profile.status]}
+    if len(clauses) == 1:
+        query.update(clauses[0])
+    else:
+        query["$or"] = clauses
+    return query
+
+
+class MatchIndex:
+    """
+    Cálculo em memória dos melhores parceiros de cada indústria
+
+    Os candidatos saem de listas invertidas pelas mesmas chaves de
+    candidate_tiers, na ordem dos registros, com o mesmo limite das
+    atualizações no MongoDB (que leem cada faixa ordenada por _id). Usado
+    sobre os dados simulados e para recalcular a coleção connections.
+    """
+
+    def __init__(self, industries, limit=MATCH_CANDIDATE_LIMIT):
+        self.limit = limit
+        self.profiles = [Profile(industry) for industry in industries]
+        self.positions = {profile.id: position for position, profile in enumerate(self.profiles)}
+        self.blocks = {}
+        for position, profile in enumerate(self.profiles):
+            for key in _block_keys(profile):
+                self.blocks.setdefault((profile.status,) + key, []).append(position)
+
+    def _candidates(self, profile):
+        counterpart = COUNTERPART.get(profile.status)
+        chosen = set()
+        for tier in candidate_tiers(profile):
+            remaining = self.limit - len(chosen)
+            if remaining <= 0:
+                break
+            # Como no MongoDB, o limite de cada faixa conta também os candidatos já escolhidos
+            previous = None
+            for position in heapq.merge(*(self.blocks.get((counterpart,) + key, ()) for key in tier)):
+                if position == previous:
+                    continue
+                previous = position
+                chosen.add(position)
+                remaining -= 1
+                if remaining == 0:
+                    break
+        return chosen
+
+    def top(self, profile, k=TOP_K):
+        """
+        Melhores parceiros de uma indústria
+
+        Args:
+            profile (Profile): Indústria de referência
+            k (int): Número de parceiros
+
+        Returns:
+            list: Itens {"id", "score", "sector", "markets", "products"}, do maior score para o menor
+        """
+        scored = []
+        for position in self._candidates(profile):
+            candidate = self.profiles[position]
+            if candidate.id == profile.id:
+                continue
+            # Só o total é calculado aqui; os componentes, apenas para os K escolhidos
+            sector, markets, products = _components(profile, candidate)
+            total = round(SECTOR_WEIGHT * sector + MARKET_WEIGHT * markets + PRODUCT_WEIGHT * products, 4)
+            if total > 0:
+                scored.append((-total, candidate.id, candidate))
+        return [_entry(candidate, *score(profile, candidate)) for _, _, candidate in heapq.nsmallest(k, scored)]
+
+    def get(self, industry_id, k=TOP_K):
+        """
+        Melhores parceiros de uma indústria do índice, pelo ID
+
+        Args:
+            industry_id (str): ID da indústria
+            k (int): Número de parceiros
+
+        Returns:
+            list: Itens de top(), ou None se a indústria não existe ou não participa das combinações
+        """
+        position = self.positions.get(str(industry_id))
+        if position is None or self.profiles[position].status not in COUNTERPART:
+            return None
+        return self.top(self.profiles[position], k)
+
+    def all(self, k=TOP_K):
+        """Parceiros de todas as indústrias: {id: lista}"""
+        return {profile.id: self.top(profile, k) for profile in self.profiles if profile.status in COUNTERPART}
+
+
+def refresh(industry):
+    """
+    Recalcula os parceiros de uma indústria após uma criação ou atualização
+
+    A indústria sai das listas em que estava, ganha a própria lista e entra
+    nas listas dos candidatos em que cabe ($push com $sort/$slice mantém
+    apenas os TOP_K melhores, de forma atômica, sem ler as listas).
+
+    Cada lista guarda em min_score o score que um novo parceiro precisa
+    superar; o filtro das atualizações usa esse campo, de modo que só as
+    listas que realmente mudam são escritas. Após um $push o valor não é
+    recalculado e fica menor ou igual ao real (o filtro nunca recusa um
+    parceiro que deveria entrar); o rebuild volta a deixá-lo exato.
+    Candidatos sem lista não ganham uma (ficam para o próximo rebuild).
+
+    Args:
+        industry (dict): Documento atual da indústria
+    """
+    connections = db.get_collection(COLLECTIONS['connections'])
+    industries = db.get_collection(COLLECTIONS['industries'])
+    if connections is None or industries is None:
+        return
+
+    profile = Profile(industry)
+    try:
+        # Listas que perdem um item passam a ter vaga
+        connections.update_many(
+            {"matches.id": profile.id},
+            {"$pull": {"matches": {"id": profile.id}}, "$set": {"min_score": 0}}
+        )
+
+        tiers = candidate_tiers(profile)
+        if not tiers:
+            connections.delete_one({"_id": profile.id})
+            return
+
+        # Faixas em ordem de prioridade, cada uma ordenada por _id, como no MatchIndex do rebuild
+        documents = {}
+        for tier in tiers:
+            remaining = MATCH_CANDIDATE_LIMIT - len(documents)
+            if remaining <= 0:
+                break
+            cursor = industries.find(tier_query(profile, tier), {field: 1 for field in MATCH_FIELDS})
+            for document in cursor.sort("_id", 1).limit(remaining):
+                documents.setdefault(document["_id"], document)
+
+        scored = []
+        for document in documents.values():
+            candidate = Profile(document)
+            if candidate.id == profile.id:
+                continue
+            total, components = score(profile, candidate)
+            if total > 0:
+                scored.append((total, candidate, components))
+        scored.sort(key=lambda item: (-item[0], item[1].id))
+
+        now = datetime.utcnow()
+        matches = [_entry(candidate, total, components) for total, candidate, components in scored[:TOP_K]]
+        operations = [ReplaceOne(
+            {"_id": profile.id},
+            {"matches": matches, "min_score": _min_score(matches), "updated_at": now},
+            upsert=True
+        )]
+        operations.extend(
+            UpdateOne(
+                # $not também aceita listas gravadas antes de existir min_score
+                {"_id": candidate.id, "min_score": {"$not": {"$gte": total}}},
+                {
+                    "$push": {"matches": {"$each": [_entry(profile, total, components)],
+                                          "$sort": {"score": -1}, "$slice": TOP_K}},
+                    "$set": {"updated_at": now}
+                }
+            )
+            for total, candidate, components in scored
+        )
+        connections.bulk_write(operations, ordered=False)
+    except PyMongoError as e:
+        # A escrita principal já foi feita; o próximo rebuild corrige as listas
+        logger.error(f"Erro ao atualizar parceiros de {profile.id}: {e}")
+
+
+def remove(industry):
+    """
+    Retira uma indústria removida de todas as listas de parceiros
+
+    Args:
+        industry (dict): Documento removido
+    """
+    connections = db.get_collection(COLLECTIONS['connections'])
+    if connections is None:
+        return
+
+    industry_id = Profile(industry).id
+    try:
+        connections.delete_one({"_id": industry_id})
+        connections.update_many(
+            {"matches.id": industry_id},
+            {"$pull": {"matches": {"id": industry_id}}, "$set": {"min_score": 0}}
+        )
+    except PyMongoError as e:
+        logger.error(f"Erro ao remover parceiros de {industry_id}: {e}")
+
+
+def get_matches(industry_id):
+    """
+    Recupera os parceiros guardados de uma indústria (uma leitura, O(K))
+
+    Args:
+        industry_id (str): ID da indústria
+
+    Returns:
+        list: Itens {"id", "score", "sector", "markets", "products"}, ou None se não houver lista
+    """
+    connections = db.get_collection(COLLECTIONS['connections'])
+
+    if connections is not None:
+        document = connections.find_one({"_id": str(industry_id)})
+        return document["matches"] if document else None
+
+    # Sem banco, só a lista pedida é calculada (candidatos limitados)
+    from models import get_mock_match_index
+    return get_mock_match_index().get(industry_id)
+
+
+def rebuild(database):
+    """
+    Recalcula os parceiros de todas as indústrias
+
+    Usado para a carga inicial, após cargas em lote e para corrigir listas
+    que ficaram menores que TOP_K após remoções.
+
+    Args:
+        database: Banco de dados do MongoDB
+
+    Returns:
+        int: Número de listas gravadas
+    """
+    # Ordem de _id, a mesma das faixas lidas por refresh
+    industries = database[COLLECTIONS['industries']].find(
+        {"status": {"$in": list(COUNTERPART)}}, {field: 1 for field in MATCH_FIELDS}
+    ).sort("_id", 1)
+    matches = MatchIndex(industries).all()
+
+    rebuilt_at = datetime.utcnow()
+    collection = database[COLLECTIONS['connections']]
+    operations = [
+        ReplaceOne(
+            {"_id": industry_id},
+            {"matches": top, "min_score": _min_score(top), "updated_at": rebuilt_at},
+            upsert=True
+        )
+        for industry_id, top in matches.items()
+    ]
+    for start in range(0, len(operations), 1000):
+        collection.bulk_write(operations[start:start + 1000], ordered=False)
+    collection.delete_many({"updated_at": {"$lt": rebuilt_at}})
+    return len(operations)
+
+
+def main(argv=None):
+    """Linha de comando: python matching.py rebuild"""
+    parser = argparse.ArgumentParser(description="Gerencia os parceiros sugeridos (coleção connections)")
+    parser.add_argument("command", choices=["rebuild"], help="rebuild recalcula os parceiros de todas as indústrias")
+    parser.parse_args(argv)
+
+    if not db.is_connected():
+        logger.error("Banco de dados não disponível")
+        return 2
+
+    total = rebuild(db.db)
+    logger.info(f"Parceiros recalculados: {total} indústrias")
+    return 0
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO)
+    sys.exit(main())
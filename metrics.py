@@ -0,0 +1,153 @@
+import os
+import threading
+import time
+from flask import g, request
+from pymongo import monitoring
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Gauge, Histogram, generate_latest
+)
+from prometheus_client import multiprocess
+
+# Com o gunicorn (vários workers), defina PROMETHEUS_MULTIPROC_DIR com um
+# diretório vazio e gravável: cada worker grava suas séries ali e /metrics
+# soma todas elas, independentemente do worker que atender a coleta
+MULTIPROC_DIR = os.getenv('PROMETHEUS_MULTIPROC_DIR')
+
+# Faixas dos histogramas (segundos e bytes)
+REQUEST_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+COMMAND_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+
+# Rótulo das requisições que não correspondem a nenhuma rota (404)
+UNMATCHED_ROUTE = "unmatched"
+
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds", "Duração das requisições HTTP, por rota",
+    ["method", "route", "status"], buckets=REQUEST_BUCKETS
+)
+REQUESTS_IN_FLIGHT = Gauge(
+    "http_requests_in_flight", "Requisições HTTP em andamento, por rota",
+    ["method", "route"], multiprocess_mode="livesum"
+)
+RESPONSE_SIZE = Histogram(
+    "http_response_size_bytes", "Tamanho das respostas HTTP com Content-Length, por rota",
+    ["method", "route"], buckets=SIZE_BUCKETS
+)
+MONGO_COMMAND_DURATION = Histogram(
+    "mongodb_command_duration_seconds", "Duração dos comandos enviados ao MongoDB",
+    ["collection", "command", "outcome"], buckets=COMMAND_BUCKETS
+)
+MOCK_FALLBACKS = Counter(
+    "industry_mock_fallbacks_total", "Operações do IndustryModel atendidas pelos dados simulados",
+    ["operation"]
+)
+
+
+class CommandTimings(monitoring.CommandListener):
+    """
+    Duração dos comandos do MongoDB, alimentada pelos eventos do pymongo
+
+    Os eventos de conclusão não trazem o comando; a coleção é guardada no
+    início de cada comando e recuperada pelo par (request_id, connection_id).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._collections = {}
+
+    @staticmethod
+    def _collection(event):
+        target = event.command.get(event.command_name)
+        if isinstance(target, str):
+            return target
+        # getMore traz o id do cursor no lugar do nome da coleção
+        collection = event.command.get("collection")
+        return collection if isinstance(collection, str) else event.database_name
+
+    def _observe(self, event, outcome):
+        with self._lock:
+            collection = self._collections.pop((event.request_id, event.connection_id), None)
+        MONGO_COMMAND_DURATION.labels(
+            collection or event.database_name, event.command_name, outcome
+        ).observe(event.duration_micros / 1e6)
+
+    # Eventos dos comandos (pymongo.monitoring.CommandListener)
+
+    def started(self, event):
+        with self._lock:
+            self._collections[(event.request_id, event.connection_id)] = self._collection(event)
+
+    def succeeded(self, event):
+        self._observe(event, "success")
+
+    def failed(self, event):
+        self._observe(event, "failure")
+
+
+def mock_fallback(operation):
+    """
+    Conta uma operação do IndustryModel atendida pelos dados simulados
+
+    Args:
+        operation (str): Nome do método (get_all, search, ...)
+    """
+    MOCK_FALLBACKS.labels(operation).inc()
+
+
+def _route():
+    """Rota da requisição atual (o padrão da URL, não o caminho, para limitar as séries)"""
+    return request.url_rule.rule if request.url_rule is not None else UNMATCHED_ROUTE
+
+
+def _before_request():
+    g.metrics_started = time.perf_counter()
+    g.metrics_route = _route()
+    REQUESTS_IN_FLIGHT.labels(request.method, g.metrics_route).inc()
+
+
+def _after_request(response):
+    g.metrics_status = response.status_code
+    # Respostas transmitidas em partes (exportações) não têm tamanho conhecido
+    if response.content_length is not None and "metrics_route" in g:
+        RESPONSE_SIZE.labels(request.method, g.metrics_route).observe(response.content_length)
+    return response
+
+
+def _teardown_request(error=None):
+    started = g.pop("metrics_started", None)
+    if started is None:
+        return
+    route = g.pop("metrics_route")
+    status = g.pop("metrics_status", 500)
+    REQUEST_LATENCY.labels(request.method, route, str(status)).observe(time.perf_counter() - started)
+    REQUESTS_IN_FLIGHT.labels(request.method, route).dec()
+
+
+def init_app(app, database=None):
+    """
+    Instrumenta as requisições da aplicação e os comandos do MongoDB
+
+    Args:
+        app (Flask): Aplicação
+        database (Database): Conexão cujos comandos serão medidos (None para não medir)
+    """
+    app.before_request(_before_request)
+    app.after_request(_after_request)
+    app.teardown_request(_teardown_request)
+    if database is not None:
+        database.add_event_listener(CommandTimings())
+
+
+def render():
+    """
+    Gera o texto de exposição do Prometheus
+
+    Returns:
+        tuple: (conteúdo, content type)
+    """
+    if MULTIPROC_DIR:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
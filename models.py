@@ -1,12 +1,257 @@
+import os
+import re
 from datetime import datetime
 from bson import ObjectId
+from pymongo import ReturnDocument
 from database import db, COLLECTIONS
+from search_index import IndustryIndex
+from snapshot import LiveSnapshot, restore
+from suggest import LiveSuggestIndex, SuggestIndex, SUGGEST_FIELDS, affects_suggestions
+from http_cache import versions
+from numeric import NUMERIC_FIELDS, mongo_query, parse_revenue
+from pagination import decode_cursor
+from regions import region_changes, region_of
+from projection import FIELD_PRESETS, mongo_projection, project
+import facets
+import clusters
+import geo
+import matching
+import metrics
+import stats
+
+# Caracteres com significado especial em $search (frases e negação)
+TEXT_SEARCH_OPERATORS = re.compile(r'["\-\\]')
+
+# Campos dos filtros do Mongo que têm outro nome nos dados simulados
+MOCK_FIELD_NAMES = {"location.country": "country"}
+
+# Snapshot (python snapshot.py build) usado no lugar de mock_data quando não há banco
+DATASET_SNAPSHOT = os.getenv('DATASET_SNAPSHOT')
+
+# Segundos entre as verificações de alteração do arquivo do snapshot
+SNAPSHOT_CHECK_INTERVAL = float(os.getenv('SNAPSHOT_CHECK_INTERVAL', 5))
+
+# Segundos entre as verificações de versão do índice de sugestões de cada processo
+SUGGEST_REFRESH_INTERVAL = float(os.getenv('SUGGEST_REFRESH_INTERVAL', 30))
+
+# MockDataset, ou LiveSnapshot que o recarrega quando o arquivo do snapshot muda
+_mock_dataset = None
+
+
+class MockDataset:
+    """
+    Registros servidos sem banco e as estruturas em memória construídas sobre eles
+
+    O índice de texto e atributos vem do snapshot quando ele o tem gravado;
+    as listas de candidatos a parceiro são montadas na carga. As grades
+    espaciais e o índice de sugestões, usados por poucas rotas, são
+    construídos no primeiro uso. Uma recarga do snapshot cria outro MockDataset.
+    """
+
+    def __init__(self, records):
+        self.records = records
+        self.index = restore(records, "industry", IndustryIndex)
+        self.matches = matching.MatchIndex(records)
+        self._geo_index = None
+        self._cluster_grid = None
+        self._suggest_index = None
+
+    def geo_index(self):
+        """Grade de coordenadas (mesmas posições de index)"""
+        if self._geo_index is None:
+            self._geo_index = geo.GridIndex(self.records)
+        return self._geo_index
+
+    def cluster_grid(self):
+        """Grade de clusters do mapa"""
+        if self._cluster_grid is None:
+            self._cluster_grid = clusters.ClusterGrid(self.records)
+        return self._cluster_grid
+
+    def suggest_index(self):
+        """Índice de sugestões (o snapshot pode trazê-lo pronto)"""
+        if self._suggest_index is None:
+            self._suggest_index = restore(self.records, "suggest", SuggestIndex)
+        return self._suggest_index
+
+
+def get_mock_dataset():
+    """
+    Retorna os dados simulados, carregados na primeira chamada
+
+    Os registros recebem o campo region, como os documentos do MongoDB. Com
+    DATASET_SNAPSHOT, os registros são lidos do snapshot mapeado em memória
+    (que já traz region) em vez de mock_data, e o arquivo é recarregado em
+    segundo plano quando muda, como em app.py.
+
+    Returns:
+        MockDataset: Registros e índices atuais
+    """
+    global _mock_dataset
+    if _mock_dataset is None:
+        if DATASET_SNAPSHOT:
+            _mock_dataset = LiveSnapshot(DATASET_SNAPSHOT, MockDataset, SNAPSHOT_CHECK_INTERVAL)
+        else:
+            from mock_data import mock_industries
+            _mock_dataset = MockDataset([dict(industry, region=region_of(industry)) for industry in mock_industries])
+    return _mock_dataset.get() if isinstance(_mock_dataset, LiveSnapshot) else _mock_dataset
+
+
+def get_mock_index():
+    """
+    Retorna o índice em memória sobre os dados simulados (ver get_mock_dataset)
+    
+    Returns:
+        IndustryIndex: Índice de texto e atributos sobre os dados simulados
+    """
+    return get_mock_dataset().index
+
+
+def get_mock_match_index():
+    """
+    Retorna os candidatos a parceiro dos dados simulados (ver get_mock_dataset)
+    
+    Returns:
+        MatchIndex: Listas de candidatos; os parceiros de cada indústria são calculados na consulta
+    """
+    return get_mock_dataset().matches
+
+
+def _load_suggestions():
+    """Constrói o índice de sugestões a partir das indústrias atuais"""
+    collection = db.get_collection(COLLECTIONS['industries'])
+    if collection is not None:
+        return SuggestIndex(collection.find({}, {field: 1 for field in SUGGEST_FIELDS}))
+    # Fallback para dados simulados
+    metrics.mock_fallback("suggest")
+    return get_mock_dataset().suggest_index()
+
+
+# Totais de /api/stats deste processo, válidos enquanto a versão das indústrias não mudar
+_stats_cache = stats.StatsCache()
+
+# Índice de sugestões deste processo (construído na primeira consulta)
+_suggestions = LiveSuggestIndex(
+    _load_suggestions, lambda: versions.get(COLLECTIONS['industries'])[0], SUGGEST_REFRESH_INTERVAL
+)
+
+
+def _paginate(collection, query, limit, skip, cursor, fields=None, sort=None):
+    """
+    Executa uma consulta paginada ordenada por _id ou por um campo numérico
+    
+    Com cursor, a página começa logo após o último _id entregue (busca por
+    intervalo no índice de _id), em vez de descartar os documentos pulados.
+    Ordenada por um campo numérico, a chave é o par (valor, _id), na mesma
+    direção, coberto pelos índices campo + _id.
+    
+    Args:
+        collection: Coleção do MongoDB
+        query (dict): Filtros da consulta
+        limit (int): Número máximo de resultados
+        skip (int): Número de resultados para pular, ignorado quando há cursor
+        cursor (str): Cursor da página anterior
+        fields (list): Campos a devolver (None para o documento completo)
+        sort (tuple): (campo, decrescente) de numeric.parse_sort, ou None para ordenar por _id
+        
+    Returns:
+        list: Documentos da página
+        
+    Raises:
+        ValueError: Se o cursor estiver malformado
+    """
+    field = NUMERIC_FIELDS[sort[0]] if sort else "_id"
+    direction = -1 if sort and sort[1] else 1
+    if cursor:
+        after, value = decode_cursor(cursor)
+        if not ObjectId.is_valid(after) or (sort and value is None):
+            raise ValueError("Cursor inválido")
+        operator = "$lt" if direction < 0 else "$gt"
+        if sort:
+            query = dict(query, **{"$or": [
+                {field: {operator: value}},
+                {field: value, "_id": {operator: ObjectId(after)}}
+            ]})
+        else:
+            query = dict(query, _id={"$gt": ObjectId(after)})
+        skip = 0
+    projection = mongo_projection(fields)
+    if sort and projection:
+        # O valor ordenado compõe o cursor da próxima página
+        projection[field] = 1
+    documents = collection.find(query, projection)
+    order = [(field, direction), ("_id", direction)] if sort else [("_id", 1)]
+    return list(documents.sort(order).skip(skip).limit(limit))
+
+
+def _paginate_ranked(collection, query, limit, skip, cursor, fields=None):
+    """
+    Executa uma busca $text paginada, ordenada por relevância e depois por _id
+    
+    O score de relevância é devolvido em cada documento (campo "score") e o
+    cursor guarda o par (score, _id) do último documento entregue.
+    
+    Args:
+        collection: Coleção do MongoDB
+        query (dict): Filtros da consulta, incluindo o operador $text
+        limit (int): Número máximo de resultados
+        skip (int): Número de resultados para pular, ignorado quando há cursor
+        cursor (str): Cursor da página anterior
+        fields (list): Campos a devolver (None para o documento completo)
+        
+    Returns:
+        list: Documentos da página
+        
+    Raises:
+        ValueError: Se o cursor estiver malformado
+    """
+    pipeline = [
+        {"$match": query},
+        {"$addFields": {"score": {"$meta": "textScore"}}}
+    ]
+    
+    if cursor:
+        after, score = decode_cursor(cursor)
+        if not ObjectId.is_valid(after) or score is None:
+            raise ValueError("Cursor inválido")
+        pipeline.append({"$match": {"$or": [
+            {"score": {"$lt": score}},
+            {"score": score, "_id": {"$gt": ObjectId(after)}}
+        ]}})
+        skip = 0
+    
+    pipeline.append({"$sort": {"score": -1, "_id": 1}})
+    if skip:
+        pipeline.append({"$skip": skip})
+    if limit:
+        pipeline.append({"$limit": limit})
+    projection = mongo_projection(fields)
+    if projection:
+        pipeline.append({"$project": projection})
+    return list(collection.aggregate(pipeline))
+
+
+def _text_search(query):
+    """
+    Prepara o texto do usuário para o operador $text
+    
+    Aspas e hífens são removidos para que a entrada seja sempre tratada como
+    termos simples, nunca como frases exatas ou termos negados.
+    
+    Args:
+        query (str): Texto para busca
+        
+    Returns:
+        str: Termos separados por espaço (vazio se não restar nenhum termo)
+    """
+    return " ".join(TEXT_SEARCH_OPERATORS.sub(" ", query).split())
+
 
 class IndustryModel:
     """Modelo para operações com indústrias no banco de dados"""
     
     @staticmethod
-    def get_all(filters=None, limit=100, skip=0):
+    def get_all(filters=None, limit=100, skip=0, cursor=None, fields=None, ranges=None, sort=None):
         """
         Recupera todas as indústrias com filtros opcionais
         
@@ -14,20 +259,70 @@ class IndustryModel:
             filters (dict): Filtros a serem aplicados
             limit (int): Número máximo de resultados
             skip (int): Número de resultados para pular (paginação)
+            cursor (str): Cursor da página anterior (paginação por chave, substitui skip)
+            fields (list): Campos a devolver (None para o documento completo)
+            ranges (dict): Faixas de employees, founded e revenue (ver numeric.parse_ranges)
+            sort (tuple): Ordenação por um campo numérico (ver numeric.parse_sort)
             
         Returns:
             list: Lista de indústrias
+            
+        Raises:
+            ValueError: Se o cursor estiver malformado
         """
         collection = db.get_collection(COLLECTIONS['industries'])
         query = filters if filters else {}
         
-        if collection:
-            cursor = collection.find(query).limit(limit).skip(skip)
-            return list(cursor)
+        if collection is not None:
+            query = dict(query, **mongo_query(ranges, sort))
+            return _paginate(collection, query, limit, skip, cursor, fields, sort)
         else:
             # Fallback para dados simulados quando não há conexão com o banco
-            from mock_data import mock_industries
-            return mock_industries
+            metrics.mock_fallback("get_all")
+            mock_filters = {MOCK_FIELD_NAMES.get(field, field): value for field, value in query.items()}
+            after = decode_cursor(cursor)[0] if cursor else None
+            results = get_mock_index().find(filters=mock_filters, limit=limit, skip=skip, after=after,
+                                            ranges=ranges, sort=sort)
+            return [project(industry, fields) for industry in results]
+    
+    @staticmethod
+    def iter_all(filters=None, batch_size=1000, ranges=None, sort=None):
+        """
+        Percorre todas as indústrias que atendem aos filtros, sem materializar a lista
+        
+        Args:
+            filters (dict): Filtros a serem aplicados
+            batch_size (int): Documentos trazidos do MongoDB por lote
+            ranges (dict): Faixas de employees, founded e revenue (ver numeric.parse_ranges)
+            sort (tuple): Ordenação por um campo numérico (ver numeric.parse_sort)
+            
+        Yields:
+            dict: Cada indústria, em ordem de _id ou na ordenação pedida
+        """
+        collection = db.get_collection(COLLECTIONS['industries'])
+        query = filters if filters else {}
+        
+        if collection is not None:
+            query = dict(query, **mongo_query(ranges, sort))
+            if sort:
+                direction = -1 if sort[1] else 1
+                order = [(NUMERIC_FIELDS[sort[0]], direction), ("_id", direction)]
+            else:
+                order = [("_id", 1)]
+            cursor = collection.find(query).sort(order).batch_size(batch_size)
+            try:
+                for document in cursor:
+                    yield document
+            finally:
+                # Libera o cursor no servidor mesmo se o cliente abandonar o download
+                cursor.close()
+        else:
+            # Fallback para dados simulados
+            metrics.mock_fallback("iter_all")
+            index = get_mock_index()
+            mock_filters = {MOCK_FIELD_NAMES.get(field, field): value for field, value in query.items()}
+            for position in index.find_positions(filters=mock_filters, ranges=ranges, sort=sort):
+                yield index.records[position]
     
     @staticmethod
     def get_by_id(industry_id):
@@ -42,18 +337,45 @@ class IndustryModel:
         """
         collection = db.get_collection(COLLECTIONS['industries'])
         
-        if collection:
+        if collection is not None:
             try:
                 return collection.find_one({"_id": ObjectId(industry_id)})
             except:
                 return None
         else:
             # Fallback para dados simulados
-            from mock_data import mock_industries
-            return next((i for i in mock_industries if i["id"] == industry_id), None)
+            metrics.mock_fallback("get_by_id")
+            return get_mock_index().get(industry_id)
     
     @staticmethod
-    def search(query=None, sector=None, region=None, limit=100, skip=0):
+    def get_by_ids(industry_ids, fields=None):
+        """
+        Recupera várias indústrias pelo ID em uma única consulta
+        
+        Args:
+            industry_ids (list): IDs das indústrias
+            fields (list): Campos a devolver (None para o documento completo)
+            
+        Returns:
+            list: Indústrias encontradas, na ordem dos IDs solicitados
+        """
+        collection = db.get_collection(COLLECTIONS['industries'])
+        
+        if collection is not None:
+            object_ids = [ObjectId(i) for i in industry_ids if ObjectId.is_valid(i)]
+            if not object_ids:
+                return []
+            cursor = collection.find({"_id": {"$in": object_ids}}, mongo_projection(fields))
+            documents = {doc["_id"]: doc for doc in cursor}
+            return [documents[oid] for oid in object_ids if oid in documents]
+        else:
+            # Fallback para dados simulados
+            metrics.mock_fallback("get_by_ids")
+            return [project(industry, fields) for industry in get_mock_index().get_many(industry_ids)]
+    
+    @staticmethod
+    def search(query=None, sector=None, region=None, limit=100, skip=0, cursor=None, fields=None,
+               ranges=None, sort=None):
         """
         Busca indústrias com base em texto, setor e/ou região
         
@@ -63,71 +385,101 @@ class IndustryModel:
             region (str): Região para filtrar
             limit (int): Número máximo de resultados
             skip (int): Número de resultados para pular (paginação)
+            cursor (str): Cursor da página anterior (paginação por chave, substitui skip)
+            fields (list): Campos a devolver (None para o documento completo)
+            ranges (dict): Faixas de employees, founded e revenue (ver numeric.parse_ranges)
+            sort (tuple): Ordenação por um campo numérico, no lugar da relevância (ver numeric.parse_sort)
             
         Returns:
             list: Lista de indústrias que correspondem aos critérios
+            
+        Raises:
+            ValueError: Se o cursor estiver malformado
         """
         collection = db.get_collection(COLLECTIONS['industries'])
         search_query = {}
         
-        # Adiciona filtro de texto se fornecido
+        # Adiciona filtro de texto se fornecido (servido pelo índice de texto ponderado)
         if query:
-            search_query["$or"] = [
-                {"name": {"$regex": query, "$options": "i"}},
-                {"description": {"$regex": query, "$options": "i"}},
-                {"products": {"$elemMatch": {"$regex": query, "$options": "i"}}}
-            ]
+            terms = _text_search(query)
+            if not terms:
+                return []
+            search_query["$text"] = {"$search": terms}
         
         # Adiciona filtro de setor se fornecido
         if sector and sector != "Todos os setores":
             search_query["sector"] = sector
         
-        # Adiciona filtro de região se fornecido
+        # Adiciona filtro de região se fornecido (campo region gravado na escrita)
         if region and region != "Global":
-            # Mapeamento simplificado de regiões para países
-            region_countries = {
-                "América do Sul": ["Brasil", "Argentina", "Chile", "Paraguai", "Uruguai", "Colômbia", "Peru"],
-                "Europa": ["Alemanha", "Portugal", "França", "Espanha", "Itália"],
-                "América do Norte": ["Estados Unidos", "Canadá", "México"],
-                "Ásia": ["Japão", "China", "Índia", "Coreia do Sul"],
-                "África": ["África do Sul", "Egito", "Nigéria"],
-                "Oceania": ["Austrália", "Nova Zelândia"]
+            search_query["region"] = region
+        
+        if collection is not None:
+            search_query.update(mongo_query(ranges, sort))
+            if query and not sort:
+                return _paginate_ranked(collection, search_query, limit, skip, cursor, fields)
+            return _paginate(collection, search_query, limit, skip, cursor, fields, sort)
+        else:
+            # Fallback para dados simulados: interseção dos índices de setor e região,
+            # com o texto verificado apenas sobre os sobreviventes
+            metrics.mock_fallback("search")
+            filters = {
+                "sector": search_query.get("sector"),
+                "region": search_query.get("region")
             }
+            after = decode_cursor(cursor)[0] if cursor else None
+            results = get_mock_index().find(query, filters, limit=limit, skip=skip, after=after,
+                                            ranges=ranges, sort=sort)
+            return [project(industry, fields) for industry in results]
+    
+    @staticmethod
+    def near(lat, lng, radius_km, sector=None, limit=100, fields=None):
+        """
+        Busca indústrias dentro de um raio, da mais próxima à mais distante
+        
+        Args:
+            lat (float): Latitude do centro
+            lng (float): Longitude do centro
+            radius_km (float): Raio em km
+            sector (str): Setor para filtrar
+            limit (int): Número máximo de resultados
+            fields (list): Campos a devolver (None para o documento completo)
             
-            if region in region_countries:
-                search_query["location.country"] = {"$in": region_countries[region]}
+        Returns:
+            list: Indústrias com o campo distance_km
+        """
+        collection = db.get_collection(COLLECTIONS['industries'])
         
-        if collection:
-            cursor = collection.find(search_query).limit(limit).skip(skip)
-            return list(cursor)
+        if collection is not None:
+            # $geoNear usa o índice 2dsphere do campo geo e já devolve os documentos ordenados
+            near = {
+                "near": {"type": "Point", "coordinates": [lng, lat]},
+                "key": "geo",
+                "distanceField": "distance_km",
+                "distanceMultiplier": 0.001,
+                "maxDistance": radius_km * 1000,
+                "spherical": True
+            }
+            if sector:
+                near["query"] = {"sector": sector}
+            pipeline = [{"$geoNear": near}]
+            if limit:
+                pipeline.append({"$limit": limit})
+            projection = mongo_projection(fields)
+            if projection:
+                pipeline.append({"$project": dict(projection, distance_km=1)})
+            return list(collection.aggregate(pipeline))
         else:
-            # Fallback para dados simulados
-            from mock_data import mock_industries
-            
-            # Filtragem manual para dados simulados
-            results = mock_industries
-            
-            if query:
-                query = query.lower()
-                results = [i for i in results if 
-                          query in i['name'].lower() or 
-                          query in i['description'].lower() or
-                          any(query in product.lower() for product in i['products'])]
-            
-            if sector and sector != "Todos os setores":
-                results = [i for i in results if i['sector'] == sector]
-            
-            if region and region != "Global":
-                if region == "América do Sul":
-                    countries = ["Brasil", "Argentina", "Chile", "Paraguai", "Uruguai", "Colômbia", "Peru"]
-                    results = [i for i in results if i['country'] in countries]
-                elif region == "Europa":
-                    countries = ["Alemanha", "Portugal", "França", "Espanha", "Itália"]
-                    results = [i for i in results if i['country'] in countries]
-                elif region == "América do Norte":
-                    countries = ["Estados Unidos", "Canadá", "México"]
-                    results = [i for i in results if i['country'] in countries]
-            
+            # Fallback para dados simulados: grade espacial em memória
+            metrics.mock_fallback("near")
+            dataset = get_mock_dataset()
+            records = dataset.records
+            predicate = (lambda position: records[position].get("sector") == sector) if sector else None
+            results = []
+            for distance, position in dataset.geo_index().near(lat, lng, radius_km, predicate, limit):
+                industry = dict(project(records[position], fields))
+                industry["distance_km"] = distance
+                results.append(industry)
             return results
     
     @staticmethod
@@ -150,11 +502,29 @@ class IndustryModel:
             "verified": False
         }
         
-        if collection:
+        # Região derivada do país, para o filtro por igualdade da busca
+        industry_data["region"] = region_of(industry_data)
+        
+        # Receita em dólares, para as faixas e a ordenação por receita
+        if "revenue" in industry_data:
+            industry_data["revenue_usd"] = parse_revenue(industry_data["revenue"])
+        
+        # Ponto GeoJSON para a busca por proximidade (índice 2dsphere)
+        point = geo.geo_point(industry_data)
+        if point:
+            industry_data["geo"] = point
+        
+        if collection is not None:
             result = collection.insert_one(industry_data)
             industry_data["_id"] = result.inserted_id
+            facets.apply_delta(new=industry_data)
+            clusters.apply_delta(new=industry_data)
+            matching.refresh(industry_data)
+            _suggestions.apply_delta(new=industry_data)
             return industry_data
         else:
+            # Sem banco não há escrita; a tentativa também é contada
+            metrics.mock_fallback("create")
             return None
     
     @staticmethod
@@ -174,16 +544,47 @@ class IndustryModel:
         # Atualiza timestamp
         industry_data["metadata.updated_at"] = datetime.utcnow()
         
-        if collection:
+        # Região acompanha qualquer alteração de país
+        industry_data.update(region_changes(industry_data))
+        
+        # Receita em dólares reconvertida junto com a receita em texto
+        if "revenue" in industry_data:
+            industry_data["revenue_usd"] = parse_revenue(industry_data["revenue"])
+        
+        # Com location completo, o ponto GeoJSON é recalculado na mesma escrita
+        if isinstance(industry_data.get("location"), dict):
+            industry_data["geo"] = geo.geo_point(industry_data)
+        
+        if collection is not None:
             try:
-                result = collection.update_one(
+                # O documento anterior é usado para ajustar as contagens de facetas
+                previous = collection.find_one_and_update(
                     {"_id": ObjectId(industry_id)},
-                    {"$set": industry_data}
+                    {"$set": industry_data},
+                    return_document=ReturnDocument.BEFORE
                 )
-                return result.modified_count > 0
+                if previous is None:
+                    return False
+                refreshed = (facets.affects_facets(industry_data) or matching.affects_matches(industry_data)
+                             or affects_suggestions(industry_data))
+                if refreshed:
+                    current = collection.find_one({"_id": previous["_id"]})
+                if facets.affects_facets(industry_data):
+                    facets.apply_delta(old=previous, new=current)
+                    clusters.apply_delta(old=previous, new=current)
+                    # Alterações parciais (location.lat/lng) só podem ser resolvidas após a escrita
+                    if geo.affects_geo(industry_data) and "geo" not in industry_data:
+                        collection.update_one({"_id": previous["_id"]}, {"$set": {"geo": geo.geo_point(current)}})
+                if matching.affects_matches(industry_data):
+                    matching.refresh(current)
+                if affects_suggestions(industry_data):
+                    _suggestions.apply_delta(old=previous, new=current)
+                return True
             except:
                 return False
         else:
+            # Sem banco não há escrita; a tentativa também é contada
+            metrics.mock_fallback("update")
             return False
     
     @staticmethod
@@ -199,16 +600,121 @@ class IndustryModel:
         """
         collection = db.get_collection(COLLECTIONS['industries'])
         
-        if collection:
+        if collection is not None:
             try:
-                result = collection.delete_one({"_id": ObjectId(industry_id)})
-                return result.deleted_count > 0
+                removed = collection.find_one_and_delete({"_id": ObjectId(industry_id)})
+                if removed is None:
+                    return False
+                facets.apply_delta(old=removed)
+                clusters.apply_delta(old=removed)
+                matching.remove(removed)
+                _suggestions.apply_delta(old=removed)
+                return True
             except:
                 return False
         else:
+            # Sem banco não há escrita; a tentativa também é contada
+            metrics.mock_fallback("delete")
             return False
 
 
+    @staticmethod
+    def get_matches(industry_id, limit=matching.TOP_K):
+        """
+        Recupera os parceiros sugeridos de uma indústria, com os dados de cada um
+        
+        Args:
+            industry_id (str): ID da indústria
+            limit (int): Número máximo de parceiros
+            
+        Returns:
+            list: Itens {"score", "components", "industry"}, ou None se a indústria não existir
+        """
+        matches = matching.get_matches(industry_id)
+        if matches is None:
+            # Indústria sem lista: existe, mas não participa das combinações (ou foi removida)
+            return [] if IndustryModel.get_by_id(industry_id) else None
+        
+        matches = matches[:limit]
+        industries = IndustryModel.get_by_ids([match["id"] for match in matches], FIELD_PRESETS["card"])
+        by_id = {str(industry.get("_id", industry.get("id"))): industry for industry in industries}
+        return [
+            {
+                "score": match["score"],
+                "components": {key: match[key] for key in ("sector", "markets", "products")},
+                "industry": by_id[match["id"]]
+            }
+            for match in matches
+            if match["id"] in by_id
+        ]
+
+    @staticmethod
+    def suggest(prefix, limit=10):
+        """
+        Sugestões do autocompletar para o texto digitado
+
+        Args:
+            prefix (str): Texto digitado
+            limit (int): Número máximo de sugestões
+
+        Returns:
+            list: Itens {"text", "type", "count"} (e "id" nas empresas), com
+            "corrected" nos que vieram de uma correção de digitação
+        """
+        if db.get_collection(COLLECTIONS['industries']) is None:
+            # Sem banco: índice dos dados simulados, que acompanha as recargas do snapshot
+            metrics.mock_fallback("suggest")
+            return get_mock_dataset().suggest_index().suggest(prefix, limit)
+        return _suggestions.get().suggest(prefix, limit)
+
+    @staticmethod
+    def written(version):
+        """
+        Registra a versão criada por create, update ou delete deste processo
+
+        Essas escritas já ajustaram o índice de sugestões; com a versão
+        registrada, só escritas de outros processos provocam a recarga.
+
+        Args:
+            version (str): Versão devolvida por versions.bump
+        """
+        _suggestions.advance(version)
+
+
+    @staticmethod
+    def stats(group_by, filters=None, ranges=None):
+        """
+        Número de indústrias, funcionários e receita por grupo
+        
+        Os resultados ficam em cache por combinação de filtros, até que uma
+        escrita incremente a versão da coleção de indústrias.
+        
+        Args:
+            group_by (str): sector, region, country ou status
+            filters (dict): Filtros de igualdade, com os nomes de campo do MongoDB
+            ranges (dict): Faixas de employees, founded e revenue (ver numeric.parse_ranges)
+            
+        Returns:
+            list: Linhas dos grupos (ver stats.make_row), do maior grupo para o menor
+        """
+        collection = db.get_collection(COLLECTIONS['industries'])
+        filters = filters if filters else {}
+        
+        if collection is not None:
+            def compute():
+                return stats.aggregate(collection, group_by, dict(filters, **mongo_query(ranges)))
+        else:
+            # Fallback para dados simulados: agregação vetorizada sobre o índice em memória
+            metrics.mock_fallback("stats")
+            mock_filters = {MOCK_FIELD_NAMES.get(field, field): value for field, value in filters.items()}
+            
+            def compute():
+                return get_mock_index().stats(group_by, filters=mock_filters, ranges=ranges)
+        
+        version = versions.get(COLLECTIONS['industries'])[0]
+        return _stats_cache.get(version, stats.cache_key(group_by, filters, ranges), compute)
+
+
 class SectorModel:
     """Modelo para operações com setores no banco de dados"""
     
@@ -222,13 +728,11 @@ class SectorModel:
         """
         collection = db.get_collection(COLLECTIONS['sectors'])
         
-        if collection:
+        if collection is not None:
             return list(collection.find())
         else:
-            # Fallback para dados simulados
-            from mock_data import mock_industries
-            sectors = sorted(list(set(i['sector'] for i in mock_industries)))
-            return [{"name": sector} for sector in sectors]
+            # Fallback para dados simulados (valores distintos do índice de setor)
+            return [{"name": sector} for sector in get_mock_index().values("sector")]
     
     @staticmethod
     def get_by_name(name):
@@ -243,7 +747,7 @@ class SectorModel:
         """
         collection = db.get_collection(COLLECTIONS['sectors'])
         
-        if collection:
+        if collection is not None:
             return collection.find_one({"name": name})
         else:
             # Fallback para dados simulados
@@ -266,13 +770,11 @@ class CountryModel:
         """
         collection = db.get_collection(COLLECTIONS['countries'])
         
-        if collection:
+        if collection is not None:
             return list(collection.find())
         else:
-            # Fallback para dados simulados
-            from mock_data import mock_industries
-            countries = sorted(list(set(i['country'] for i in mock_industries)))
-            return [{"name": country} for country in countries]
+            # Fallback para dados simulados (valores distintos do índice de país)
+            return [{"name": country} for country in get_mock_index().values("country")]
     
     @staticmethod
     def get_by_name(name):
@@ -287,7 +789,7 @@ class CountryModel:
         """
         collection = db.get_collection(COLLECTIONS['countries'])
         
-        if collection:
+        if collection is not None:
             return collection.find_one({"name": name})
         else:
             # Fallback para dados simulados
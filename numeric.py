@@ -0,0 +1,401 @@
+"""
+Filtros por faixa e ordenação pelos campos numéricos das indústrias
+
+Os campos employees e founded já são números; revenue é texto ("$250M") e
+é convertido uma única vez: na escrita, para o campo revenue_usd dos
+documentos do MongoDB (coberto por índice), e na carga dos dados em
+memória, para uma coluna do NumericColumns. Em memória, as faixas viram
+máscaras booleanas do NumPy sobre colunas float64 (NaN marca o campo
+ausente) e a ordenação é um argsort sobre as posições selecionadas.
+
+Uso:
+    python numeric.py backfill   # grava revenue_usd nos documentos existentes
+"""
+import argparse
+import logging
+import math
+import re
+import sys
+import numpy as np
+from stats import make_row
+
+# Configuração de logging
+logger = logging.getLogger(__name__)
+
+# Campos filtráveis e ordenáveis -> campo numérico gravado no MongoDB
+NUMERIC_FIELDS = {"employees": "employees", "founded": "founded", "revenue": "revenue_usd"}
+
+# Parâmetros de faixa aceitos pelas rotas: parâmetro -> (campo, limite)
+RANGE_PARAMS = {
+    "min_employees": ("employees", "min"),
+    "max_employees": ("employees", "max"),
+    "founded_from": ("founded", "min"),
+    "founded_to": ("founded", "max"),
+    "min_revenue": ("revenue", "min"),
+    "max_revenue": ("revenue", "max")
+}
+
+# Receita em texto: moeda opcional, número (vírgula ou ponto decimal) e escala
+REVENUE_PATTERN = re.compile(r"^\s*(?:[A-Za-z]{0,3}\$)?\s*(\d[\d.,]*)\s*([A-Za-z]*)\.?\s*$")
+REVENUE_SCALES = {
+    "": 1, "k": 1e3, "mil": 1e3, "m": 1e6, "mi": 1e6, "mm": 1e6,
+    "b": 1e9, "bi": 1e9, "bn": 1e9, "t": 1e12, "tri": 1e12
+}
+
+# Documentos atualizados por chamada de bulk_write no backfill
+BACKFILL_BATCH_SIZE = 1000
+
+
+def _number(value):
+    """Valor numérico de um campo (float) ou None se ausente ou inválido"""
+    if isinstance(value, bool) or value is None:
+        return None
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return None
+    return number if math.isfinite(number) else None
+
+
+def parse_revenue(value):
+    """
+    Converte uma receita em texto para dólares
+
+    Aceita números e textos como "$250M", "US$ 1.2B", "R$ 3,5 bi" ou "750000".
+
+    Args:
+        value: Receita (texto ou número)
+
+    Returns:
+        float: Valor em dólares ou None se não puder ser interpretado
+    """
+    if not isinstance(value, str):
+        return _number(value)
+    match = REVENUE_PATTERN.match(value)
+    if match is None:
+        return None
+    digits, scale = match.groups()
+    scale = REVENUE_SCALES.get(scale.lower())
+    if scale is None:
+        return None
+
+    # O último separador seguido de 1 ou 2 dígitos é o decimal; os demais são de milhar
+    separator = max(digits.rfind(","), digits.rfind("."))
+    if separator != -1 and 0 < len(digits) - separator - 1 <= 2:
+        digits = digits[:separator].replace(",", "").replace(".", "") + "." + digits[separator + 1:]
+    else:
+        digits = digits.replace(",", "").replace(".", "")
+    number = _number(digits)
+    return None if number is None else number * scale
+
+
+def revenue_usd(record):
+    """
+    Receita de uma indústria em dólares (revenue_usd gravado ou revenue interpretado)
+
+    Args:
+        record (dict): Indústria
+
+    Returns:
+        float: Receita em dólares ou None se ausente
+    """
+    value = _number(record.get("revenue_usd"))
+    return value if value is not None else parse_revenue(record.get("revenue"))
+
+
+def numeric_values(record):
+    """
+    Valores dos campos numéricos de uma indústria, na ordem de NUMERIC_FIELDS
+
+    Args:
+        record (dict): Indústria
+
+    Returns:
+        tuple: Um float por campo (NaN se ausente)
+    """
+    values = []
+    for field in NUMERIC_FIELDS:
+        value = revenue_usd(record) if field == "revenue" else _number(record.get(field))
+        values.append(math.nan if value is None else value)
+    return tuple(values)
+
+
+def parse_ranges(args):
+    """
+    Lê os parâmetros de faixa de uma requisição
+
+    Args:
+        args (dict): Parâmetros da requisição (request.args)
+
+    Returns:
+        dict: Campo -> (mínimo, máximo), com None no limite não informado
+
+    Raises:
+        ValueError: Se algum limite não for numérico
+    """
+    ranges = {}
+    for param, (field, bound) in RANGE_PARAMS.items():
+        raw = args.get(param)
+        if raw is None or raw == "":
+            continue
+        value = parse_revenue(raw) if field == "revenue" else _number(raw)
+        if value is None:
+            raise ValueError(f"Parâmetro {param} inválido")
+        low, high = ranges.get(field, (None, None))
+        ranges[field] = (value, high) if bound == "min" else (low, value)
+    return ranges
+
+
+def parse_sort(value):
+    """
+    Lê o parâmetro sort (campo numérico, com "-" para ordem decrescente)
+
+    Args:
+        value (str): Valor do parâmetro (employees, -revenue, ...)
+
+    Returns:
+        tuple: (campo, decrescente) ou None se não informado
+
+    Raises:
+        ValueError: Se o campo não for ordenável
+    """
+    if not value:
+        return None
+    field = value[1:] if value.startswith("-") else value
+    if field not in NUMERIC_FIELDS:
+        raise ValueError(f"Ordenação inválida. Use {', '.join(NUMERIC_FIELDS)} (com - para ordem decrescente)")
+    return field, value.startswith("-")
+
+
+def mongo_query(ranges, sort=None):
+    """
+    Condições do MongoDB para as faixas e para a ordenação
+
+    Assim como em memória, a ordenação por um campo só inclui os documentos
+    em que ele é numérico.
+
+    Args:
+        ranges (dict): Faixas (ver parse_ranges)
+        sort (tuple): Ordenação (ver parse_sort)
+
+    Returns:
+        dict: Condições sobre os campos numéricos gravados
+    """
+    query = {}
+    for field, (low, high) in (ranges or {}).items():
+        condition = {}
+        if low is not None:
+            condition["$gte"] = low
+        if high is not None:
+            condition["$lte"] = high
+        query[NUMERIC_FIELDS[field]] = condition
+    if sort and NUMERIC_FIELDS[sort[0]] not in query:
+        query[NUMERIC_FIELDS[sort[0]]] = {"$type": "number"}
+    return query
+
+
+def group_codes(groups, size):
+    """
+    Código do grupo de cada posição, para agregações vetorizadas
+
+    Args:
+        groups (dict): Valor -> posições dos registros com esse valor
+        size (int): Número de registros
+
+    Returns:
+        tuple: (valores, numpy.ndarray com o índice do valor por posição, -1 se ausente)
+    """
+    labels = list(groups)
+    codes = np.full(size, -1, dtype=np.int32)
+    for code, positions in enumerate(groups.values()):
+        codes[positions] = code
+    return labels, codes
+
+
+class NumericColumns:
+    """Colunas float64 dos campos numéricos, uma posição por registro"""
+
+    def __init__(self, rows=None, columns=None):
+        """
+        Args:
+            rows (list): Resultado de numeric_values para cada registro, na ordem do conjunto de dados
+            columns (dict): Colunas já montadas (ver state), no lugar de rows
+        """
+        if columns is None:
+            table = np.array(rows, dtype=np.float64).reshape(len(rows), len(NUMERIC_FIELDS))
+            columns = {field: np.ascontiguousarray(table[:, i]) for i, field in enumerate(NUMERIC_FIELDS)}
+        self._columns = {field: columns[field] for field in NUMERIC_FIELDS}
+        self._size = len(next(iter(self._columns.values())))
+
+    def state(self):
+        """Colunas (campo -> numpy.ndarray), para gravação em um snapshot"""
+        return dict(self._columns)
+
+    def mask(self, ranges):
+        """
+        Máscara dos registros dentro de todas as faixas
+
+        Args:
+            ranges (dict): Campo -> (mínimo, máximo)
+
+        Returns:
+            numpy.ndarray: Máscara booleana por posição
+        """
+        mask = np.ones(self._size, dtype=bool)
+        for field, (low, high) in ranges.items():
+            column = self._columns[field]
+            # NaN (campo ausente) é falso em qualquer comparação
+            mask &= column >= low if low is not None else ~np.isnan(column)
+            if high is not None:
+                mask &= column <= high
+        return mask
+
+    def select(self, positions, ranges=None, sort=None):
+        """
+        Aplica as faixas e a ordenação a posições já selecionadas
+
+        Args:
+            positions: Posições crescentes (lista, array ou range)
+            ranges (dict): Faixas (ver parse_ranges)
+            sort (tuple): (campo, decrescente); registros sem o campo são excluídos
+
+        Returns:
+            numpy.ndarray: Posições selecionadas, na ordem pedida (empates pela posição)
+        """
+        full = isinstance(positions, range) and len(positions) == self._size
+        if isinstance(positions, range):
+            positions = np.arange(positions.start, positions.stop, positions.step, dtype=np.intp)
+        else:
+            positions = np.asarray(positions, dtype=np.intp)
+
+        if ranges:
+            mask = self.mask(ranges)
+            positions = np.flatnonzero(mask) if full else positions[mask[positions]]
+
+        if sort:
+            field, descending = sort
+            values = self._columns[field][positions]
+            present = ~np.isnan(values)
+            positions, values = positions[present], values[present]
+            order = np.argsort(values, kind="stable")
+            # Invertida, a ordem estável também desempata pela posição decrescente, como o _id no MongoDB
+            positions = positions[order[::-1] if descending else order]
+        return positions
+
+    def group_totals(self, labels, codes, positions):
+        """
+        Número de registros e totais de funcionários e receita por grupo
+
+        Args:
+            labels (list): Valores dos grupos (ver group_codes)
+            codes (numpy.ndarray): Código do grupo de cada posição
+            positions (numpy.ndarray): Posições selecionadas
+
+        Returns:
+            list: Linhas dos grupos (ver stats.make_row), do maior grupo para o menor
+        """
+        groups = codes[positions]
+        known = groups >= 0
+        groups, positions = groups[known], positions[known]
+        size = len(labels)
+        counts = np.bincount(groups, minlength=size)
+
+        # Somas ponderadas e número de valores informados, ignorando os NaN
+        totals = {}
+        for field in ("employees", "revenue"):
+            values = self._columns[field][positions]
+            present = ~np.isnan(values)
+            totals[field] = (
+                np.bincount(groups[present], weights=values[present], minlength=size),
+                np.bincount(groups[present], minlength=size)
+            )
+
+        rows = []
+        for code in np.flatnonzero(counts):
+            averages = {
+                field: total[code] / informed[code] if informed[code] else None
+                for field, (total, informed) in totals.items()
+            }
+            rows.append(make_row(labels[code], counts[code], totals["employees"][0][code], averages["employees"],
+                                 totals["revenue"][0][code], averages["revenue"]))
+        rows.sort(key=lambda row: (-row["count"], row["name"]))
+        return rows
+
+    def start_after(self, positions, position, sort):
+        """
+        Início da próxima página de posições ordenadas (paginação por chave)
+
+        Args:
+            positions (numpy.ndarray): Resultado de select com a mesma ordenação
+            position (int): Posição do último registro da página anterior
+            sort (tuple): (campo, decrescente)
+
+        Returns:
+            int: Índice em positions do primeiro registro após o cursor
+
+        Raises:
+            ValueError: Se o registro do cursor não tiver o campo ordenado
+        """
+        field, descending = sort
+        column = self._columns[field]
+        value = column[position]
+        if np.isnan(value):
+            raise ValueError("Cursor inválido")
+        values = column[positions]
+        if descending:
+            after = (values < value) | ((values == value) & (positions < position))
+        else:
+            after = (values > value) | ((values == value) & (positions > position))
+        # As posições seguintes ao cursor formam um sufixo da ordenação
+        return len(positions) - int(np.count_nonzero(after))
+
+
+def backfill(database, batch_size=BACKFILL_BATCH_SIZE):
+    """
+    Grava revenue_usd nos documentos que têm revenue
+
+    Args:
+        database: Banco de dados do MongoDB
+        batch_size (int): Documentos atualizados por chamada de bulk_write
+
+    Returns:
+        int: Número de documentos atualizados
+    """
+    from pymongo import UpdateOne
+    from database import COLLECTIONS
+
+    collection = database[COLLECTIONS['industries']]
+    updated = 0
+    operations = []
+    cursor = collection.find({"revenue": {"$exists": True}}, {"revenue": 1, "revenue_usd": 1})
+    for document in cursor.batch_size(batch_size):
+        value = parse_revenue(document.get("revenue"))
+        if document.get("revenue_usd") != value:
+            operations.append(UpdateOne({"_id": document["_id"]}, {"$set": {"revenue_usd": value}}))
+        if len(operations) == batch_size:
+            updated += collection.bulk_write(operations, ordered=False).modified_count
+            operations = []
+    if operations:
+        updated += collection.bulk_write(operations, ordered=False).modified_count
+    return updated
+
+
+def main(argv=None):
+    """Linha de comando: python numeric.py backfill"""
+    parser = argparse.ArgumentParser(description="Gerencia os campos numéricos derivados das indústrias")
+    parser.add_argument("command", choices=["backfill"], help="backfill grava revenue_usd a partir de revenue")
+    parser.parse_args(argv)
+
+    from database import db
+    if not db.is_connected():
+        logger.error("Banco de dados não disponível")
+        return 2
+
+    total = backfill(db.db)
+    logger.info(f"revenue_usd atualizado em {total} documentos")
+    return 0
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO)
+    sys.exit(main())
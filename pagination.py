@@ -0,0 +1,68 @@
+import base64
+import json
+
+# Paginação por chave (keyset): o cursor guarda o ID do último item entregue
+# (e a relevância, em buscas ordenadas por score, ou o valor do campo numérico
+# ordenado), e a próxima página começa imediatamente depois dele na ordenação
+# estável.
+
+
+def encode_cursor(last_id, score=None):
+    """
+    Gera um cursor opaco a partir do último item de uma página
+
+    Args:
+        last_id: ID do último item (ObjectId ou str)
+        score (float): Relevância do último item, em buscas ordenadas por score
+
+    Returns:
+        str: Cursor codificado em base64 seguro para URLs
+    """
+    data = {"after": str(last_id)}
+    if score is not None:
+        data["score"] = score
+    payload = json.dumps(data, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(payload).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor):
+    """
+    Recupera o último item da página anterior a partir de um cursor
+
+    Args:
+        cursor (str): Cursor recebido do cliente
+
+    Returns:
+        tuple: (ID do último item, relevância ou None)
+
+    Raises:
+        ValueError: Se o cursor estiver malformado
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        after = data["after"]
+        score = data.get("score")
+    except (ValueError, KeyError, TypeError, AttributeError):
+        raise ValueError("Cursor inválido")
+    if not isinstance(after, str) or not (score is None or isinstance(score, (int, float))):
+        raise ValueError("Cursor inválido")
+    return after, score
+
+
+def next_cursor(results, limit, key="score"):
+    """
+    Cursor da próxima página, ou None quando a página atual não veio completa
+
+    Args:
+        results (list): Itens da página atual
+        limit (int): Tamanho da página solicitado
+        key (str): Campo do valor guardado junto com o ID (relevância ou campo ordenado)
+
+    Returns:
+        str: Cursor para a próxima página ou None
+    """
+    if not limit or len(results) < limit:
+        return None
+    last = results[-1]
+    return encode_cursor(last["_id"] if "_id" in last else last["id"], last.get(key))
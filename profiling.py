@@ -0,0 +1,357 @@
+import hmac
+import itertools
+import json
+import os
+import random
+import sys
+import threading
+import time
+from collections import Counter, deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from bson import json_util
+from flask import g, request
+from pymongo import monitoring
+from pymongo.errors import PyMongoError
+from indexes import plan_stages
+
+# Segredo que autoriza o cabeçalho X-Profile-Token e o endpoint de leitura
+# (sem ele, só a amostragem funciona e os perfis não podem ser lidos)
+PROFILING_TOKEN = os.getenv('PROFILING_TOKEN', '')
+
+# Perfila 1 a cada N requisições (0 desativa a amostragem)
+PROFILING_SAMPLE_RATE = int(os.getenv('PROFILING_SAMPLE_RATE', 0))
+
+# Perfis guardados por processo (os mais antigos são descartados)
+PROFILING_BUFFER_SIZE = int(os.getenv('PROFILING_BUFFER_SIZE', 50))
+
+# Intervalo entre as amostras da pilha da requisição
+PROFILING_INTERVAL_MS = float(os.getenv('PROFILING_INTERVAL_MS', 2))
+
+# Consultas de uma requisição que recebem explain (cada explain executa a consulta de novo)
+MAX_EXPLAINS = 20
+
+# Pilhas e funções mantidas em cada perfil
+TOP_STACKS = 50
+TOP_FUNCTIONS = 30
+
+# Comandos de leitura que aceitam explain("executionStats")
+EXPLAINABLE_COMMANDS = ("find", "aggregate", "count", "distinct")
+
+# Campos de sessão e de transporte que não fazem parte da consulta
+SESSION_FIELDS = ("lsid", "txnNumber", "autocommit", "startTransaction")
+
+TOKEN_HEADER = "X-Profile-Token"
+ID_HEADER = "X-Profile-Id"
+
+# Rotas que nunca são perfiladas (a leitura dos próprios perfis)
+EXCLUDED_PREFIX = "/api/admin/profiles"
+
+_local = threading.local()
+_buffer = deque(maxlen=PROFILING_BUFFER_SIZE)
+_buffer_lock = threading.Lock()
+_sequence = itertools.count(1)
+
+# Explains e gravação dos perfis, fora da thread da requisição (uma thread
+# basta: só as requisições perfiladas enviam trabalho)
+_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="profiling-explain")
+
+
+def authorized(token):
+    """
+    Verifica o token de profiling enviado pelo cliente
+
+    Args:
+        token (str): Valor do cabeçalho X-Profile-Token
+
+    Returns:
+        bool: True se o token confere com PROFILING_TOKEN
+    """
+    return bool(PROFILING_TOKEN and token) and hmac.compare_digest(token, PROFILING_TOKEN)
+
+
+class StackSampler:
+    """
+    Amostragem da pilha de uma única thread
+
+    Uma thread auxiliar lê, a cada intervalo, o frame atual da thread da
+    requisição (sys._current_frames) e conta cada pilha. Ao contrário do
+    cProfile, não instrumenta as chamadas nem enxerga as outras requisições
+    atendidas em paralelo pelo mesmo processo.
+    """
+
+    def __init__(self, thread_id, interval):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="profiling-sampler", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            self.stacks[self._stack(frame)] += 1
+            self.samples += 1
+
+    @staticmethod
+    def _stack(frame):
+        """Pilha da raiz até a folha, a partir da entrada do Flask (wsgi_app)"""
+        frames = []
+        while frame is not None:
+            code = frame.f_code
+            frames.append(f"{os.path.basename(code.co_filename)}:{code.co_name}:{code.co_firstlineno}")
+            if code.co_name == "wsgi_app":
+                break
+            frame = frame.f_back
+        return tuple(reversed(frames))
+
+    def summary(self):
+        """
+        Resumo das amostras
+
+        Returns:
+            dict: samples, interval_ms, stacks (pilhas mais frequentes, no formato
+            "raiz;...;folha" dos flame graphs) e functions (amostras em que cada
+            função estava na pilha, total, ou no topo, self)
+        """
+        total, own = Counter(), Counter()
+        for stack, count in self.stacks.items():
+            own[stack[-1]] += count
+            for function in set(stack):
+                total[function] += count
+        return {
+            "samples": self.samples,
+            "interval_ms": self.interval * 1000,
+            "stacks": [{"stack": ";".join(stack), "samples": count} for stack, count in self.stacks.most_common(TOP_STACKS)],
+            "functions": [
+                {"function": function, "total": count, "self": own[function]}
+                for function, count in total.most_common(TOP_FUNCTIONS)
+            ]
+        }
+
+
+class QueryCapture(monitoring.CommandListener):
+    """
+    Guarda os comandos de leitura enviados ao MongoDB durante uma requisição perfilada
+
+    O pymongo publica os eventos na própria thread que executa o comando, então
+    a requisição é identificada pelo perfil ativo na thread (threading.local).
+    """
+
+    def started(self, event):
+        profile = getattr(_local, "profile", None)
+        if profile is None or event.command_name not in EXPLAINABLE_COMMANDS:
+            return
+        command = {
+            key: value for key, value in event.command.items()
+            if not key.startswith("$") and key not in SESSION_FIELDS
+        }
+        entry = {"collection": event.command.get(event.command_name), "command_name": event.command_name,
+                 "database": event.database_name, "command": command, "duration_ms": None}
+        profile["queries"].append(entry)
+        profile["pending"][event.request_id] = entry
+
+    def _finish(self, event, error=None):
+        profile = getattr(_local, "profile", None)
+        if profile is None:
+            return
+        entry = profile["pending"].pop(event.request_id, None)
+        if entry is not None:
+            entry["duration_ms"] = round(event.duration_micros / 1000, 3)
+            if error:
+                entry["error"] = error
+
+    def succeeded(self, event):
+        self._finish(event)
+
+    def failed(self, event):
+        self._finish(event, str(event.failure.get("errmsg", "")))
+
+
+def _find(document, key):
+    """Primeira ocorrência de uma chave em um documento aninhado (saída do explain)"""
+    if isinstance(document, dict):
+        if key in document:
+            return document[key]
+        children = document.values()
+    elif isinstance(document, list):
+        children = document
+    else:
+        return None
+    for child in children:
+        found = _find(child, key)
+        if found is not None:
+            return found
+    return None
+
+
+def summarize_explain(explain):
+    """
+    Resume a saída de explain("executionStats")
+
+    Args:
+        explain (dict): Resposta do comando explain (find, aggregate, ...)
+
+    Returns:
+        dict: Estágios do plano vencedor e contadores da execução
+    """
+    planner = _find(explain, "queryPlanner") or {}
+    stats = _find(explain, "executionStats") or {}
+    winning = planner.get("winningPlan")
+    return {
+        "stages": [stage for stage in plan_stages(winning) if stage] if winning else [],
+        "n_returned": stats.get("nReturned"),
+        "keys_examined": stats.get("totalKeysExamined"),
+        "docs_examined": stats.get("totalDocsExamined"),
+        "execution_ms": stats.get("executionTimeMillis")
+    }
+
+
+def _explain(database, queries):
+    """Executa explain("executionStats") nas consultas capturadas"""
+    for entry in queries[:MAX_EXPLAINS]:
+        try:
+            explain = database.client[entry["database"]].command(
+                {"explain": entry["command"], "verbosity": "executionStats"}
+            )
+            entry["explain"] = summarize_explain(explain)
+        except PyMongoError as e:
+            entry["explain"] = {"error": str(e)}
+
+
+def _trigger():
+    """Motivo para perfilar a requisição atual (None se não deve ser perfilada)"""
+    if request.path.startswith(EXCLUDED_PREFIX):
+        return None
+    if authorized(request.headers.get(TOKEN_HEADER)):
+        return "header"
+    if PROFILING_SAMPLE_RATE > 0 and random.randrange(PROFILING_SAMPLE_RATE) == 0:
+        return "sample"
+    return None
+
+
+def _before_request():
+    trigger = _trigger()
+    if trigger is None:
+        return
+    sampler = StackSampler(threading.get_ident(), PROFILING_INTERVAL_MS / 1000)
+    g.profile = {
+        "id": f"{os.getpid()}-{next(_sequence)}",
+        "trigger": trigger,
+        "started_at": datetime.utcnow(),
+        "started": time.perf_counter(),
+        "sampler": sampler,
+        "queries": [],
+        "pending": {}
+    }
+    _local.profile = g.profile
+    sampler.start()
+
+
+def _after_request(response):
+    profile = g.get("profile")
+    if profile is not None:
+        profile["status"] = response.status_code
+        response.headers[ID_HEADER] = profile["id"]
+    return response
+
+
+def _store(database, record):
+    """Completa o perfil com os explains e o guarda no buffer (thread _executor)"""
+    queries = record["queries"]
+    try:
+        if queries and database is not None and database.client is not None:
+            _explain(database, queries)
+        for entry in queries:
+            # Filtros com ObjectId, datas e expressões regulares viram JSON estendido
+            entry["command"] = json.loads(json_util.dumps(entry["command"]))
+    finally:
+        with _buffer_lock:
+            _buffer.append(record)
+
+
+def _make_teardown(database):
+    def _teardown_request(error=None):
+        profile = g.pop("profile", None)
+        if profile is None:
+            return
+        duration = time.perf_counter() - profile["started"]
+        profile["sampler"].stop()
+        _local.profile = None
+
+        record = {
+            "id": profile["id"],
+            "trigger": profile["trigger"],
+            "method": request.method,
+            "path": request.path,
+            "query_string": request.query_string.decode("utf-8", "replace"),
+            "route": request.url_rule.rule if request.url_rule is not None else None,
+            "status": profile.get("status", 500),
+            "started_at": profile["started_at"],
+            "duration_ms": round(duration * 1000, 3),
+            "profile": profile["sampler"].summary(),
+            "queries": profile["queries"]
+        }
+        # O teardown roda antes de o servidor enviar o corpo; os explains
+        # reexecutam as consultas e não podem atrasar a resposta
+        _executor.submit(_store, database, record)
+    return _teardown_request
+
+
+def init_app(app, database=None):
+    """
+    Habilita o profiling por requisição (cabeçalho autorizado ou amostragem)
+
+    Args:
+        app (Flask): Aplicação
+        database (Database): Conexão cujas consultas recebem explain (None para não capturar)
+    """
+    app.before_request(_before_request)
+    app.after_request(_after_request)
+    app.teardown_request(_make_teardown(database))
+    if database is not None:
+        database.add_event_listener(QueryCapture())
+
+
+def list_profiles():
+    """
+    Resumo dos perfis guardados neste processo, do mais recente para o mais antigo
+
+    Returns:
+        list: id, trigger, method, path, route, status, started_at, duration_ms e número de consultas
+    """
+    with _buffer_lock:
+        records = list(_buffer)
+    summaries = []
+    for record in reversed(records):
+        summary = {key: value for key, value in record.items() if key not in ("profile", "queries")}
+        summary["queries"] = len(record["queries"])
+        summaries.append(summary)
+    return summaries
+
+
+def get_profile(profile_id):
+    """
+    Perfil completo de uma requisição
+
+    Args:
+        profile_id (str): ID devolvido no cabeçalho X-Profile-Id
+
+    Returns:
+        dict: Perfil, ou None se não estiver no buffer deste processo
+    """
+    with _buffer_lock:
+        for record in _buffer:
+            if record["id"] == profile_id:
+                return record
+    return None
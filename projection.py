@@ -0,0 +1,107 @@
+import re
+
+# Conjuntos de campos pré-definidos para as telas mais acessadas
+FIELD_PRESETS = {
+    # Cartões da página de resultados (ResultsPage.jsx)
+    "card": ["name", "sector", "country", "location.country", "description", "status"],
+    # Marcadores dos mapas (WorldMap.jsx e MapLocation.jsx)
+    "map": ["name", "sector", "status", "location"]
+}
+
+# Campos sempre devolvidos: identificação do registro e chaves de paginação
+ALWAYS_INCLUDED = ("_id", "id", "score")
+
+# Limite de campos aceitos em uma única projeção
+MAX_FIELDS = 30
+
+FIELD_PATTERN = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*(\.[A-Za-z_][A-Za-z0-9_]*)*$")
+
+
+def parse_fields(value):
+    """
+    Interpreta o parâmetro fields= (nome de um preset ou lista separada por vírgulas)
+
+    Args:
+        value (str): Valor recebido na query string
+
+    Returns:
+        list: Campos solicitados, ou None para devolver o documento completo
+
+    Raises:
+        ValueError: Se algum nome de campo for inválido
+    """
+    if not value:
+        return None
+
+    fields = []
+    for name in value.split(","):
+        name = name.strip()
+        if not name:
+            continue
+        if name in FIELD_PRESETS:
+            fields.extend(FIELD_PRESETS[name])
+        elif FIELD_PATTERN.match(name):
+            fields.append(name)
+        else:
+            raise ValueError(f"Campo inválido: {name}")
+
+    fields = list(dict.fromkeys(fields))
+    if len(fields) > MAX_FIELDS:
+        raise ValueError(f"Máximo de {MAX_FIELDS} campos por requisição")
+    return fields or None
+
+
+def mongo_projection(fields):
+    """
+    Projeção de inclusão para collection.find(..., projection)
+
+    Args:
+        fields (list): Campos solicitados (None para o documento completo)
+
+    Returns:
+        dict: Projeção do MongoDB ou None
+    """
+    if not fields:
+        return None
+    projection = {field: 1 for field in fields}
+    for field in ALWAYS_INCLUDED:
+        projection[field] = 1
+    return _drop_path_collisions(projection)
+
+
+def _drop_path_collisions(projection):
+    """Remove subcampos cujo campo pai já foi incluído (o MongoDB rejeita a colisão)"""
+    return {
+        field: value for field, value in projection.items()
+        if not any(field.startswith(parent + ".") for parent in projection if parent != field)
+    }
+
+
+def project(record, fields):
+    """
+    Aplica a mesma projeção a um registro em memória
+
+    Args:
+        record (dict): Registro completo
+        fields (list): Campos solicitados (None para o registro completo)
+
+    Returns:
+        dict: Novo dicionário apenas com os campos solicitados
+    """
+    if not fields:
+        return record
+
+    result = {}
+    for field in _drop_path_collisions(dict.fromkeys(ALWAYS_INCLUDED + tuple(fields))):
+        value = record
+        path = field.split(".")
+        for key in path:
+            if not isinstance(value, dict) or key not in value:
+                break
+            value = value[key]
+        else:
+            target = result
+            for key in path[:-1]:
+                target = target.setdefault(key, {})
+            target[path[-1]] = value
+    return result
@@ -0,0 +1,116 @@
+import argparse
+import logging
+import sys
+
+# Configuração de logging
+logger = logging.getLogger(__name__)
+
+# Mapeamento simplificado de regiões para países (única fonte desta relação;
+# o campo region de cada indústria é derivado daqui no momento da escrita)
+REGION_COUNTRIES = {
+    "América do Sul": ["Brasil", "Argentina", "Chile", "Paraguai", "Uruguai", "Colômbia", "Peru"],
+    "Europa": ["Alemanha", "Portugal", "França", "Espanha", "Itália", "Suécia"],
+    "América do Norte": ["Estados Unidos", "Canadá", "México"],
+    "Ásia": ["Japão", "China", "Índia", "Coreia do Sul", "Singapura"],
+    "África": ["África do Sul", "Egito", "Nigéria", "Gana"],
+    "Oceania": ["Austrália", "Nova Zelândia"]
+}
+
+# Tabela inversa país -> região
+COUNTRY_REGIONS = {
+    country: region
+    for region, countries in REGION_COUNTRIES.items()
+    for country in countries
+}
+
+
+def country_of(industry):
+    """
+    País de uma indústria (location.country no MongoDB, country nos dados simulados)
+
+    Args:
+        industry (dict): Documento da indústria
+
+    Returns:
+        str: Nome do país, ou None
+    """
+    return (industry.get("location") or {}).get("country") or industry.get("country")
+
+
+def region_of(industry):
+    """
+    Região de uma indústria, derivada do país
+
+    Args:
+        industry (dict): Documento da indústria
+
+    Returns:
+        str: Nome da região, ou None se o país não estiver na tabela
+    """
+    return COUNTRY_REGIONS.get(country_of(industry))
+
+
+def region_changes(changes):
+    """
+    Campo region a gravar junto com uma atualização ($set) que altera o país
+
+    Args:
+        changes (dict): Campos atualizados (aceita notação com ponto)
+
+    Returns:
+        dict: {"region": ...} se o país foi alterado, ou {} caso contrário
+    """
+    location = changes.get("location") if isinstance(changes.get("location"), dict) else {}
+    country = changes.get("location.country") or location.get("country") or changes.get("country")
+    if not country:
+        return {}
+    return {"region": COUNTRY_REGIONS.get(country)}
+
+
+def backfill(database):
+    """
+    Grava o campo region nas indústrias que ainda não o têm
+
+    Args:
+        database: Banco de dados do MongoDB
+
+    Returns:
+        int: Número de documentos atualizados
+    """
+    from database import COLLECTIONS
+    collection = database[COLLECTIONS['industries']]
+    total = 0
+    for region, countries in REGION_COUNTRIES.items():
+        result = collection.update_many(
+            {
+                "region": None,
+                "$or": [
+                    {"location.country": {"$in": countries}},
+                    {"location.country": None, "country": {"$in": countries}}
+                ]
+            },
+            {"$set": {"region": region}}
+        )
+        total += result.modified_count
+    return total
+
+
+def main(argv=None):
+    """Linha de comando: python regions.py backfill"""
+    parser = argparse.ArgumentParser(description="Gerencia o campo region das indústrias")
+    parser.add_argument("command", choices=["backfill"], help="backfill grava region a partir do país")
+    parser.parse_args(argv)
+
+    from database import db
+    if not db.is_connected():
+        logger.error("Banco de dados não disponível")
+        return 2
+
+    total = backfill(db.db)
+    logger.info(f"Campo region preenchido em {total} documentos")
+    return 0
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO)
+    sys.exit(main())
@@ -0,0 +1,492 @@
+import re
+import unicodedata
+from array import array
+from bisect import bisect_left, bisect_right
+from numeric import NumericColumns, group_codes, numeric_values
+
+# Expressão usada para quebrar textos em tokens
+TOKEN_PATTERN = re.compile(r"\w+")
+
+# Prefixos até este tamanho têm listas de postings materializadas;
+# prefixos maiores são resolvidos pelo vocabulário ordenado
+PREFIX_LENGTH = 4
+
+# Termos a partir deste tamanho também casam no meio dos tokens ("global" em
+# "techglobal"); é também o tamanho dos n-gramas do índice que resolve esses termos
+INFIX_MIN_LENGTH = 3
+
+# Campos indexados para a busca textual
+TEXT_FIELDS = ("name", "description", "products")
+
+# Campos com índice de igualdade (valor -> bitset de posições)
+ATTRIBUTE_FIELDS = ("sector", "country", "status", "region")
+
+
+def fold(text):
+    """
+    Normaliza um texto removendo acentos e diferenças de caixa
+
+    Args:
+        text (str): Texto original
+
+    Returns:
+        str: Texto sem acentos e em caixa baixa
+    """
+    if text.isascii():
+        return text.casefold()
+    decomposed = unicodedata.normalize("NFKD", text)
+    return "".join(c for c in decomposed if not unicodedata.combining(c)).casefold()
+
+
+def tokenize(text):
+    """
+    Quebra um texto em tokens normalizados
+
+    Args:
+        text (str): Texto original
+
+    Returns:
+        list: Lista de tokens sem acentos e em caixa baixa
+    """
+    return TOKEN_PATTERN.findall(fold(text))
+
+
+def _bit_positions(mask):
+    """Posições (crescentes) dos bits ligados de um bitset"""
+    bits = bin(mask)[:1:-1]
+    positions = []
+    position = bits.find("1")
+    while position != -1:
+        positions.append(position)
+        position = bits.find("1", position + 1)
+    return positions
+
+
+def _to_bitset(positions, size):
+    """Constrói um bitset (int) a partir de uma lista de posições"""
+    buffer = bytearray((size + 7) // 8)
+    for position in positions:
+        buffer[position >> 3] |= 1 << (position & 7)
+    return int.from_bytes(buffer, "little")
+
+
+def _grams(text):
+    """N-gramas distintos (de INFIX_MIN_LENGTH caracteres) de um texto"""
+    return {text[i:i + INFIX_MIN_LENGTH] for i in range(len(text) - INFIX_MIN_LENGTH + 1)}
+
+
+def _intersect(postings):
+    """Interseção de listas ordenadas de posições, começando pela menor"""
+    postings = sorted(postings, key=len)
+    result = postings[0]
+    for other in postings[1:]:
+        if not result:
+            break
+        size = len(other)
+        matched = []
+        for position in result:
+            i = bisect_left(other, position)
+            if i < size and other[i] == position:
+                matched.append(position)
+        result = matched
+    return list(result)
+
+
+def _pack(lists):
+    """Concatena listas de posições em um único array, com os limites de cada uma"""
+    offsets = array("Q", [0])
+    values = array("I")
+    for positions in lists:
+        values.extend(positions)
+        offsets.append(len(values))
+    return {"offsets": offsets, "values": values}
+
+
+class _PackedLists:
+    """Listas de posições concatenadas (ver _pack), acessadas pelo número da lista sem cópia"""
+
+    def __init__(self, offsets, values):
+        self._offsets = offsets
+        self._values = values
+
+    def __len__(self):
+        return len(self._offsets) - 1
+
+    def __getitem__(self, number):
+        return self._values[self._offsets[number]:self._offsets[number + 1]]
+
+    def __iter__(self):
+        for number in range(len(self)):
+            yield self[number]
+
+
+class IndustryIndex:
+    """Índice em memória sobre uma lista de indústrias"""
+
+    def __init__(self, records, text_fields=TEXT_FIELDS, attribute_fields=ATTRIBUTE_FIELDS, state=None):
+        """
+        Constrói o índice invertido e os índices de atributos a partir de um conjunto de dados
+
+        Args:
+            records (list): Lista de indústrias (dicts)
+            text_fields (tuple): Campos usados na busca textual
+            attribute_fields (tuple): Campos filtráveis por igualdade
+            state (dict): Estruturas já construídas (ver state), lidas de um
+                snapshot; dispensa a construção
+
+        Raises:
+            ValueError: Se state foi gravado com outros campos, parâmetros ou registros
+        """
+        self.records = records
+        self.text_fields = text_fields
+        if state is not None:
+            self._restore(state, attribute_fields)
+            return
+
+        # Mapa id -> posição, construído junto com os demais índices
+        self._positions = {record["id"]: position for position, record in enumerate(records) if "id" in record}
+
+        postings = {}
+        prefixes = {}
+        attributes = {field: {} for field in attribute_fields}
+        numbers = []
+        for position, record in enumerate(records):
+            numbers.append(numeric_values(record))
+            for field, values in attributes.items():
+                value = record.get(field)
+                if value is not None:
+                    values.setdefault(value, []).append(position)
+
+            for token in self._record_tokens(record):
+                postings.setdefault(token, []).append(position)
+                for size in range(1, min(len(token), PREFIX_LENGTH) + 1):
+                    ids = prefixes.setdefault(token[:size], [])
+                    if not ids or ids[-1] != position:
+                        ids.append(position)
+
+        # As posições são visitadas em ordem crescente, então as listas já saem ordenadas
+        self._vocabulary = sorted(postings)
+        # Postings de cada token, na ordem do vocabulário
+        self._postings = [array("I", postings[token]) for token in self._vocabulary]
+        self._prefix_postings = {prefix: array("I", ids) for prefix, ids in prefixes.items()}
+        # N-grama -> posições, no vocabulário, dos tokens que o contêm (busca no meio dos tokens)
+        grams = {}
+        for token_position, token in enumerate(self._vocabulary):
+            for gram in _grams(token):
+                grams.setdefault(gram, []).append(token_position)
+        self._grams = {gram: array("I", ids) for gram, ids in grams.items()}
+        self._attributes = {
+            field: {value: _to_bitset(ids, len(records)) for value, ids in values.items()}
+            for field, values in attributes.items()
+        }
+        # Colunas de employees, founded e receita (já convertida) para as faixas e ordenações
+        self._numeric = NumericColumns(numbers)
+        # Código do valor de cada atributo por posição, para os totais por grupo
+        self._groups = {field: group_codes(values, len(records)) for field, values in attributes.items()}
+
+    def _layout(self, attribute_fields):
+        """Parâmetros que um estado gravado precisa ter em comum com este índice"""
+        return {
+            "records": len(self.records),
+            "text_fields": list(self.text_fields),
+            "attribute_fields": list(attribute_fields),
+            "prefix_length": PREFIX_LENGTH,
+            "infix_min_length": INFIX_MIN_LENGTH
+        }
+
+    def state(self):
+        """
+        Estruturas do índice, para gravação em um snapshot
+
+        As listas de posições são concatenadas em arrays e os bitsets viram
+        bytes de tamanho fixo: lidas de um snapshot mapeado em memória, elas
+        são usadas sem cópia e compartilhadas pelos workers.
+
+        Returns:
+            dict: Listas de strings, arrays, bytes e colunas numpy (ver snapshot.write)
+        """
+        width = (len(self.records) + 7) // 8
+        prefixes = list(self._prefix_postings)
+        grams = list(self._grams)
+        return {
+            "layout": self._layout(self._attributes),
+            "ids": list(self._positions),
+            "id_positions": array("I", self._positions.values()),
+            "vocabulary": self._vocabulary,
+            "postings": _pack(self._postings),
+            "prefixes": prefixes,
+            "prefix_postings": _pack(self._prefix_postings[prefix] for prefix in prefixes),
+            "grams": grams,
+            "gram_postings": _pack(self._grams[gram] for gram in grams),
+            "attributes": {
+                field: {
+                    "values": list(values),
+                    "bitsets": b"".join(bits.to_bytes(width, "little") for bits in values.values())
+                }
+                for field, values in self._attributes.items()
+            },
+            "numeric": self._numeric.state(),
+            "groups": {field: {"labels": labels, "codes": codes} for field, (labels, codes) in self._groups.items()}
+        }
+
+    def _restore(self, state, attribute_fields):
+        """Adota as estruturas de state() em vez de construí-las"""
+        if state["layout"] != self._layout(attribute_fields):
+            raise ValueError("índice gravado com outros campos, parâmetros ou registros")
+        width = (len(self.records) + 7) // 8
+        self._positions = dict(zip(state["ids"], state["id_positions"]))
+        self._vocabulary = state["vocabulary"]
+        self._postings = _PackedLists(**state["postings"])
+        self._prefix_postings = dict(zip(state["prefixes"], _PackedLists(**state["prefix_postings"])))
+        self._grams = dict(zip(state["grams"], _PackedLists(**state["gram_postings"])))
+        self._attributes = {}
+        for field in attribute_fields:
+            values, bitsets = state["attributes"][field]["values"], state["attributes"][field]["bitsets"]
+            self._attributes[field] = {
+                value: int.from_bytes(bitsets[number * width:(number + 1) * width], "little")
+                for number, value in enumerate(values)
+            }
+        self._numeric = NumericColumns(columns=state["numeric"])
+        self._groups = {field: (group["labels"], group["codes"]) for field, group in state["groups"].items()}
+
+    def counts(self, field):
+        """
+        Número de registros por valor de um campo indexado
+
+        Args:
+            field (str): Campo com índice de igualdade
+
+        Returns:
+            dict: Valor -> número de registros
+        """
+        return {value: bin(bits).count("1") for value, bits in self._attributes[field].items()}
+
+    def values(self, field):
+        """
+        Valores distintos de um campo indexado, em ordem alfabética
+
+        Args:
+            field (str): Campo com índice de igualdade
+
+        Returns:
+            list: Valores distintos
+        """
+        return sorted(self._attributes[field])
+
+    def get(self, record_id):
+        """
+        Recupera um registro pelo ID em O(1)
+
+        Args:
+            record_id (str): ID do registro
+
+        Returns:
+            dict: Registro ou None se não encontrado
+        """
+        position = self._positions.get(record_id)
+        return None if position is None else self.records[position]
+
+    def get_many(self, record_ids):
+        """
+        Recupera vários registros pelo ID, na ordem solicitada
+
+        Args:
+            record_ids (list): IDs dos registros
+
+        Returns:
+            list: Registros encontrados (IDs inexistentes são ignorados)
+        """
+        positions = self._positions
+        return [self.records[positions[record_id]] for record_id in record_ids if record_id in positions]
+
+    def _record_tokens(self, record):
+        """Conjunto de tokens distintos dos campos textuais de um registro"""
+        tokens = set()
+        for field in self.text_fields:
+            value = record.get(field)
+            if not value:
+                continue
+            if isinstance(value, (list, tuple)):
+                for item in value:
+                    tokens.update(tokenize(item))
+            else:
+                tokens.update(tokenize(value))
+        return tokens
+
+    def _prefix_lookup(self, prefix):
+        """Posições dos registros com algum token que começa com o prefixo"""
+        if len(prefix) <= PREFIX_LENGTH:
+            return self._prefix_postings.get(prefix, ())
+
+        # Prefixos longos casam com poucos tokens: une as postings exatas
+        positions = set()
+        start = bisect_left(self._vocabulary, prefix)
+        for token_position in range(start, len(self._vocabulary)):
+            if not self._vocabulary[token_position].startswith(prefix):
+                break
+            positions.update(self._postings[token_position])
+        return array("I", sorted(positions))
+
+    def _infix_lookup(self, term):
+        """Posições dos registros com algum token que contém o termo"""
+        # Só os tokens com todos os n-gramas do termo podem contê-lo; a
+        # interseção começa pela lista do n-grama mais raro
+        candidates = _intersect([self._grams.get(gram, ()) for gram in _grams(term)])
+        positions = set()
+        for token_position in candidates:
+            if term in self._vocabulary[token_position]:
+                positions.update(self._postings[token_position])
+        return array("I", sorted(positions))
+
+    def _term_lookup(self, term):
+        """Posições dos registros que casam com um termo da consulta (ver match_text)"""
+        if len(term) >= INFIX_MIN_LENGTH:
+            return self._infix_lookup(term)
+        return self._prefix_lookup(term)
+
+    def match_text(self, query):
+        """
+        Busca textual: cada termo da consulta deve prefixar algum token do
+        registro; termos com INFIX_MIN_LENGTH caracteres ou mais também casam
+        no meio dos tokens
+
+        Args:
+            query (str): Texto para busca
+
+        Returns:
+            list: Posições (ordenadas) dos registros encontrados
+        """
+        terms = set(tokenize(query))
+        if not terms:
+            return []
+        return _intersect([self._term_lookup(term) for term in terms])
+
+    def match_attributes(self, filters):
+        """
+        Interseção dos bitsets dos filtros de igualdade
+
+        Args:
+            filters (dict): Campo -> valor; uma lista de valores equivale a um "ou"
+
+        Returns:
+            int: Bitset das posições selecionadas ou None se nenhum filtro foi aplicado
+        """
+        mask = None
+        for field, value in filters.items():
+            if value is None:
+                continue
+            values = self._attributes[field]
+            if isinstance(value, (list, tuple, set, frozenset)):
+                bits = 0
+                for item in value:
+                    bits |= values.get(item, 0)
+            else:
+                bits = values.get(value, 0)
+            mask = bits if mask is None else mask & bits
+            if not mask:
+                break
+        return mask
+
+    def _match(self, query, filters):
+        """Posições ordenadas dos registros que atendem aos filtros e ao texto"""
+        mask = self.match_attributes(filters) if filters else None
+        if mask is None:
+            if query:
+                return self.match_text(query)
+            return range(len(self.records))
+
+        survivors = _bit_positions(mask)
+        if not query or not survivors:
+            return survivors
+
+        # O texto só é verificado sobre os sobreviventes dos filtros
+        terms = set(tokenize(query))
+        if not terms:
+            return []
+        return _intersect([survivors] + [self._term_lookup(term) for term in terms])
+
+    def find_positions(self, query=None, filters=None, limit=None, skip=0, after=None, ranges=None, sort=None):
+        """
+        Posições dos registros que atendem aos filtros e ao texto de busca
+
+        Args:
+            query (str): Texto para busca
+            filters (dict): Filtros de igualdade (ver match_attributes)
+            limit (int): Número máximo de resultados (None ou 0 para todos)
+            skip (int): Número de resultados para pular, ignorado quando after é informado
+            after (str): ID do último registro da página anterior (paginação por chave)
+            ranges (dict): Faixas dos campos numéricos (ver numeric.parse_ranges)
+            sort (tuple): Ordenação por um campo numérico (ver numeric.parse_sort)
+
+        Returns:
+            list: Posições dos registros encontrados, em ordem crescente ou na ordenação pedida
+
+        Raises:
+            ValueError: Se o ID informado em after não existir no conjunto de dados
+        """
+        positions = self._match(query, filters)
+        numeric = bool(ranges or sort)
+        if numeric:
+            positions = self._numeric.select(positions, ranges, sort)
+
+        if after is not None:
+            if after not in self._positions:
+                raise ValueError("Cursor inválido")
+            if sort:
+                start = self._numeric.start_after(positions, self._positions[after], sort)
+            else:
+                start = bisect_right(positions, self._positions[after])
+        else:
+            start = skip
+
+        end = start + limit if limit else None
+        page = positions[start:end]
+        return page.tolist() if numeric else page
+
+    def find(self, query=None, filters=None, limit=None, skip=0, after=None, ranges=None, sort=None):
+        """
+        Retorna os registros que atendem aos filtros e ao texto de busca
+
+        Args:
+            query (str): Texto para busca
+            filters (dict): Filtros de igualdade (ver match_attributes)
+            limit (int): Número máximo de resultados (None ou 0 para todos)
+            skip (int): Número de resultados para pular, ignorado quando after é informado
+            after (str): ID do último registro da página anterior (paginação por chave)
+            ranges (dict): Faixas dos campos numéricos (ver numeric.parse_ranges)
+            sort (tuple): Ordenação por um campo numérico (ver numeric.parse_sort)
+
+        Returns:
+            list: Lista de indústrias, na ordem original do conjunto de dados ou na ordenação pedida
+        """
+        positions = self.find_positions(query, filters, limit, skip, after, ranges, sort)
+        return [self.records[position] for position in positions]
+
+    def stats(self, group_by, query=None, filters=None, ranges=None):
+        """
+        Totais por valor de um atributo dos registros que atendem aos filtros
+
+        Args:
+            group_by (str): Campo com índice de igualdade
+            query (str): Texto para busca
+            filters (dict): Filtros de igualdade (ver match_attributes)
+            ranges (dict): Faixas dos campos numéricos (ver numeric.parse_ranges)
+
+        Returns:
+            list: Linhas dos grupos (ver stats.make_row), do maior grupo para o menor
+        """
+        positions = self._numeric.select(self._match(query, filters), ranges)
+        labels, codes = self._groups[group_by]
+        return self._numeric.group_totals(labels, codes, positions)
+
+    def search(self, query):
+        """
+        Retorna os registros que correspondem ao texto de busca
+
+        Args:
+            query (str): Texto para busca
+
+        Returns:
+            list: Lista de indústrias, na ordem original do conjunto de dados
+        """
+        return self.find(query)
@@ -0,0 +1,619 @@
+"""
+Snapshots colunares do conjunto de indústrias, lidos por memory-map
+
+Cada campo (com os subcampos achatados, como location.lat) é gravado como uma
+coluna de tamanho fixo; textos e listas de textos guardam apenas índices de
+uma tabela de strings única, sem repetição. O servidor mapeia o arquivo em
+memória: as páginas são compartilhadas por todos os workers e lidas sob
+demanda, e cada registro só vira um dict quando é acessado.
+
+Os índices de busca e de sugestões (INDEXES) são construídos uma vez, na
+geração, e gravados no mesmo arquivo: um worker que carrega o snapshot usa as
+postings, bitsets e colunas numéricas direto do mapa, sem reconstruí-los.
+
+Uso:
+    python snapshot.py build catalogo.jsonl -o industrias.snap
+    python snapshot.py build dump/businesses_industry/industries.bson -o industrias.snap
+    python snapshot.py build --mongo -o industrias.snap
+    python snapshot.py info industrias.snap
+"""
+import argparse
+import json
+import logging
+import mmap
+import os
+import signal
+import struct
+import sys
+import threading
+import time
+import zlib
+from array import array
+from datetime import datetime, timezone
+import numpy as np
+from json_provider import default
+from numeric import parse_revenue
+from regions import country_of, region_of
+from search_index import IndustryIndex
+from suggest import SuggestIndex
+
+# Configuração de logging
+logger = logging.getLogger(__name__)
+
+MAGIC = b"BOISNAP1"
+FORMAT_VERSION = 1
+
+# Prefixo do arquivo: magic, posição e tamanho do cabeçalho (gravado no final)
+PREFIX = struct.Struct("<8sQQ")
+
+# Seções alinhadas para que as colunas possam ser lidas diretamente do mapa
+ALIGNMENT = 8
+
+# Valores que representam campo ausente em cada tipo de coluna
+MISSING_STRING = 0xFFFFFFFF
+MISSING_INT = -(2 ** 63)
+MISSING_BOOL = 2
+
+# Strings (as mais frequentes, pela ordem da tabela) mantidas decodificadas pelo leitor
+CACHED_STRINGS = 4096
+
+# Códigos do módulo array de cada tipo de coluna
+TYPECODES = {"str": "I", "json": "I", "int": "q", "float": "d", "bool": "B", "strlist": "I"}
+
+# Índices gravados junto com os registros: nome -> classe com state() e o argumento state do construtor
+INDEXES = {"industry": IndustryIndex, "suggest": SuggestIndex}
+
+
+class SnapshotError(Exception):
+    """Arquivo que não é um snapshot válido (ou é de outra versão do formato)"""
+
+
+def _plain(value):
+    """Converte tipos do MongoDB (ObjectId, datas, Decimal) para tipos simples"""
+    if value is None or isinstance(value, (str, int, float, bool, list, dict)):
+        return value
+    return default(value)
+
+
+def _flatten(record, prefix="", flat=None):
+    """Achata subdocumentos em campos com ponto (location.lat)"""
+    flat = {} if flat is None else flat
+    for key, value in record.items():
+        path = f"{prefix}{key}"
+        if isinstance(value, dict) and value:
+            _flatten(value, f"{path}.", flat)
+        else:
+            flat[path] = _plain(value)
+    return flat
+
+
+def prepare(record):
+    """
+    Registro no formato servido pela API, achatado para a gravação
+
+    Documentos do MongoDB ganham id (texto do _id); country e region são
+    derivados da localização quando ausentes, como nos dados simulados, e a
+    receita em texto é convertida uma vez para revenue_usd.
+
+    Args:
+        record (dict): Indústria (dados simulados, JSONL ou documento do MongoDB)
+
+    Returns:
+        dict: Campos achatados
+    """
+    record = dict(record)
+    if "_id" in record:
+        record.setdefault("id", str(record.pop("_id")))
+    if not record.get("country") and country_of(record):
+        record["country"] = country_of(record)
+    if not record.get("region") and region_of(record):
+        record["region"] = region_of(record)
+    if record.get("revenue_usd") is None and parse_revenue(record.get("revenue")) is not None:
+        record["revenue_usd"] = parse_revenue(record["revenue"])
+    return _flatten(record)
+
+
+def _kind(value):
+    if isinstance(value, bool):
+        return "bool"
+    if isinstance(value, int):
+        return "int" if MISSING_INT < value < 2 ** 63 else "json"
+    if isinstance(value, float):
+        return "float"
+    if isinstance(value, str):
+        return "str"
+    if isinstance(value, list) and all(isinstance(item, str) for item in value):
+        return "strlist"
+    return "json"
+
+
+def _merge_kinds(current, new):
+    if current is None or current == new:
+        return new
+    if {current, new} == {"int", "float"}:
+        return "float"
+    return "json"
+
+
+class _Writer:
+    """Grava as seções alinhadas e acumula o checksum"""
+
+    def __init__(self, stream):
+        self.stream = stream
+        self.offset = PREFIX.size
+        self.checksum = 0
+        stream.write(b"\0" * PREFIX.size)
+
+    def section(self, data):
+        padding = -self.offset % ALIGNMENT
+        if padding:
+            self.stream.write(b"\0" * padding)
+            self.offset += padding
+        start = self.offset
+        data = bytes(data)
+        self.stream.write(data)
+        self.checksum = zlib.crc32(data, self.checksum)
+        self.offset += len(data)
+        return {"offset": start, "length": len(data)}
+
+    def strings(self, texts):
+        """Grava uma lista de strings (offsets e bytes UTF-8 concatenados)"""
+        encoded = [text.encode("utf-8") for text in texts]
+        offsets = array("Q", [0])
+        for data in encoded:
+            offsets.append(offsets[-1] + len(data))
+        return {"count": len(encoded), "offsets": self.section(offsets.tobytes()), "data": self.section(b"".join(encoded))}
+
+    def part(self, value):
+        """
+        Grava uma parte do estado de um índice
+
+        Arrays, colunas numpy e bytes viram seções lidas sem cópia; listas de
+        strings, uma tabela própria; dicts, uma parte por chave. O restante
+        (números, listas pequenas) fica no próprio cabeçalho.
+
+        Returns:
+            dict: Descrição da parte, guardada no cabeçalho
+        """
+        if isinstance(value, dict):
+            return {"type": "dict", "items": {key: self.part(item) for key, item in value.items()}}
+        if isinstance(value, array):
+            return {"type": "array", "typecode": value.typecode, "data": self.section(value.tobytes())}
+        if isinstance(value, np.ndarray):
+            return {"type": "ndarray", "dtype": value.dtype.str, "data": self.section(np.ascontiguousarray(value).tobytes())}
+        if isinstance(value, (bytes, bytearray)):
+            return {"type": "bytes", "data": self.section(value)}
+        if isinstance(value, list) and all(isinstance(item, str) for item in value):
+            return dict(self.strings(value), type="strings")
+        return {"type": "json", "value": value}
+
+
+def _finish(stream, writer, header):
+    """Grava o cabeçalho depois das seções e aponta o prefixo do arquivo para ele"""
+    header["checksum"] = f"{writer.checksum:08x}"
+    header_bytes = json.dumps(header, ensure_ascii=False).encode("utf-8")
+    stream.seek(writer.offset)
+    stream.write(header_bytes)
+    stream.truncate()
+    stream.seek(0)
+    stream.write(PREFIX.pack(MAGIC, writer.offset, len(header_bytes)))
+    stream.seek(writer.offset)
+    stream.flush()
+
+
+def _index_states(path, indexes):
+    """Estruturas de cada índice, construídas sobre os registros como o servidor os lê"""
+    records = Snapshot(path)
+    return {name: factory(records).state() for name, factory in indexes.items()}
+
+
+def write(records, path, source="", indexes=INDEXES):
+    """
+    Grava um snapshot
+
+    O arquivo é escrito ao lado do destino e movido com os.replace: quem já
+    mapeou a versão anterior continua lendo-a até recarregar. Os registros
+    são gravados primeiro; os índices são construídos lendo esse arquivo e
+    acrescentados depois, com um novo cabeçalho.
+
+    Args:
+        records (iterable): Indústrias
+        path (str): Arquivo de destino
+        source (str): Origem dos dados, registrada no cabeçalho
+        indexes (dict): Índices gravados junto (ver INDEXES); vazio para nenhum
+
+    Returns:
+        dict: Cabeçalho gravado
+    """
+    flat = [prepare(record) for record in records]
+    kinds = {}
+    for record in flat:
+        for name, value in record.items():
+            if value is not None:
+                kinds[name] = _merge_kinds(kinds.get(name), _kind(value))
+
+    strings = {}
+    frequencies = []
+
+    def intern(text):
+        index = strings.get(text)
+        if index is None:
+            index = strings[text] = len(strings)
+            frequencies.append(0)
+        frequencies[index] += 1
+        return index
+
+    columns = []
+    for name, kind in kinds.items():
+        values = array(TYPECODES[kind])
+        offsets = array("I", [0]) if kind == "strlist" else None
+        for record in flat:
+            value = record.get(name)
+            if kind == "strlist":
+                if isinstance(value, list):
+                    values.extend(intern(item) for item in value)
+                offsets.append(len(values))
+            elif value is None:
+                values.append({"int": MISSING_INT, "float": float("nan"), "bool": MISSING_BOOL}.get(kind, MISSING_STRING))
+            elif kind == "json":
+                values.append(intern(json.dumps(value, default=default, ensure_ascii=False)))
+            elif kind == "str":
+                values.append(intern(value))
+            else:
+                values.append({"int": int, "float": float, "bool": int}[kind](value))
+        columns.append((name, kind, values, offsets))
+
+    # Strings mais frequentes (setores, países...) ficam com os menores índices,
+    # que o leitor mantém decodificados em cache
+    order = sorted(range(len(frequencies)), key=lambda index: -frequencies[index])
+    renumber = array("I", bytes(4 * len(order)))
+    for new_index, old_index in enumerate(order):
+        renumber[old_index] = new_index
+    for name, kind, values, offsets in columns:
+        if kind in ("str", "json", "strlist"):
+            for position, value in enumerate(values):
+                if value != MISSING_STRING:
+                    values[position] = renumber[value]
+    texts = list(strings)
+
+    temporary = f"{path}.tmp-{os.getpid()}"
+    with open(temporary, "w+b") as stream:
+        writer = _Writer(stream)
+        header = {
+            "format": FORMAT_VERSION,
+            "byteorder": sys.byteorder,
+            "count": len(flat),
+            "source": source,
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "strings": writer.strings(texts[index] for index in order),
+            "fields": []
+        }
+        for name, kind, values, offsets in columns:
+            field = {"name": name, "type": kind, "values": writer.section(values.tobytes())}
+            if offsets is not None:
+                field["offsets"] = writer.section(offsets.tobytes())
+            header["fields"].append(field)
+        _finish(stream, writer, header)
+
+        if indexes:
+            header["indexes"] = {name: writer.part(state) for name, state in _index_states(temporary, indexes).items()}
+            _finish(stream, writer, header)
+        os.fsync(stream.fileno())
+    os.replace(temporary, path)
+    return header
+
+
+def read_header(path):
+    """
+    Lê apenas o cabeçalho de um snapshot
+
+    Args:
+        path (str): Arquivo do snapshot
+
+    Returns:
+        dict: Cabeçalho (count, fields, checksum, created_at, source...)
+
+    Raises:
+        SnapshotError: Se o arquivo não for um snapshot válido
+    """
+    with open(path, "rb") as stream:
+        magic, offset, length = PREFIX.unpack(stream.read(PREFIX.size).ljust(PREFIX.size, b"\0"))
+        if magic != MAGIC:
+            raise SnapshotError(f"{path} não é um snapshot de indústrias")
+        stream.seek(offset)
+        header = json.loads(stream.read(length))
+    if header.get("format") != FORMAT_VERSION:
+        raise SnapshotError(f"Formato de snapshot não suportado: {header.get('format')}")
+    if header.get("byteorder") != sys.byteorder:
+        raise SnapshotError("Snapshot gravado em uma máquina de outra ordem de bytes")
+    return header
+
+
+class Snapshot:
+    """
+    Sequência de indústrias lida de um snapshot mapeado em memória
+
+    Aceita len(), índices e iteração, como uma lista de dicts; cada acesso
+    monta um dict novo a partir das colunas.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.header = read_header(path)
+        with open(path, "rb") as stream:
+            self._mmap = mmap.mmap(stream.fileno(), 0, access=mmap.ACCESS_READ)
+        self._view = memoryview(self._mmap)
+        section = self._section
+
+        strings = self.header["strings"]
+        self._string_offsets = section(strings["offsets"], "Q")
+        self._string_base = strings["data"]["offset"]
+        self._count = self.header["count"]
+        self._columns = []
+        for field in self.header["fields"]:
+            kind = field["type"]
+            values = section(field["values"], TYPECODES[kind])
+            offsets = section(field["offsets"], "I") if "offsets" in field else None
+            self._columns.append((field["name"].split("."), self._reader(kind, values, offsets)))
+        self._cache = [None] * min(CACHED_STRINGS, strings["count"])
+
+    def _section(self, spec, typecode):
+        """Seção do arquivo como memoryview do tipo pedido (sem cópia)"""
+        return self._view[spec["offset"]:spec["offset"] + spec["length"]].cast(typecode)
+
+    def _part(self, spec):
+        """Lê uma parte gravada por _Writer.part"""
+        kind = spec["type"]
+        if kind == "dict":
+            return {key: self._part(item) for key, item in spec["items"].items()}
+        if kind == "array":
+            return self._section(spec["data"], spec["typecode"])
+        if kind == "ndarray":
+            return np.frombuffer(self._section(spec["data"], "B"), dtype=spec["dtype"])
+        if kind == "bytes":
+            return self._section(spec["data"], "B")
+        if kind == "strings":
+            offsets = self._section(spec["offsets"], "Q")
+            data = self._section(spec["data"], "B").tobytes()
+            return [data[offsets[i]:offsets[i + 1]].decode("utf-8") for i in range(spec["count"])]
+        return spec["value"]
+
+    def index_state(self, name):
+        """
+        Estruturas de um índice gravadas no snapshot
+
+        Args:
+            name (str): Nome do índice (ver INDEXES)
+
+        Returns:
+            dict: Estado para o argumento state do construtor, ou None se o snapshot não o tiver
+        """
+        spec = self.header.get("indexes", {}).get(name)
+        return None if spec is None else self._part(spec)
+
+    @property
+    def checksum(self):
+        """Checksum do conteúdo (identifica a versão dos dados)"""
+        return self.header["checksum"]
+
+    def _string(self, index):
+        if index < len(self._cache):
+            text = self._cache[index]
+            if text is None:
+                text = self._cache[index] = self._decode(index)
+            return text
+        return self._decode(index)
+
+    def _decode(self, index):
+        base = self._string_base
+        return self._mmap[base + self._string_offsets[index]:base + self._string_offsets[index + 1]].decode("utf-8")
+
+    def _reader(self, kind, values, offsets):
+        """Função que lê o valor de uma coluna em uma posição (None se ausente)"""
+        string = self._string
+        if kind == "strlist":
+            return lambda position: [string(index) for index in values[offsets[position]:offsets[position + 1]]]
+        if kind == "str":
+            return lambda position: None if values[position] == MISSING_STRING else string(values[position])
+        if kind == "json":
+            return lambda position: None if values[position] == MISSING_STRING else json.loads(string(values[position]))
+        if kind == "int":
+            return lambda position: None if values[position] == MISSING_INT else values[position]
+        if kind == "float":
+            return lambda position: None if values[position] != values[position] else values[position]
+        return lambda position: None if values[position] == MISSING_BOOL else bool(values[position])
+
+    def __len__(self):
+        return self._count
+
+    def __getitem__(self, position):
+        if not 0 <= position < self._count:
+            raise IndexError("posição fora do snapshot")
+        record = {}
+        for path, read in self._columns:
+            value = read(position)
+            if value is None:
+                continue
+            if len(path) == 1:
+                record[path[0]] = value
+                continue
+            target = record
+            for key in path[:-1]:
+                target = target.setdefault(key, {})
+            target[path[-1]] = value
+        return record
+
+    def __iter__(self):
+        for position in range(self._count):
+            yield self[position]
+
+
+def restore(records, name, factory):
+    """
+    Índice gravado no snapshot ou, se não houver, construído sobre os registros
+
+    Snapshots gerados antes dos índices (ou com outros parâmetros de
+    indexação) continuam válidos: o índice é reconstruído, como antes.
+
+    Args:
+        records: Snapshot ou lista de indústrias
+        name (str): Nome do índice (ver INDEXES)
+        factory (callable): Classe do índice (factory(records) ou factory(records, state=...))
+
+    Returns:
+        Índice pronto para consulta
+    """
+    state = records.index_state(name) if isinstance(records, Snapshot) else None
+    if state is not None:
+        try:
+            return factory(records, state=state)
+        except (KeyError, ValueError) as e:
+            logger.warning(f"Índice {name} do snapshot ignorado, reconstruindo: {e}")
+    return factory(records)
+
+
+class LiveSnapshot:
+    """
+    Conjunto de dados servido a partir de um snapshot, recarregado sem parar o servidor
+
+    O arquivo é verificado (inode, mtime e tamanho) no máximo a cada
+    check_interval segundos, nas chamadas de get(), e também pode ser
+    recarregado por SIGHUP. A carga acontece em uma thread auxiliar; só depois
+    de pronta a nova versão substitui a anterior, com uma única atribuição.
+    Requisições em andamento terminam com a versão que já tinham.
+    """
+
+    def __init__(self, path, build, check_interval):
+        """
+        Args:
+            path (str): Arquivo do snapshot
+            build (callable): Função que recebe um Snapshot e monta o conjunto servido
+            check_interval (float): Segundos entre as verificações do arquivo
+        """
+        self.path = path
+        self.check_interval = check_interval
+        self._build = build
+        self._lock = threading.Lock()
+        self._loading = False
+        self._signature = self._stat()
+        self.current = build(Snapshot(path))
+        self._checked_at = time.monotonic()
+
+    def _stat(self):
+        stat = os.stat(self.path)
+        return stat.st_ino, stat.st_mtime_ns, stat.st_size
+
+    def get(self):
+        """
+        Conjunto de dados atual (dispara a recarga se o arquivo mudou)
+
+        Returns:
+            Objeto montado pela função build
+        """
+        now = time.monotonic()
+        if now - self._checked_at >= self.check_interval:
+            self._checked_at = now
+            try:
+                changed = self._stat() != self._signature
+            except OSError:
+                changed = False
+            if changed:
+                self.reload()
+        return self.current
+
+    def reload(self):
+        """Inicia a recarga do arquivo em segundo plano (se ainda não houver uma em andamento)"""
+        with self._lock:
+            if self._loading:
+                return
+            self._loading = True
+        threading.Thread(target=self._load, name="snapshot-reload", daemon=True).start()
+
+    def _load(self):
+        try:
+            signature = self._stat()
+            # Mesmo que a carga falhe, só tenta de novo quando o arquivo mudar outra vez
+            self._signature = signature
+            snapshot = Snapshot(self.path)
+            self.current = self._build(snapshot)
+            logger.info(f"Snapshot recarregado: {self.path} ({len(snapshot)} registros, {snapshot.checksum})")
+        except Exception as e:
+            logger.error(f"Erro ao recarregar o snapshot {self.path}, mantendo a versão anterior: {e}")
+        finally:
+            with self._lock:
+                self._loading = False
+
+    def install_signal_handler(self):
+        """Recarrega o snapshot ao receber SIGHUP (apenas na thread principal)"""
+        try:
+            signal.signal(signal.SIGHUP, lambda signum, frame: self.reload())
+        except (AttributeError, ValueError) as e:
+            logger.warning(f"Recarga por SIGHUP indisponível: {e}")
+
+
+def _read_source(path):
+    """Registros de um arquivo JSONL (mongoexport ou catálogo) ou BSON (mongodump)"""
+    if path.endswith(".bson"):
+        from bson import decode_file_iter
+        with open(path, "rb") as stream:
+            yield from decode_file_iter(stream)
+        return
+    try:
+        from bson import json_util
+        loads = json_util.loads
+    except ImportError:  # pragma: no cover - sem pymongo, JSON simples
+        loads = json.loads
+    with open(path, encoding="utf-8") as stream:
+        for line in stream:
+            if line.strip():
+                yield loads(line)
+
+
+def _read_mongo():
+    from database import db, COLLECTIONS
+    if not db.is_connected():
+        raise SnapshotError("Banco de dados não disponível")
+    return db.get_collection(COLLECTIONS['industries']).find({}).sort("_id", 1)
+
+
+def main(argv=None):
+    """Linha de comando: python snapshot.py build|info"""
+    parser = argparse.ArgumentParser(description="Gera e inspeciona snapshots do conjunto de indústrias")
+    commands = parser.add_subparsers(dest="command", required=True)
+    build = commands.add_parser("build", help="gera um snapshot a partir de JSONL, BSON ou do MongoDB")
+    build.add_argument("source", nargs="?", help="arquivo .jsonl (mongoexport ou catálogo) ou .bson (mongodump)")
+    build.add_argument("--mongo", action="store_true", help="lê a coleção de indústrias do MongoDB")
+    build.add_argument("-o", "--output", required=True, help="arquivo de destino")
+    info = commands.add_parser("info", help="mostra o cabeçalho de um snapshot")
+    info.add_argument("path")
+    args = parser.parse_args(argv)
+
+    if args.command == "info":
+        header = read_header(args.path)
+        fields = ", ".join(f"{field['name']}:{field['type']}" for field in header["fields"])
+        print(f"{header['count']} registros, {header['strings']['count']} strings, checksum {header['checksum']}")
+        print(f"gerado em {header['created_at']} a partir de {header['source'] or '-'}")
+        print(f"campos: {fields}")
+        print(f"índices: {', '.join(header.get('indexes', {})) or '-'}")
+        return 0
+
+    if args.mongo == bool(args.source):
+        parser.error("informe um arquivo de origem ou --mongo")
+    started = time.perf_counter()
+    try:
+        records = _read_mongo() if args.mongo else _read_source(args.source)
+        header = write(records, args.output, source="mongo" if args.mongo else os.path.basename(args.source))
+    except SnapshotError as e:
+        logger.error(str(e))
+        return 2
+    size = os.path.getsize(args.output)
+    logger.info(
+        f"Snapshot gravado em {args.output}: {header['count']} registros, {size / 1e6:.1f} MB, "
+        f"{time.perf_counter() - started:.1f}s"
+    )
+    return 0
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO)
+    sys.exit(main())
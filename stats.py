@@ -0,0 +1,146 @@
+import os
+import threading
+from collections import OrderedDict
+
+# Agrupamentos aceitos por /api/stats
+GROUP_FIELDS = ("sector", "region", "country", "status")
+
+# Campo de cada agrupamento nos documentos do MongoDB
+MONGO_GROUP_FIELDS = {"sector": "sector", "region": "region", "country": "location.country", "status": "status"}
+
+# Resultados guardados por processo (os menos usados são descartados)
+STATS_CACHE_SIZE = int(os.getenv('STATS_CACHE_SIZE', 256))
+
+
+def make_row(name, count, employees, avg_employees, revenue_usd, avg_revenue_usd):
+    """
+    Linha de um grupo no formato devolvido pela API
+
+    Args:
+        name (str): Valor do campo agrupado
+        count (int): Número de indústrias
+        employees (float): Soma dos funcionários
+        avg_employees (float): Média de funcionários (None se nenhuma indústria informar)
+        revenue_usd (float): Soma das receitas em dólares
+        avg_revenue_usd (float): Média das receitas (None se nenhuma indústria informar)
+
+    Returns:
+        dict: Totais e médias do grupo
+    """
+    return {
+        "name": name,
+        "count": int(count),
+        "employees": int(round(employees or 0)),
+        "avg_employees": None if avg_employees is None else round(float(avg_employees), 2),
+        "revenue_usd": float(revenue_usd or 0),
+        "avg_revenue_usd": None if avg_revenue_usd is None else round(float(avg_revenue_usd), 2)
+    }
+
+
+def pipeline(group_by, match):
+    """
+    Pipeline de agregação dos totais por grupo
+
+    Args:
+        group_by (str): Um de GROUP_FIELDS
+        match (dict): Filtros da consulta
+
+    Returns:
+        list: Estágios do aggregate, do maior grupo para o menor
+    """
+    return [
+        {"$match": match},
+        {"$group": {
+            "_id": f"${MONGO_GROUP_FIELDS[group_by]}",
+            "count": {"$sum": 1},
+            # $sum e $avg ignoram documentos sem o campo (ou com valor não numérico)
+            "employees": {"$sum": "$employees"},
+            "avg_employees": {"$avg": "$employees"},
+            "revenue_usd": {"$sum": "$revenue_usd"},
+            "avg_revenue_usd": {"$avg": "$revenue_usd"}
+        }},
+        {"$match": {"_id": {"$ne": None}}},
+        {"$sort": {"count": -1, "_id": 1}}
+    ]
+
+
+def aggregate(collection, group_by, match):
+    """
+    Executa a agregação no MongoDB
+
+    Args:
+        collection: Coleção de indústrias
+        group_by (str): Um de GROUP_FIELDS
+        match (dict): Filtros da consulta
+
+    Returns:
+        list: Linhas dos grupos (ver make_row)
+    """
+    return [
+        make_row(group["_id"], group["count"], group["employees"], group["avg_employees"],
+                 group["revenue_usd"], group["avg_revenue_usd"])
+        for group in collection.aggregate(pipeline(group_by, match))
+    ]
+
+
+class StatsCache:
+    """
+    Resultados de /api/stats por combinação de filtros
+
+    Cada entrada vale para uma versão dos dados: quando a versão muda (uma
+    escrita incrementou a versão da coleção), o cache é esvaziado.
+    """
+
+    def __init__(self, size=STATS_CACHE_SIZE):
+        self.size = size
+        self._entries = OrderedDict()
+        self._version = None
+        self._lock = threading.Lock()
+
+    def get(self, version, key, compute):
+        """
+        Recupera um resultado, calculando-o se não estiver no cache
+
+        Args:
+            version (str): Versão atual dos dados
+            key (tuple): Agrupamento e filtros (valores hasheáveis)
+            compute (callable): Função sem argumentos que calcula o resultado
+
+        Returns:
+            list: Resultado guardado ou recém-calculado
+        """
+        with self._lock:
+            if version != self._version:
+                self._entries.clear()
+                self._version = version
+            elif key in self._entries:
+                self._entries.move_to_end(key)
+                return self._entries[key]
+
+        result = compute()
+        with self._lock:
+            # Uma escrita durante o cálculo já terá trocado a versão
+            if version == self._version:
+                self._entries[key] = result
+                while len(self._entries) > self.size:
+                    self._entries.popitem(last=False)
+        return result
+
+
+def cache_key(group_by, filters, ranges):
+    """
+    Chave do cache para um agrupamento e seus filtros
+
+    Args:
+        group_by (str): Campo agrupado
+        filters (dict): Filtros de igualdade
+        ranges (dict): Faixas numéricas (ver numeric.parse_ranges)
+
+    Returns:
+        tuple: Chave hasheável, independente da ordem dos filtros
+    """
+    return (
+        group_by,
+        tuple(sorted((field, value) for field, value in (filters or {}).items() if value is not None)),
+        tuple(sorted((ranges or {}).items()))
+    )
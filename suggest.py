@@ -0,0 +1,514 @@
+import logging
+import threading
+import time
+from array import array
+from bisect import bisect_left, insort
+from functools import lru_cache
+from search_index import tokenize
+from regions import country_of
+
+# Configuração de logging
+logger = logging.getLogger(__name__)
+
+# Campos cujos valores viram sugestões de termo (tipo -> campo)
+TERM_FIELDS = (("sector", "sector"), ("product", "products"))
+
+# Campos lidos para montar o índice (projeção da carga e gatilho das atualizações)
+SUGGEST_FIELDS = ("name", "sector", "products", "country", "location")
+
+# Sugestões devolvidas no máximo por consulta
+MAX_LIMIT = 20
+
+# Correção de digitação: a última palavra da consulta precisa ter ao menos
+# MIN_FUZZY_LENGTH letras; palavras até SHORT_WORD_LENGTH aceitam 1 edição, as demais 2
+MIN_FUZZY_LENGTH = 3
+SHORT_WORD_LENGTH = 5
+
+# Letras iniciais que a correção supõe certas (como o prefix_length das buscas
+# fuzzy): restringe a busca a um ramo do vocabulário
+FUZZY_PREFIX_LENGTH = 1
+
+# Prefixos corrigidos consultados por busca
+MAX_CORRECTIONS = 8
+
+# Prefixos com ranking de termos guardado; acima disso o cache é esvaziado
+MAX_CACHED_PREFIXES = 10000
+
+# Maior caractere possível, para delimitar o intervalo de um prefixo na lista ordenada
+_MAX_CHAR = "\U0010ffff"
+
+
+@lru_cache(maxsize=65536)
+def normalize(text):
+    """Chave de busca de um texto: tokens sem acento, separados por um espaço (os termos se repetem muito)"""
+    return " ".join(tokenize(str(text)))
+
+
+def _terms(industry):
+    """Termos (tipo, texto) sugeridos a partir de uma indústria"""
+    terms = []
+    for kind, field in TERM_FIELDS:
+        value = industry.get(field)
+        for item in value if isinstance(value, (list, tuple)) else [value]:
+            if item:
+                terms.append((kind, str(item)))
+    country = country_of(industry)
+    if country:
+        terms.append(("country", country))
+    return terms
+
+
+def affects_suggestions(changes):
+    """
+    Indica se uma atualização ($set) pode alterar as sugestões
+
+    Args:
+        changes (dict): Campos atualizados (aceita notação com ponto)
+
+    Returns:
+        bool: True se algum campo usado nas sugestões foi alterado
+    """
+    return any(key.split(".")[0] in SUGGEST_FIELDS for key in changes)
+
+
+def _industry_id(industry):
+    return str(industry.get("_id", industry.get("id")))
+
+
+def _edit_row(previous, before_previous, word, char, previous_char):
+    """
+    Próxima linha da distância de edição (Damerau restrita) entre a palavra
+    digitada e um caminho do vocabulário estendido por char
+    """
+    left = previous[0] + 1
+    row = [left]
+    for i in range(1, len(word) + 1):
+        value = previous[i - 1] if word[i - 1] == char else previous[i - 1] + 1
+        if left + 1 < value:
+            value = left + 1
+        if previous[i] + 1 < value:
+            value = previous[i] + 1
+        if (before_previous is not None and i > 1 and word[i - 1] == previous_char
+                and word[i - 2] == char and before_previous[i - 2] + 1 < value):
+            value = before_previous[i - 2] + 1
+        row.append(value)
+        left = value
+    return row
+
+
+class SuggestIndex:
+    """
+    Índice de sugestões para o autocompletar
+
+    Nomes de empresas e termos (setores, produtos e países) ficam em listas
+    ordenadas pela chave sem acentos; um prefixo é resolvido com busca binária.
+    Os termos são ordenados pelo número de indústrias que os usam e também
+    podem ser encontrados por qualquer palavra ("solares" encontra "Painéis
+    solares"); as empresas, pelo início do nome.
+    """
+
+    def __init__(self, industries=(), state=None):
+        """
+        Args:
+            industries (iterable): Indústrias (dicts)
+            state (dict): Estruturas já construídas (ver state), lidas de um
+                snapshot; dispensa a leitura das indústrias
+        """
+        self._lock = threading.RLock()
+        self._terms = {}
+        self._names = {}
+        self._words = {}
+        self._cache = {}
+        self._vocabulary = None
+        if state is not None:
+            self._restore(state)
+            return
+        term_keys, name_keys = [], []
+        for industry in industries:
+            for kind, text in _terms(industry):
+                if self._count_term(kind, text, 1) == 1:
+                    term_keys.extend(self._term_keys(kind, text))
+            name_key = self._add_name(industry)
+            if name_key is not None:
+                name_keys.append(name_key)
+        # Carga inicial: ordena uma vez, em vez de inserir item a item
+        self._term_index = sorted(term_keys)
+        self._name_index = sorted(name_keys)
+        self._vocabulary = sorted(self._words)
+
+    def state(self):
+        """
+        Estruturas do índice, para gravação em um snapshot
+
+        Returns:
+            dict: Listas de strings e arrays (ver snapshot.write)
+        """
+        with self._lock:
+            terms = list(self._terms.items())
+            return {
+                "term_kinds": [kind for (kind, _), _ in terms],
+                "term_keys": [key for (_, key), _ in terms],
+                "term_texts": [text for _, (text, _) in terms],
+                "term_counts": array("I", [count for _, (_, count) in terms]),
+                "name_keys": [key for key, _ in self._name_index],
+                "name_ids": [industry_id for _, industry_id in self._name_index],
+                "names": [self._names[industry_id] for _, industry_id in self._name_index],
+                "words": self._vocabulary,
+                "word_counts": array("I", [self._words[word] for word in self._vocabulary])
+            }
+
+    def _restore(self, state):
+        """Adota as estruturas de state() em vez de ler as indústrias"""
+        term_keys = []
+        for kind, key, text, count in zip(state["term_kinds"], state["term_keys"],
+                                          state["term_texts"], state["term_counts"]):
+            self._terms[(kind, key)] = [text, count]
+            term_keys.extend(self._term_keys(kind, text))
+        self._term_index = sorted(term_keys)
+        # Gravadas na ordem do índice de nomes, que já sai ordenado
+        self._name_index = list(zip(state["name_keys"], state["name_ids"]))
+        self._names = dict(zip(state["name_ids"], state["names"]))
+        self._words = dict(zip(state["words"], state["word_counts"]))
+        self._vocabulary = list(state["words"])
+
+    # Manutenção
+
+    def _term_keys(self, kind, text):
+        """Chaves de busca de um termo: o texto inteiro e o texto a partir de cada palavra"""
+        words = normalize(text).split(" ")
+        key = " ".join(words)
+        return [(" ".join(words[start:]), kind, key) for start in range(len(words)) if words[start]]
+
+    def _count_words(self, text, sign):
+        for word in normalize(text).split(" "):
+            if len(word) < 2 or word.isdigit():
+                continue
+            total = self._words.get(word, 0) + sign
+            if total > 0:
+                if word not in self._words and self._vocabulary is not None:
+                    insort(self._vocabulary, word)
+                self._words[word] = total
+            elif word in self._words:
+                del self._words[word]
+                position = bisect_left(self._vocabulary, word)
+                del self._vocabulary[position]
+
+    def _count_term(self, kind, text, sign):
+        """Ajusta a contagem de um termo e devolve o novo total"""
+        key = (kind, normalize(text))
+        if not key[1]:
+            return 0
+        entry = self._terms.get(key)
+        if entry is None:
+            entry = self._terms[key] = [text, 0]
+            self._count_words(text, 1)
+        entry[1] += sign
+        if entry[1] <= 0:
+            del self._terms[key]
+            self._count_words(entry[0], -1)
+            return 0
+        return entry[1]
+
+    def _add_name(self, industry):
+        name = industry.get("name")
+        key = normalize(name) if name else ""
+        if not key:
+            return None
+        industry_id = _industry_id(industry)
+        self._names[industry_id] = name
+        self._count_words(name, 1)
+        return (key, industry_id)
+
+    def add(self, industry):
+        """
+        Inclui uma indústria (após uma criação ou como parte de uma atualização)
+
+        Args:
+            industry (dict): Documento da indústria
+        """
+        with self._lock:
+            for kind, text in _terms(industry):
+                if self._count_term(kind, text, 1) == 1:
+                    for item in self._term_keys(kind, text):
+                        insort(self._term_index, item)
+            name_key = self._add_name(industry)
+            if name_key is not None:
+                insort(self._name_index, name_key)
+            self._cache.clear()
+
+    def remove(self, industry):
+        """
+        Retira uma indústria (após uma remoção ou como parte de uma atualização)
+
+        Args:
+            industry (dict): Documento da indústria, como estava no índice
+        """
+        with self._lock:
+            for kind, text in _terms(industry):
+                if (kind, normalize(text)) in self._terms and self._count_term(kind, text, -1) == 0:
+                    for item in self._term_keys(kind, text):
+                        position = bisect_left(self._term_index, item)
+                        if position < len(self._term_index) and self._term_index[position] == item:
+                            del self._term_index[position]
+            industry_id = _industry_id(industry)
+            name = self._names.pop(industry_id, None)
+            if name is not None:
+                item = (normalize(name), industry_id)
+                position = bisect_left(self._name_index, item)
+                if position < len(self._name_index) and self._name_index[position] == item:
+                    del self._name_index[position]
+                self._count_words(name, -1)
+            self._cache.clear()
+
+    # Consulta
+
+    def _ranked_terms(self, prefix):
+        """Termos com alguma palavra iniciada pelo prefixo, dos mais usados para os menos"""
+        cached = self._cache.get(prefix)
+        if cached is not None:
+            return cached
+        found = set()
+        position = bisect_left(self._term_index, (prefix,))
+        while position < len(self._term_index):
+            search_key, kind, key = self._term_index[position]
+            if not search_key.startswith(prefix):
+                break
+            found.add((kind, key))
+            position += 1
+        ranked = sorted(found, key=lambda item: (-self._terms[item][1], len(item[1]), item))[:MAX_LIMIT]
+        if len(self._cache) >= MAX_CACHED_PREFIXES:
+            self._cache.clear()
+        self._cache[prefix] = ranked
+        return ranked
+
+    def _matches(self, prefix, limit):
+        """Termos e empresas que começam com o prefixo (já normalizado)"""
+        results = []
+        for kind, key in self._ranked_terms(prefix)[:limit]:
+            text, count = self._terms[(kind, key)]
+            results.append({"text": text, "type": kind, "count": count})
+        position = bisect_left(self._name_index, (prefix,))
+        names = 0
+        while position < len(self._name_index) and names < limit:
+            key, industry_id = self._name_index[position]
+            if not key.startswith(prefix):
+                break
+            results.append({"text": self._names[industry_id], "type": "industry", "id": industry_id, "count": 1})
+            names += 1
+            position += 1
+        # Empresas contam 1; em empate, os termos vêm antes (ordenação estável)
+        results.sort(key=lambda item: -item["count"])
+        return results[:limit]
+
+    def corrections(self, word, max_edits):
+        """
+        Prefixos do vocabulário a até max_edits edições da palavra digitada
+
+        Percorre o vocabulário ordenado como uma trie: palavras vizinhas
+        compartilham as linhas já calculadas do prefixo comum, e um ramo inteiro
+        é pulado assim que nenhuma continuação pode ficar dentro do limite.
+        Só são visitadas as palavras com as mesmas FUZZY_PREFIX_LENGTH letras iniciais.
+
+        Args:
+            word (str): Palavra digitada (normalizada)
+            max_edits (int): Número máximo de edições (inserção, remoção,
+                substituição ou troca de letras vizinhas)
+
+        Returns:
+            list: Pares (prefixo, distância), das correções mais próximas para as mais distantes
+        """
+        vocabulary = self._vocabulary
+        rows = [list(range(len(word) + 1))]
+        best = [max_edits + 1]
+        path = ""
+        found = {}
+        branch = word[:FUZZY_PREFIX_LENGTH]
+        position = bisect_left(vocabulary, branch)
+        end = bisect_left(vocabulary, branch + _MAX_CHAR, position)
+        while position < end:
+            candidate = vocabulary[position]
+            common = 0
+            limit = min(len(path), len(candidate))
+            while common < limit and path[common] == candidate[common]:
+                common += 1
+            del rows[common + 1:]
+            del best[common + 1:]
+
+            skipped = False
+            for depth in range(common + 1, len(candidate) + 1):
+                before_previous = rows[depth - 2] if depth >= 2 else None
+                previous_char = candidate[depth - 2] if depth >= 2 else ""
+                row = _edit_row(rows[depth - 1], before_previous, word, candidate[depth - 1], previous_char)
+                rows.append(row)
+                distance = row[-1]
+                best.append(min(best[-1], distance))
+                if distance <= max_edits and distance < best[-2]:
+                    found[candidate[:depth]] = distance
+                if min(row) > max_edits:
+                    # Nenhuma palavra com este prefixo fica dentro do limite
+                    path = candidate[:depth]
+                    position = bisect_left(vocabulary, path + _MAX_CHAR, position, end)
+                    skipped = True
+                    break
+            if not skipped:
+                path = candidate
+                position += 1
+
+        ranked = sorted(found.items(), key=lambda item: (item[1], -len(item[0])))
+        return ranked[:MAX_CORRECTIONS]
+
+    def suggest(self, prefix, limit=10):
+        """
+        Sugestões para o texto digitado
+
+        As que começam exatamente com o texto (sem acentos nem diferença de
+        caixa). Só quando nenhuma começa, as que começam com uma correção da
+        última palavra digitada, marcadas com "corrected": True.
+
+        Args:
+            prefix (str): Texto digitado
+            limit (int): Número máximo de sugestões
+
+        Returns:
+            list: Itens {"text", "type", "count"} (e "id" nas empresas)
+        """
+        query = normalize(prefix)
+        limit = max(1, min(limit, MAX_LIMIT))
+        if not query:
+            return []
+        with self._lock:
+            results = self._matches(query, limit)
+            head, _, word = query.rpartition(" ")
+            if results or len(word) < MIN_FUZZY_LENGTH:
+                return results
+
+            max_edits = 1 if len(word) <= SHORT_WORD_LENGTH else 2
+            seen = set()
+            for correction, distance in self.corrections(word, max_edits):
+                if distance == 0:
+                    continue
+                corrected = f"{head} {correction}" if head else correction
+                for item in self._matches(corrected, limit):
+                    key = (item["type"], item.get("id"), item["text"])
+                    if key not in seen:
+                        seen.add(key)
+                        results.append(dict(item, corrected=True))
+                if len(results) >= limit:
+                    break
+            return results[:limit]
+
+
+class LiveSuggestIndex:
+    """
+    Índice de sugestões de um processo, mantido atualizado
+
+    As escritas do próprio processo são aplicadas na hora (apply_delta). As dos
+    outros workers são percebidas pela versão da coleção, verificada no máximo
+    a cada refresh_interval segundos em uma thread auxiliar, que reconstrói o
+    índice sem bloquear as consultas (que seguem usando o índice anterior).
+    Se houver uma escrita durante a reconstrução, o índice novo é descartado
+    (ele pode não ter essa escrita) e a próxima verificação tenta de novo.
+    """
+
+    def __init__(self, loader, version, refresh_interval):
+        """
+        Args:
+            loader (callable): Função que constrói um SuggestIndex com os dados atuais
+            version (callable): Função que devolve a versão atual dos dados
+            refresh_interval (float): Segundos entre as verificações de versão
+        """
+        self._loader = loader
+        self._version = version
+        self.refresh_interval = refresh_interval
+        self._lock = threading.Lock()
+        self._index = None
+        self._loaded_version = None
+        self._checked_at = 0.0
+        self._refreshing = False
+        # Escritas locais aplicadas ao índice (apply_delta), para detectar
+        # escritas durante uma reconstrução
+        self._deltas = 0
+
+    def _load(self):
+        version = self._version()
+        index = self._loader()
+        return version, index
+
+    def _refresh(self):
+        try:
+            version = self._version()
+            if version != self._loaded_version:
+                deltas = self._deltas
+                version, index = self._load()
+                current = self._version()
+                with self._lock:
+                    if self._deltas != deltas or current != version:
+                        # Escrita no meio da carga: mantém o índice atual, que
+                        # já tem as escritas locais, e tenta na próxima consulta
+                        self._checked_at = 0.0
+                        logger.info("Recarga do índice de sugestões adiada: escrita durante a carga")
+                        return
+                    self._index, self._loaded_version = index, version
+                logger.info(f"Índice de sugestões recarregado (versão {version})")
+        except Exception as e:
+            logger.error(f"Erro ao recarregar o índice de sugestões: {e}")
+        finally:
+            self._refreshing = False
+
+    def get(self):
+        """
+        Índice atual (construído na primeira chamada)
+
+        Returns:
+            SuggestIndex: Índice de sugestões
+        """
+        if self._index is None:
+            with self._lock:
+                if self._index is None:
+                    self._loaded_version, self._index = self._load()
+                    self._checked_at = time.monotonic()
+            return self._index
+
+        now = time.monotonic()
+        if now - self._checked_at >= self.refresh_interval and not self._refreshing:
+            with self._lock:
+                if not self._refreshing:
+                    self._checked_at = now
+                    self._refreshing = True
+                    threading.Thread(target=self._refresh, name="suggest-refresh", daemon=True).start()
+        return self._index
+
+    def apply_delta(self, old=None, new=None):
+        """
+        Ajusta o índice após uma escrita deste processo
+
+        Args:
+            old (dict): Documento antes da escrita (None em inserções)
+            new (dict): Documento depois da escrita (None em remoções)
+        """
+        with self._lock:
+            index = self._index
+            if index is None:
+                return
+            self._deltas += 1
+            if old is not None:
+                index.remove(old)
+            if new is not None:
+                index.add(new)
+
+    def advance(self, version):
+        """
+        Marca como carregada a versão criada por uma escrita deste processo
+
+        Chamado depois que a escrita já passou por apply_delta e incrementou a
+        versão. Só vale se a nova versão for a seguinte à carregada: se outro
+        processo escreveu no meio, o índice não tem essa escrita e a próxima
+        verificação o recarrega.
+
+        Args:
+            version (str): Versão devolvida por CollectionVersions.bump
+        """
+        with self._lock:
+            loaded = self._loaded_version
+            if version and loaded and loaded.isdigit() and version == str(int(loaded) + 1):
+                self._loaded_version = version
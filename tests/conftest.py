@@ -0,0 +1,65 @@
+"""
+Configuração dos testes
+
+Os testes que precisam de banco usam a fixture mongo: a conexão de
+database.db é trocada por um banco do mongomock com as indústrias de
+mock_data. Sem o mongomock instalado, esses testes são pulados.
+"""
+import copy
+import inspect
+import os
+import sys
+import pytest
+
+# Módulos do projeto são planos, importados pelo nome a partir da raiz
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Nenhum MongoDB real: a conexão falha rápido e a fixture mongo assume o lugar dela
+os.environ.setdefault("MONGO_URI", "mongodb://127.0.0.1:1/")
+os.environ.setdefault("MONGO_SERVER_SELECTION_TIMEOUT_MS", "50")
+# Versões das coleções lidas a cada requisição (sem a janela de HTTP_CACHE_VERSION_TTL)
+os.environ["HTTP_CACHE_VERSION_TTL"] = "0"
+os.environ.pop("DATASET_SNAPSHOT", None)
+
+
+def _without_sort(method):
+    """Descarta o argumento sort que o pymongo 4.9+ passa às operações de bulk_write"""
+    def wrapper(self, *args, sort=None, **kwargs):
+        return method(self, *args, **kwargs)
+    return wrapper
+
+
+def stored(industry):
+    """Indústria de mock_data no formato gravado pelo main.py (sem id, com location.country)"""
+    document = copy.deepcopy(industry)
+    document.pop("id")
+    document["location"]["country"] = document["country"]
+    return document
+
+
+@pytest.fixture
+def mongo(monkeypatch):
+    """Banco do mongomock com as indústrias de mock_data, usado por database.db"""
+    mongomock = pytest.importorskip("mongomock")
+    # O mongomock 4.x ainda não aceita o sort das operações de bulk_write do pymongo recente
+    builder = mongomock.collection.BulkOperationBuilder
+    for name in ("add_update", "add_replace"):
+        method = getattr(builder, name)
+        if "sort" not in inspect.signature(method).parameters:
+            monkeypatch.setattr(builder, name, _without_sort(method))
+
+    from database import db, COLLECTIONS
+    from mock_data import mock_industries
+    database = mongomock.MongoClient().businesses_industry
+    database[COLLECTIONS['industries']].insert_many([stored(industry) for industry in mock_industries])
+    monkeypatch.setattr(db, "_client", database.client)
+    monkeypatch.setattr(db, "_db", database)
+    monkeypatch.setattr(db, "_pid", os.getpid())
+    return database
+
+
+@pytest.fixture
+def client(mongo):
+    """Test client do main.py sobre o banco da fixture mongo"""
+    from main import app
+    return app.test_client()
@@ -0,0 +1,111 @@
+import pytest
+import clusters
+import facets
+from database import COLLECTIONS
+
+# Área do mapa que cobre o mundo inteiro
+WORLD = (-180, -90, 180, 90)
+
+NEW_INDUSTRY = {
+    "name": "Nova Fundição Ltda.",
+    "description": "Fundição de peças de aço",
+    "sector": "Metalurgia",
+    "country": "Chile",
+    "status": "available",
+    "products": ["Peças fundidas"],
+    "location": {"country": "Chile", "lat": -33.45, "lng": -70.66}
+}
+
+
+def _facets(client):
+    response = client.get("/api/facets")
+    assert response.status_code == 200
+    return response.get_json()
+
+
+def _clusters(zoom):
+    return sorted((cluster["count"], cluster["lat"], cluster["lng"], cluster["sector"])
+                  for cluster in clusters.get_clusters(WORLD, zoom)[1])
+
+
+def test_cursor_pages_cover_every_industry(client, mongo):
+    """Páginas encadeadas por next_cursor cobrem todas as indústrias, em ordem de _id"""
+    expected = [str(document["_id"]) for document in mongo[COLLECTIONS['industries']].find().sort("_id", 1)]
+    ids, cursor = [], None
+    while True:
+        response = client.get("/api/industries", query_string={"limit": 4, **({"cursor": cursor} if cursor else {})})
+        assert response.status_code == 200
+        body = response.get_json()
+        ids.extend(industry["_id"] for industry in body["results"])
+        cursor = body["next_cursor"]
+        if not cursor:
+            break
+    assert ids == expected
+
+
+def test_invalid_cursor_is_rejected(client):
+    assert client.get("/api/industries?cursor=nao-e-um-cursor").status_code == 400
+
+
+def test_etag_revalidation(client):
+    """If-None-Match com o ETag atual recebe 304; depois de uma escrita, a resposta completa"""
+    first = client.get("/api/sectors")
+    assert first.status_code == 200
+    etag = first.headers["ETag"]
+
+    cached = client.get("/api/sectors", headers={"If-None-Match": etag})
+    assert cached.status_code == 304
+    assert cached.headers["ETag"] == etag
+    assert cached.get_data() == b""
+
+    assert client.post("/api/industries", json=NEW_INDUSTRY).status_code == 201
+    changed = client.get("/api/sectors", headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["ETag"] != etag
+
+
+def test_facet_and_cluster_deltas_match_rebuild(client, mongo):
+    """Facetas e clusters ajustados por create/update/delete coincidem com o recálculo completo"""
+    facets.rebuild(mongo)
+    clusters.rebuild(mongo)
+
+    created = client.post("/api/industries", json=NEW_INDUSTRY)
+    assert created.status_code == 201
+    industry_id = created.get_json()["_id"]
+    after_create = _facets(client)
+    assert {"name": "Metalurgia", "count": 1} in after_create["sector"]
+
+    changes = {"sector": "Química Fina", "location": {"country": "Peru", "lat": -12.05, "lng": -77.04}}
+    assert client.put(f"/api/industries/{industry_id}", json=changes).status_code == 200
+    other = next(document for document in mongo[COLLECTIONS['industries']].find() if str(document["_id"]) != industry_id)
+    assert client.delete(f"/api/industries/{other['_id']}").status_code == 200
+
+    by_delta = (_facets(client), _clusters(2), _clusters(8))
+    assert not any(item["name"] == "Metalurgia" for item in by_delta[0]["sector"])
+    facets.rebuild(mongo)
+    clusters.rebuild(mongo)
+    assert by_delta == (_facets(client), _clusters(2), _clusters(8))
+
+
+def test_bulk_upsert_counts(client, mongo):
+    """A carga em lote conta inserções, atualizações e registros inválidos"""
+    records = [dict(NEW_INDUSTRY, id=f"ext-{number}", name=f"Fundição {number}") for number in range(3)]
+    first = client.post("/api/industries/bulk", json={"records": records + [{"id": "ext-x"}]})
+    assert first.status_code == 200
+    report = first.get_json()
+    assert (report["received"], report["inserted"], report["updated"], report["failed"]) == (4, 3, 0, 1)
+    assert report["errors"][0]["index"] == 3
+
+    again = client.post("/api/industries/bulk", json=[dict(records[0], status="seeking"), records[1]]).get_json()
+    assert (again["inserted"], again["updated"], again["failed"]) == (0, 2, 0)
+    assert mongo[COLLECTIONS['industries']].count_documents({"external_id": {"$exists": True}}) == 3
+    assert mongo[COLLECTIONS['industries']].find_one({"external_id": "ext-0"})["status"] == "seeking"
+
+
+def test_bulk_rejects_non_list(client):
+    assert client.post("/api/industries/bulk", json={"records": "x"}).status_code == 400
+
+
+@pytest.mark.parametrize("query", ["limit=-1", "skip=-1", "limit=abc"])
+def test_invalid_paging_parameters(client, query):
+    assert client.get(f"/api/industries?{query}").status_code == 400
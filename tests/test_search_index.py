@@ -0,0 +1,55 @@
+import pytest
+from benchmarks.catalog import generate
+from mock_data import mock_industries
+from regions import region_of
+from search_index import IndustryIndex
+
+# Termos curtos (só prefixo), longos (também no meio dos tokens), com acento e sem resultado
+QUERIES = ["te", "tec", "global", "solucoes", "sustentável", "aço", "ind", "máquinas agrícolas", "xyzq"]
+
+
+@pytest.fixture(scope="module")
+def index():
+    """Índice sobre os dados simulados e um catálogo sintético pequeno"""
+    records = [dict(industry, region=region_of(industry)) for industry in mock_industries]
+    records += [dict(industry, id=f"c{position}") for position, industry in enumerate(generate(500))]
+    return IndustryIndex(records)
+
+
+def _ids(records):
+    return [record["id"] for record in records]
+
+
+@pytest.mark.parametrize("query", QUERIES)
+@pytest.mark.parametrize("field", ["sector", "country", "status", "region"])
+def test_filters_keep_text_matches(index, query, field):
+    """find(q, filtros) devolve exatamente os registros de find(q) que atendem aos filtros"""
+    unfiltered = index.find(query)
+    for value in index.values(field):
+        expected = [record for record in unfiltered if record.get(field) == value]
+        assert _ids(index.find(query, {field: value})) == _ids(expected)
+
+
+def test_infix_terms_match_inside_tokens(index):
+    """Termos a partir de três letras casam no meio dos tokens ("solutions" em "TechSolutions")"""
+    names = [record["name"] for record in index.find("solutions")]
+    assert "TechSolutions Inc." in names
+    assert index.find("xyzq") == []
+
+
+def test_after_pages_through_every_match(index):
+    """Páginas encadeadas por after cobrem todos os resultados, sem repetição"""
+    expected = _ids(index.find("tec", {"status": "available"}))
+    pages, after = [], None
+    while True:
+        page = index.find("tec", {"status": "available"}, limit=7, after=after)
+        if not page:
+            break
+        pages.extend(_ids(page))
+        after = page[-1]["id"]
+    assert pages == expected
+
+
+def test_after_unknown_id_is_rejected(index):
+    with pytest.raises(ValueError):
+        index.find(limit=10, after="nao-existe")